@@ -42,27 +42,103 @@ class F5CloudServiceManager(object):
     under its control.
     """
 
-    def __init__(self, bigip, partition, prefix=None, schema_path=None):
+    def __init__(self, bigip, partition, prefix=None, schema_path=None,
+                 refresh_workers=1, direct_writes=False, deploy_workers=1,
+                 transaction_size=0, max_staleness=0, config_cache_size=0,
+                 validation_cache_size=0, compiled_validation=False,
+                 compiled_schema_dir=None, apply_reports=False,
+                 apply_report_callback=None, rest_metrics=None,
+                 status_ttl=0, statistics_ttl=0, select_fields=False,
+                 page_size=0):
         """Initialize an instance of the F5 CCCL service manager.
 
-        :param bigip: BIG-IP management root.
+        :param bigip: BIG-IP management root, or a lightweight
+        f5_cccl.utils.rest_client.RestClient.
         :param partition: Name of BIG-IP partition to manage.
         :param prefix:  The prefix assigned to resources that should be
         managed by this CCCL instance.  This is prepended to the
         resource name (default: None)
         :param schema_path: User defined schema (default: from package)
+        :param refresh_workers: Number of BIG-IP collections to retrieve
+        concurrently when refreshing the cached LTM state (default: 1)
+        :param direct_writes: Update and delete resources by their URI,
+        without loading them from the BIG-IP first (default: False)
+        :param deploy_workers: Maximum number of resources to create, update
+        or delete concurrently, in the order of their references (default: 1)
+        :param transaction_size: Maximum number of resources to create,
+        update or delete in a single iControl REST transaction (default: 0,
+        transactions are not used)
+        :param max_staleness: Maximum number of seconds to skip applying a
+        service configuration that was already applied, while the BIG-IP
+        configuration has not changed (default: 0, always apply)
+        :param config_cache_size: Maximum number of desired resources to
+        reuse when their service configuration is read again unchanged
+        (default: 0, resources are always created)
+        :param validation_cache_size: Maximum number of validated service
+        items (virtual servers, pools, etc.) to cache, so that only the new
+        or changed items are validated (default: 0, the whole configuration
+        is always validated)
+        :param compiled_validation: Validate service configurations with
+        Python functions compiled from the schema, falling back to jsonschema
+        to report errors (default: False)
+        :param compiled_schema_dir: Directory to cache the compiled schema
+        in, keyed by the digest of the schema.  It must not be writable by
+        untrusted users (default: None, the schema is compiled at startup)
+        :param apply_reports: Record the timings of the phases of each apply
+        (validate, read, refresh, diff, create, update, delete, post-deploy)
+        and its REST calls by method, see get_apply_report (default: False)
+        :param apply_report_callback: Function called with the report of
+        each apply, when apply_reports is enabled (default: None)
+        :param rest_metrics: A f5_cccl.utils.rest_metrics.RestMetrics
+        collector to record the count, latency, response size and status
+        code of the iControl REST requests in, by endpoint.  It can be
+        shared by several instances and exported in the Prometheus text
+        format (default: None)
+        :param status_ttl: Number of seconds to reuse the status returned by
+        get_status, so that concurrent callers share a single read of the
+        BIG-IP (default: 0, the status is read on every call)
+        :param statistics_ttl: Number of seconds to reuse the statistics
+        returned by get_statistics, so that concurrent callers share a
+        single sample of the BIG-IP (default: 0, the statistics are sampled
+        on every call)
+        :param select_fields: Retrieve only the fields of the virtual servers,
+        pools and policies that are compared with the desired configuration,
+        with $select queries derived from the 'properties' of their resource
+        classes, when refreshing the cached LTM state (default: False)
+        :param page_size: Number of resources to retrieve per request, with
+        $top and $skip, when refreshing the cached LTM state.  The pools and
+        nodes are cached page by page, which bounds the memory used by the
+        refresh of large partitions (default: 0, collections are retrieved
+        in a single request)
         """
         LOGGER.debug("F5CloudServiceManager initialize")
         self._bigip_proxy = BigIPProxy(bigip,
                                        partition,
-                                       prefix=prefix)
+                                       prefix=prefix,
+                                       refresh_workers=refresh_workers,
+                                       rest_metrics=rest_metrics,
+                                       select_fields=select_fields,
+                                       page_size=page_size)
 
         if schema_path is None:
             schema_path = pkg_resources.resource_filename(resource_package,
                                                           ltm_api_schema)
-        self._service_manager = ServiceManager(self._bigip_proxy,
-                                               partition,
-                                               schema_path)
+        self._service_manager = ServiceManager(
+            self._bigip_proxy,
+            partition,
+            schema_path,
+            direct_writes=direct_writes,
+            deploy_workers=deploy_workers,
+            transaction_size=transaction_size,
+            max_staleness=max_staleness,
+            config_cache_size=config_cache_size,
+            validation_cache_size=validation_cache_size,
+            compiled_validation=compiled_validation,
+            compiled_schema_dir=compiled_schema_dir,
+            apply_reports=apply_reports,
+            apply_report_callback=apply_report_callback,
+            status_ttl=status_ttl,
+            statistics_ttl=statistics_ttl)
 
     def apply_ltm_config(self, services):
         """Apply LTM service configurations to the BIG-IP partition.
@@ -74,6 +150,24 @@ class F5CloudServiceManager(object):
         """
         return self._service_manager.apply_ltm_config(services)
 
+    def apply_pool_member_delta(self, pool, added, removed, changed):
+        """Apply a change to the members of a single pool.
+
+        Only the pool is refreshed from the BIG-IP, and each pool member
+        is added, removed or modified with its own request.
+
+        :param pool: Name of the pool in the managed partition.
+        :param added: List of pool members to add.
+        :param removed: List of pool members to remove.
+        :param changed: List of pool members to modify.
+        The pool members are defined by poolMemberType in
+        cccl-ltm-api-schema.yml.
+
+        :return: The number of pool members that could not be deployed.
+        """
+        return self._service_manager.apply_pool_member_delta(
+            pool, added, removed, changed)
+
     def apply_net_config(self, services):
         """Apply NET service configurations to the BIG-IP partition.
 
@@ -91,28 +185,78 @@ class F5CloudServiceManager(object):
         """
         return self._service_manager.get_partition()
 
+    def get_apply_report(self):
+        """Get the report of the last apply.
+
+        :return: A dictionary with the 'type' of configuration applied
+        ('ltm' or 'net'), the 'timings' of its phases in seconds, the
+        'counters' of its tasks and the 'rest_calls' by HTTP method, or
+        None if apply_reports is disabled or nothing was applied yet.
+        """
+        return self._service_manager.get_apply_report()
+
     def get_status(self):
         """Get status for each service in the managed partition.
 
+        The status of all of the managed virtual servers, pools and pool
+        members is read with three collection requests, and is cached for
+        status_ttl seconds.
+
         :return: A serializable object of the statuses of each managed
-        resource.
+        resource, e.g.:
 
-        Its structure is defined by:
-            cccl-status-schema.json
-        """
-        status = {}
+            {
+                'virtuals': {
+                    'vs1': {'availabilityState': 'available',
+                            'enabledState': 'enabled',
+                            'statusReason': 'The virtual server is ...'}
+                },
+                'pools': {
+                    'pool1': {'availabilityState': 'available',
+                              'enabledState': 'enabled',
+                              'statusReason': 'The pool is available',
+                              'members': {
+                                  '10.1.1.1:80': {
+                                      'state': 'up',
+                                      'session': 'monitor-enabled'}
+                              }}
+                }
+            }
 
-        return status
+        The returned object is shared by the callers and must not be
+        modified.
+        """
+        return self._service_manager.get_status()
 
     def get_statistics(self):
         """Get statistics for each service in the managed partition.
 
-        :return: A serializable object of the virtual server statistics
-        for each service.
+        The counters of all of the managed virtual servers and pools are
+        sampled with a single stats request per type of resource, and the
+        rates are computed from the previous sample.  A sample is cached
+        for statistics_ttl seconds.
 
-        Its structure is defined by:
-            cccl-statistics-schema.json
-        """
-        statistics = {}
+        :return: A serializable object of the virtual server and pool
+        statistics, e.g.:
+
+            {
+                'interval': 10.0,
+                'virtuals': {
+                    'vs1': {'curConns': 12, 'connsPerSec': 3.5,
+                            'bitsInPerSec': 81920.0,
+                            'bitsOutPerSec': 655360.0,
+                            'pktsInPerSec': 20.0, 'pktsOutPerSec': 40.0,
+                            'requestsPerSec': 7.0}
+                },
+                'pools': {
+                    'pool1': {'curConns': 12, 'activeMembers': 2,
+                              'connsPerSec': 3.5, ...}
+                }
+            }
 
-        return statistics
+        The 'interval' is the number of seconds since the previous sample.
+        The rates are None on the first sample of a resource, or when its
+        counters were reset.  The returned object is shared by the callers
+        and must not be modified.
+        """
+        return self._service_manager.get_statistics()
@@ -16,39 +16,117 @@ u"""This module provides a class for managing a BIG-IP."""
 # limitations under the License.
 
 from copy import copy
+import hashlib
+import json
 import logging
+from multiprocessing.pool import ThreadPool
 from time import time
 
 import requests
 from requests.packages.urllib3.exceptions import InsecureRequestWarning
+from requests.utils import quote as urlquote
 
 from f5.sdk_exception import F5SDKError
+from icontrol.exceptions import iControlUnexpectedHTTPError
 
 import f5_cccl.exceptions as cccl_exc
 
 # LTM resources
+from f5_cccl.resource.ltm.app_service import ApplicationService
 from f5_cccl.resource.ltm.app_service import IcrApplicationService
+from f5_cccl.resource.ltm.monitor.http_monitor import HTTPMonitor
 from f5_cccl.resource.ltm.monitor.http_monitor import IcrHTTPMonitor
+from f5_cccl.resource.ltm.monitor.https_monitor import HTTPSMonitor
 from f5_cccl.resource.ltm.monitor.https_monitor import IcrHTTPSMonitor
+from f5_cccl.resource.ltm.monitor.icmp_monitor import ICMPMonitor
 from f5_cccl.resource.ltm.monitor.icmp_monitor import IcrICMPMonitor
 from f5_cccl.resource.ltm.monitor.tcp_monitor import IcrTCPMonitor
+from f5_cccl.resource.ltm.monitor.tcp_monitor import TCPMonitor
 from f5_cccl.resource.ltm.monitor.udp_monitor import IcrUDPMonitor
+from f5_cccl.resource.ltm.monitor.udp_monitor import UDPMonitor
 from f5_cccl.resource.ltm.policy import IcrPolicy
+from f5_cccl.resource.ltm.policy import Policy
 from f5_cccl.resource.ltm.pool import IcrPool
+from f5_cccl.resource.ltm.pool import Pool
 from f5_cccl.resource.ltm.virtual_address import IcrVirtualAddress
+from f5_cccl.resource.ltm.virtual_address import VirtualAddress
 from f5_cccl.resource.ltm.virtual import IcrVirtualServer
+from f5_cccl.resource.ltm.virtual import VirtualServer
 from f5_cccl.resource.ltm.node import Node
 from f5_cccl.resource.ltm.irule import IcrIRule
+from f5_cccl.resource.ltm.irule import IRule
 from f5_cccl.resource.ltm.internal_data_group import IcrInternalDataGroup
+from f5_cccl.resource.ltm.internal_data_group import InternalDataGroup
 
 # NET resources
+from f5_cccl.resource.net.arp import Arp
 from f5_cccl.resource.net.arp import IcrArp
+from f5_cccl.resource.net.fdb.tunnel import FDBTunnel
 from f5_cccl.resource.net.fdb.tunnel import IcrFDBTunnel
+from f5_cccl.utils.apply_report import NULL_REPORT
 
 requests.packages.urllib3.disable_warnings(InsecureRequestWarning)
 
 LOGGER = logging.getLogger(__name__)
 
+# Fields selected for every resource besides its compared properties.  The
+# SDK builds the object of a resource from its kind and selfLink.
+IDENTITY_FIELDS = ['kind', 'selfLink', 'name', 'partition', 'subPath',
+                   'fullPath', 'appService']
+
+# Fields updated by the BIG-IP whenever a resource is modified.
+GENERATION_FIELDS = ['generation', 'lastUpdateMicros']
+
+
+# Number of times the retrieval of a paged collection is restarted when the
+# collection changes between two of its pages.
+PAGED_RETRIEVAL_ATTEMPTS = 3
+
+
+def _generation_token(raw):
+    """Get the change token of a raw resource from its generation.
+
+    The items of the expanded subcollections, e.g. the pool members, have
+    their own generation, so they are part of the token.
+
+    Returns:
+        The token, or None if the resource or one of its subcollection
+        items does not have a generation.
+    """
+    if 'generation' not in raw:
+        return None
+    token = [raw.get('name')] + [raw.get(key) for key in GENERATION_FIELDS]
+    for key in sorted(raw):
+        value = raw[key]
+        if key.endswith('Reference') and isinstance(value, dict):
+            for item in value.get('items', list()):
+                item_token = _generation_token(item)
+                if item_token is None:
+                    return None
+                token.append(item_token)
+    return tuple(token)
+
+
+class _CollectionChangedError(Exception):
+    """A paged collection changed between two of its pages."""
+    pass
+
+
+def _select_query(resource_type, subcollections=(), extra_fields=()):
+    """Get the $select query of the fields compared for a resource type.
+
+    The fields are the keys of the 'properties' of the resource type, where
+    the properties that are subcollections on the BIG-IP are selected as
+    their references, e.g. 'profiles' as 'profilesReference'.
+    """
+    fields = set(IDENTITY_FIELDS + GENERATION_FIELDS)
+    fields.update(extra_fields)
+    for key in resource_type.properties:
+        if key in subcollections:
+            key = "{}Reference".format(key)
+        fields.add(key)
+    return "$select={}".format(",".join(sorted(fields)))
+
 
 class BigIPProxy(object):
     """BigIPProxy class.
@@ -60,17 +138,33 @@ class BigIPProxy(object):
       the accounts with proper permissions, for either local or remote auth).
 
     Args:
-        bigip: Management Root of the BIG-IP
+        bigip: Management Root of the BIG-IP, or a RestClient from
+            f5_cccl.utils.rest_client to work with plain dictionaries
         partitions: List of BIG-IP partitions to manage
         prefix: Optional string to prepend to resource names
+        refresh_workers: Number of collections to retrieve concurrently
+            when refreshing the ltm cache (default: 1, sequential)
+        rest_metrics: Optional f5_cccl.utils.rest_metrics.RestMetrics
+            collector to record the iControl REST requests in
+        select_fields: Retrieve only the fields of the virtual servers,
+            pools and policies that are compared, when refreshing the ltm
+            cache (default: False, all of the fields are retrieved)
+        page_size: Number of resources to retrieve per request when
+            refreshing the ltm cache, at least 2.  The pools and nodes are
+            cached page by page (default: 0, collections are retrieved
+            whole)
     """
 
-    def __init__(self, bigip, partition, prefix=None):
+    def __init__(self, bigip, partition, prefix=None, refresh_workers=1,
+                 rest_metrics=None, select_fields=False, page_size=0):
         """Initialize the BigIPProxy object."""
         LOGGER.debug("BigIPProxy.__init__()")
 
         self._bigip = bigip
         self._partition = partition
+        self._refresh_workers = refresh_workers
+        self._select_fields = select_fields
+        self._page_size = max(page_size, 2) if page_size > 0 else 0
 
         self._prefix = ""
         if prefix:
@@ -78,23 +172,51 @@ class BigIPProxy(object):
 
         # BIG-IP LTM resources
         self._virtuals = dict()
+        self._all_virtuals = dict()
+        self._virtual_addresses = dict()
         self._pools = dict()
         self._all_pools = dict()
         self._policies = dict()
         self._iapps = dict()
         self._monitors = dict()
         self._nodes = dict()
+        self._node_index = dict()
         self._irules = dict()
         self._internal_data_groups = dict()
 
         # BIG-IP NET resources
         self._arps = dict()
         self._fdb_tunnels = dict()
+        self._all_fdb_tunnels = dict()
+
+        # Change tokens of the resources created during the last refresh,
+        # indexed by resource type and name.
+        self._resource_tokens = dict()
+
+        # Report of the current apply.
+        self._report = NULL_REPORT
+        self._rest_hook_installed = False
+
+        if rest_metrics is not None:
+            rest_metrics.instrument(bigip)
 
     def mgmt_root(self):
         """Return a reference to the proxied BIG-IP."""
         return self._bigip
 
+    def set_report(self, report):
+        """Report the refresh timings and the REST calls to 'report'."""
+        if not self._rest_hook_installed:
+            session = self._bigip._meta_data['icr_session'].session
+            session.hooks['response'].append(self._count_rest_call)
+            self._rest_hook_installed = True
+        self._report = report
+
+    def _count_rest_call(self, response, *args, **kwargs):
+        """Count a REST call in the current report."""
+        # pylint: disable=unused-argument
+        self._report.count_rest_call(response.request.method)
+
     def _manageable_resource(self, rsc):
         """Determine if the resource will be managed.
 
@@ -139,6 +261,172 @@ class BigIPProxy(object):
             raise cccl_exc.F5CcclCacheRefreshError(
                 "BigIPProxy: failed to refresh internal BIG-IP ltm state.")
 
+    def refresh_ltm_addresses(self):
+        """Refresh the cached nodes and virtual addresses.
+
+        Nodes and virtual addresses are implicitly created on the BIG-IP
+        by pool members and virtual servers, so they are the only part of
+        the ltm cache that cannot be predicted from the changes applied.
+        """
+        LOGGER.debug("Refreshing the BIG-IP ltm cached addresses...")
+        try:
+            self._refresh_ltm_addresses()
+        except F5SDKError as error:
+            LOGGER.error("F5 SDK Error: %s", error)
+            raise cccl_exc.F5CcclCacheRefreshError(
+                "BigIPProxy: failed to refresh internal BIG-IP ltm state.")
+
+    def refresh_pool(self, name):
+        """Refresh a single cached pool and its members.
+
+        The pool is retrieved with its members subcollection in a single
+        request, without refreshing the rest of the ltm cache.
+
+        Returns:
+            The refreshed pool, or None if it does not exist on the BIG-IP.
+        """
+        LOGGER.debug("Refreshing the BIG-IP cached pool /%s/%s...",
+                     self._partition, name)
+        icr_session = self._bigip._meta_data['icr_session']
+        uri = "{}ltm/pool/~{}~{}".format(
+            self._bigip._meta_data['uri'], self._partition, urlquote(name))
+        try:
+            pool_raw = icr_session.get(
+                uri, params="expandSubcollections=true").json()
+        except iControlUnexpectedHTTPError as error:
+            if error.response.status_code == 404:
+                self.uncache_resource(IcrPool(name, self._partition))
+                return None
+            LOGGER.error("iControl REST Error: %s", error)
+            raise cccl_exc.F5CcclCacheRefreshError(
+                "BigIPProxy: failed to refresh internal BIG-IP pool state.")
+
+        pool = IcrPool(**pool_raw)
+        self.cache_resource(pool)
+        return pool
+
+    def get_change_token(self):
+        """Get a token that changes when the BIG-IP configuration changes.
+
+        The token is the time of the last local configuration change, as
+        recorded for config sync.
+
+        Returns:
+            The change token, or None if it cannot be retrieved.
+        """
+        icr_session = self._bigip._meta_data['icr_session']
+        uri = "{}sys/db/configsync.localconfigtime".format(
+            self._bigip._meta_data['uri'])
+        try:
+            return icr_session.get(uri).json().get('value')
+        except iControlUnexpectedHTTPError as error:
+            LOGGER.warning("Failed to get the BIG-IP change token: %s", error)
+            return None
+
+    def _get_stats(self, collection):
+        """Get the stats of the managed resources of an ltm collection.
+
+        The stats of all of the resources are retrieved with a single
+        request on the stats endpoint of the collection.
+
+        Returns:
+            A dictionary of the stats of each resource, indexed by name.
+            Counters are returned as numbers and states as strings.
+        """
+        icr_session = self._bigip._meta_data['icr_session']
+        uri = "{}ltm/{}/stats".format(self._bigip._meta_data['uri'],
+                                      collection)
+        entries = icr_session.get(
+            uri, params="$filter=partition+eq+{}".format(self._partition)
+        ).json().get('entries', dict())
+
+        stats = dict()
+        for entry in entries.values():
+            nested = entry.get('nestedStats', dict()).get('entries', dict())
+            values = dict(
+                (key, value.get('description', value.get('value')))
+                for (key, value) in nested.items())
+            tm_name = values.pop('tmName', None) or ""
+            (partition, _, name) = tm_name.lstrip('/').partition('/')
+            if (partition == self._partition and '/' not in name and
+                    name.startswith(self._prefix)):
+                stats[name] = values
+        return stats
+
+    def get_status(self):
+        """Get the status of the managed virtual servers and pools.
+
+        The status is retrieved with three requests: the stats of the
+        virtual servers, the stats of the pools, and the pools with their
+        members.
+
+        Returns:
+            A dictionary with the status of the 'virtuals' and the 'pools',
+            indexed by name.  Each status has the 'availabilityState',
+            'enabledState' and 'statusReason' of the resource, and each
+            pool has the 'state' and 'session' of its 'members'.
+
+        Raises:
+            F5CcclResourceRequestError: Failed to get the status.
+        """
+        icr_session = self._bigip._meta_data['icr_session']
+        uri = "{}ltm/pool".format(self._bigip._meta_data['uri'])
+        try:
+            virtual_stats = self._get_stats('virtual')
+            pool_stats = self._get_stats('pool')
+            pools = icr_session.get(
+                uri, params="$filter=partition+eq+{}"
+                "&expandSubcollections=true".format(self._partition)
+            ).json().get('items', list())
+        except iControlUnexpectedHTTPError as error:
+            LOGGER.error("iControl REST Error: %s", error)
+            raise cccl_exc.F5CcclResourceRequestError(
+                "BigIPProxy: failed to get the BIG-IP status.")
+
+        status_keys = ['availabilityState', 'enabledState', 'statusReason']
+        status = {'virtuals': dict(), 'pools': dict()}
+        for (name, stats) in virtual_stats.items():
+            status['virtuals'][name] = dict(
+                (key, stats.get('status.' + key)) for key in status_keys)
+        for (name, stats) in pool_stats.items():
+            status['pools'][name] = dict(
+                (key, stats.get('status.' + key)) for key in status_keys)
+            status['pools'][name]['members'] = dict()
+        for pool in pools:
+            pool_status = status['pools'].get(pool['name'])
+            if pool_status is None:
+                continue
+            members = pool.get('membersReference', dict()).get(
+                'items', list())
+            for member in members:
+                pool_status['members'][member['name']] = {
+                    'state': member.get('state'),
+                    'session': member.get('session')
+                }
+        return status
+
+    def get_statistics(self):
+        """Get the stats of the managed virtual servers and pools.
+
+        The stats are retrieved with a single request per type of resource.
+
+        Returns:
+            A dictionary with the stats of the 'virtuals' and the 'pools',
+            indexed by name, as returned by their stats endpoints.
+
+        Raises:
+            F5CcclResourceRequestError: Failed to get the stats.
+        """
+        try:
+            return {
+                'virtuals': self._get_stats('virtual'),
+                'pools': self._get_stats('pool')
+            }
+        except iControlUnexpectedHTTPError as error:
+            LOGGER.error("iControl REST Error: %s", error)
+            raise cccl_exc.F5CcclResourceRequestError(
+                "BigIPProxy: failed to get the BIG-IP statistics.")
+
     def refresh_net(self):
         """Refresh the internal net cache with the BIG-IP state."""
         LOGGER.debug("Refreshing the BIG-IP net cached state...")
@@ -177,6 +465,80 @@ class BigIPProxy(object):
 
         return icr_resource
 
+    @staticmethod
+    def _resource_token(resource_obj):
+        """Compute the change token of an iControl REST resource.
+
+        The token is made of the generations of the resource and of its
+        subcollection items, which the BIG-IP updates on every change.
+        Resources without a generation fall back to a digest of their raw
+        representation.
+        """
+        token = _generation_token(resource_obj.raw)
+        if token is not None:
+            return token
+
+        raw = {
+            k: v for k, v in resource_obj.raw.items() if not k.startswith('_')
+        }
+        content = json.dumps(raw, sort_keys=True, default=str)
+        return hashlib.sha1(content.encode('utf-8')).hexdigest()
+
+    def _create_resources(self, resource_type, resource_objs):
+        """Create the iControl REST resources of a collection.
+
+        A change token is kept for every resource created during the last
+        refresh.  Resources whose token has not changed are reused, so only
+        the resources that were modified on the BIG-IP are reconstructed.
+
+        Resources must not be modified once they are cached, as they are
+        shared between refreshes.
+
+        Returns:
+            A dictionary of the resources indexed by name.
+        """
+        previous = self._resource_tokens.get(resource_type, dict())
+        current = dict()
+        reused = 0
+        for resource_obj in resource_objs:
+            token = self._resource_token(resource_obj)
+            cached = previous.get(resource_obj.name)
+            if cached and cached[0] == token:
+                current[resource_obj.name] = cached
+                reused += 1
+            else:
+                current[resource_obj.name] = (
+                    token, self._create_resource(resource_type, resource_obj))
+
+        LOGGER.debug("Reused %d of %d %s resources.",
+                     reused, len(current), resource_type.__name__)
+        self._resource_tokens[resource_type] = current
+
+        return {name: current[name][1] for name in current}
+
+    def _create_managed_resources(self, resource_type, resource_objs):
+        """Create the iControl REST resources of a collection.
+
+        The resources are iterated over once, so that they can be created
+        while the collection is retrieved.
+
+        Returns:
+            A dictionary of all of the resources, and a dictionary of the
+            managed resources, indexed by name.
+        """
+        managed = list()
+
+        def track_managed(resource_objs):
+            """Record the names of the managed resources."""
+            for resource_obj in resource_objs:
+                if self._manageable_resource(resource_obj):
+                    managed.append(resource_obj.name)
+                yield resource_obj
+
+        resources = self._create_resources(
+            resource_type, track_managed(resource_objs))
+        return (resources, {name: resources[name] for name in managed})
+
     def _policy_status_check(self, policy, virtuals):
         """Delete non-legacy policies because they can't be updated."""
         if getattr(policy, 'status', 'legacy') != 'legacy':
@@ -191,8 +553,13 @@ class BigIPProxy(object):
                         policies.append(p)
 
                 if policy_delete:
-                    v.policiesReference['items'] = policies
-                    v.update()
+                    if self._select_fields:
+                        # The virtual was retrieved with a subset of its
+                        # fields, so only its policies are modified.
+                        v.modify(policiesReference={'items': policies})
+                    else:
+                        v.policiesReference['items'] = policies
+                        v.update()
 
             # delete policy
             LOGGER.warning("Deleting policy /%s/%s due to invalid status: %s",
@@ -202,80 +569,186 @@ class BigIPProxy(object):
 
         return True
 
+    def _get_collection(self, description, collection, query):
+        """Retrieve a collection of resources from the BIG-IP."""
+        LOGGER.debug("Retrieving %s from BIG-IP /%s...",
+                     description, self._partition)
+        if self._page_size > 0:
+            return self._stream_collection(
+                (None, description, collection, query), list)
+        return collection.get_collection(requests_params={"params": query})
+
+    def _iter_collection(self, key, description, collection, query,
+                         phase="refresh"):
+        """Iterate over a collection retrieved page by page.
+
+        Consecutive pages overlap by one resource, so that a resource
+        created or deleted before the current page, which shifts the
+        following resources, is detected.
+
+        Raises:
+            _CollectionChangedError: The collection changed between two of
+            its pages.
+        """
+        def path(resource_obj):
+            """Get the path of a resource, unique in the collection."""
+            return getattr(resource_obj, 'fullPath', None) or \
+                resource_obj.name
+
+        skip = 0
+        last_path = None
+        while True:
+            params = "$top={}&$skip={}&{}".format(
+                self._page_size, skip, query)
+            start_time = time()
+            page = collection.get_collection(
+                requests_params={"params": params})
+            if key is not None:
+                self._report.add_time(
+                    "{}.{}".format(phase, key), time() - start_time)
+
+            new_resources = page
+            if last_path is not None:
+                if not page or path(page[0]) != last_path:
+                    raise _CollectionChangedError(description)
+                new_resources = page[1:]
+            for resource_obj in new_resources:
+                yield resource_obj
+
+            if len(page) < self._page_size:
+                return
+            last_path = path(page[-1])
+            skip += self._page_size - 1
+
+    def _stream_collection(self, request, consume):
+        """Retrieve a collection page by page, and consume its resources.
+
+        The retrieval is restarted if the collection changes while it is
+        retrieved.
+
+        Args:
+            request: (key, description, collection, query) tuple describing
+            the collection to retrieve.
+            consume: Function of an iterable of the resources, that is
+            called again when the retrieval is restarted.
+
+        Returns:
+            The value returned by 'consume'.
+        """
+        for attempt in range(1, PAGED_RETRIEVAL_ATTEMPTS + 1):
+            try:
+                return consume(self._iter_collection(*request))
+            except _CollectionChangedError:
+                LOGGER.warning("BIG-IP %s changed while retrieved, "
+                               "attempt %d of %d.", request[1], attempt,
+                               PAGED_RETRIEVAL_ATTEMPTS)
+        raise cccl_exc.F5CcclCacheRefreshError(
+            "BigIPProxy: {} changed while retrieved.".format(request[1]))
+
+    def _get_collections(self, requests_list, phase="refresh"):
+        """Retrieve a set of collections from the BIG-IP.
+
+        If the proxy was configured with more than one refresh worker,
+        the collections are retrieved concurrently; otherwise they are
+        retrieved one at a time.  In either case, the first exception
+        raised by a retrieval is raised to the caller.
+
+        Args:
+            requests_list: List of (key, description, collection, query)
+            tuples describing the collections to retrieve.
+            phase: Name of the phase to report the retrieval times in.
+
+        Returns:
+            A dictionary of the retrieved collections indexed by key.
+        """
+        def get_collection(request):
+            """Retrieve a single collection."""
+            with self._report.timer("{}.{}".format(phase, request[0])):
+                return self._get_collection(*request[1:])
+
+        workers = min(self._refresh_workers, len(requests_list))
+        if workers <= 1:
+            results = [get_collection(r) for r in requests_list]
+        else:
+            thread_pool = ThreadPool(workers)
+            try:
+                results = thread_pool.map(get_collection, requests_list)
+            finally:
+                thread_pool.terminate()
+
+        return {
+            request[0]: result
+            for request, result in zip(requests_list, results)
+        }
+
     def _refresh_ltm(self):  # pylint: disable=too-many-locals
         """Refresh the internal ltm cache with the BIG-IP state."""
         start_time = time()
 
         partition_filter = "$filter=partition+eq+{}".format(self._partition)
 
-        #  Retrieve the list of virtual servers in managed partition.
         query = partition_filter
 
-        #  Retrieve the lists of health monitors
-        LOGGER.debug("Retrieving http_monitors from BIG-IP /%s...",
-                     self._partition)
-        http_monitors = self._bigip.tm.ltm.monitor.https.get_collection(
-            requests_params={"params": query})
-        LOGGER.debug("Retrieving https_monitors from BIG-IP /%s...",
-                     self._partition)
-        https_monitors = self._bigip.tm.ltm.monitor.https_s.get_collection(
-            requests_params={"params": query})
-        LOGGER.debug("Retrieving tcp_monitors from BIG-IP /%s...",
-                     self._partition)
-        tcp_monitors = self._bigip.tm.ltm.monitor.tcps.get_collection(
-            requests_params={"params": query})
-        LOGGER.debug("Retrieving udp_monitors from BIG-IP /%s...",
-                     self._partition)
-        udp_monitors = self._bigip.tm.ltm.monitor.udps.get_collection(
-            requests_params={"params": query})
-        LOGGER.debug("Retrieving gateway icmp_monitors from BIG-IP /%s...",
-                     self._partition)
-        icmp_monitors = (
-            self._bigip.tm.ltm.monitor.gateway_icmps.get_collection(
-                requests_params={"params": query})
-        )
-        LOGGER.debug("Retrieving iApps from BIG-IP /%s...",
-                     self._partition)
-        iapps = self._bigip.tm.sys.application.services.get_collection(
-            requests_params={"params": query})
-        LOGGER.debug("Retrieving nodes from BIG-IP /%s...",
-                     self._partition)
-        nodes = self._bigip.tm.ltm.nodes.get_collection(
-            requests_params={"params": query})
-        LOGGER.debug("Retrieving virtual addresses from BIG-IP /%s...",
-                     self._partition)
-        virtual_addresses = \
-            self._bigip.tm.ltm.virtual_address_s.get_collection(
-                requests_params={"params": query})
-
-        LOGGER.debug("Retrieving LTM iRules from BIG-IP /%s...",
-                     self._partition)
-        irules = self._bigip.tm.ltm.rules.get_collection(
-            requests_params={"params": query})
-
-        LOGGER.debug("Retrieving LTM Internal data-groups from BIG-IP /%s...",
-                     self._partition)
-        int_dgs = self._bigip.tm.ltm.data_group.internals.get_collection(
-            requests_params={"params": query})
-
         #  Retrieve the list of virtuals, pools, and policies in the
         #  managed partition getting all subCollections.
-        query = "{}&expandSubcollections=true".format(partition_filter)
-
-        LOGGER.debug("Retrieving virtual servers from BIG-IP /%s...",
-                     self._partition)
-        virtuals = self._bigip.tm.ltm.virtuals.get_collection(
-            requests_params={"params": query})
-
-        LOGGER.debug("Retrieving pools from BIG-IP /%s...",
-                     self._partition)
-        pools = self._bigip.tm.ltm.pools.get_collection(
-            requests_params={"params": query})
+        expand_query = "{}&expandSubcollections=true".format(
+            partition_filter)
+        virtual_query = pool_query = policy_query = expand_query
+        if self._select_fields:
+            virtual_query = "{}&{}".format(expand_query, _select_query(
+                VirtualServer, subcollections=('profiles', 'policies')))
+            pool_query = "{}&{}".format(expand_query, _select_query(Pool))
+            policy_query = "{}&{}".format(expand_query, _select_query(
+                Policy, subcollections=('rules',), extra_fields=('status',)))
+
+        ltm = self._bigip.tm.ltm
+        requests_list = [
+            ('http_monitors', "http_monitors", ltm.monitor.https, query),
+            ('https_monitors', "https_monitors", ltm.monitor.https_s, query),
+            ('tcp_monitors', "tcp_monitors", ltm.monitor.tcps, query),
+            ('udp_monitors', "udp_monitors", ltm.monitor.udps, query),
+            ('icmp_monitors', "gateway icmp_monitors",
+             ltm.monitor.gateway_icmps, query),
+            ('iapps', "iApps", self._bigip.tm.sys.application.services,
+             query),
+            ('nodes', "nodes", ltm.nodes, query),
+            ('virtual_addresses', "virtual addresses", ltm.virtual_address_s,
+             query),
+            ('irules', "LTM iRules", ltm.rules, query),
+            ('int_dgs', "LTM Internal data-groups", ltm.data_group.internals,
+             query),
+            ('virtuals', "virtual servers", ltm.virtuals, virtual_query),
+            ('pools', "pools", ltm.pools, pool_query),
+            ('policies', "LTM policies", ltm.policys, policy_query)
+        ]
 
-        LOGGER.debug("Retrieving LTM policies from BIG-IP /%s...",
-                     self._partition)
-        all_policies = self._bigip.tm.ltm.policys.get_collection(
-            requests_params={"params": query})
+        #  The pools and nodes, the largest collections, are cached page by
+        #  page when the collections are paged.
+        streamed = dict()
+        if self._page_size > 0:
+            streamed = dict(
+                (request[0], request) for request in requests_list
+                if request[0] in ('pools', 'nodes'))
+        collections = self._get_collections(
+            [r for r in requests_list if r[0] not in streamed])
+
+        def create_resources(key, create):
+            """Create the resources of a collection with 'create'."""
+            if key in streamed:
+                return self._stream_collection(streamed[key], create)
+            return create(collections[key])
+
+        http_monitors = collections['http_monitors']
+        https_monitors = collections['https_monitors']
+        tcp_monitors = collections['tcp_monitors']
+        udp_monitors = collections['udp_monitors']
+        icmp_monitors = collections['icmp_monitors']
+        iapps = collections['iapps']
+        virtual_addresses = collections['virtual_addresses']
+        irules = collections['irules']
+        int_dgs = collections['int_dgs']
+        virtuals = collections['virtuals']
+        all_policies = collections['policies']
 
         #  Delete non-legacy policies
         policies = [
@@ -285,90 +758,161 @@ class BigIPProxy(object):
         ]
 
         #  Refresh the virtuals cache.
+        self._all_virtuals = self._create_resources(IcrVirtualServer,
+                                                    virtuals)
         self._virtuals = {
-            v.name: self._create_resource(IcrVirtualServer, v)
+            v.name: self._all_virtuals[v.name]
             for v in virtuals if self._manageable_resource(v)
         }
 
-        #  Refresh the virtuals cache.
-        self._all_virtuals = {
-            v.name: self._create_resource(IcrVirtualServer, v)
-            for v in virtuals
-        }
-
-        #  Refresh the virtual address cache.
-        self._virtual_addresses = {
-            v.name: self._create_resource(IcrVirtualAddress, v)
-            for v in virtual_addresses if self._manageable_resource(v)
-        }
-
         #  Refresh the pool cache
-        self._pools = {
-            p.name: self._create_resource(IcrPool, p)
-            for p in pools if self._manageable_resource(p)
-        }
-
-        #  Refresh the all-pool cache
-        self._all_pools = {
-            p.name: self._create_resource(IcrPool, p)
-            for p in pools
-        }
+        (self._all_pools, self._pools) = create_resources(
+            'pools', lambda pools: self._create_managed_resources(
+                IcrPool, pools))
 
         #  Refresh the iRule cache
-        self._irules = {
-            p.name: self._create_resource(IcrIRule, p)
-            for p in irules if self._manageable_resource(p)
-        }
+        self._irules = self._create_resources(
+            IcrIRule,
+            [p for p in irules if self._manageable_resource(p)])
 
         #  Refresh the data_group cache
-        self._internal_data_groups = {
-            p.name: self._create_resource(IcrInternalDataGroup, p)
-            for p in int_dgs if self._manageable_resource(p)
-        }
+        self._internal_data_groups = self._create_resources(
+            IcrInternalDataGroup,
+            [p for p in int_dgs if self._manageable_resource(p)])
 
         #  Refresh the policy cache
-        self._policies = {
-            p.name: self._create_resource(IcrPolicy, p)
-            for p in policies if self._manageable_resource(p)
-        }
+        self._policies = self._create_resources(IcrPolicy, policies)
 
         #  Refresh the iapp cache
-        self._iapps = {
-            i.name: self._create_resource(IcrApplicationService, i)
-            for i in iapps if i.name.startswith(self._prefix)
-        }
+        self._iapps = self._create_resources(
+            IcrApplicationService,
+            [i for i in iapps if i.name.startswith(self._prefix)])
 
-        #  Refresh the node cache
-        self._nodes = {
-            n.name: self._create_resource(Node, n)
-            for n in nodes
-        }
+        create_resources(
+            'nodes', lambda nodes: self._update_address_caches(
+                nodes, virtual_addresses))
 
         #  Refresh the health monitor cache
-        self._monitors['http'] = {
-            m.name: self._create_resource(IcrHTTPMonitor, m)
-            for m in http_monitors if self._manageable_resource(m)
-        }
-        self._monitors['https'] = {
-            m.name: self._create_resource(IcrHTTPSMonitor, m)
-            for m in https_monitors if self._manageable_resource(m)
-        }
-        self._monitors['tcp'] = {
-            m.name: self._create_resource(IcrTCPMonitor, m)
-            for m in tcp_monitors if self._manageable_resource(m)
-        }
-        self._monitors['icmp'] = {
-            m.name: self._create_resource(IcrICMPMonitor, m)
-            for m in icmp_monitors if self._manageable_resource(m)
-        }
-        self._monitors['udp'] = {
-            m.name: self._create_resource(IcrUDPMonitor, m)
-            for m in udp_monitors if self._manageable_resource(m)
-        }
+        self._monitors['http'] = self._create_resources(
+            IcrHTTPMonitor,
+            [m for m in http_monitors if self._manageable_resource(m)])
+        self._monitors['https'] = self._create_resources(
+            IcrHTTPSMonitor,
+            [m for m in https_monitors if self._manageable_resource(m)])
+        self._monitors['tcp'] = self._create_resources(
+            IcrTCPMonitor,
+            [m for m in tcp_monitors if self._manageable_resource(m)])
+        self._monitors['icmp'] = self._create_resources(
+            IcrICMPMonitor,
+            [m for m in icmp_monitors if self._manageable_resource(m)])
+        self._monitors['udp'] = self._create_resources(
+            IcrUDPMonitor,
+            [m for m in udp_monitors if self._manageable_resource(m)])
 
         LOGGER.debug(
             "BIG-IP ltm refresh took %.5f seconds.", (time() - start_time))
 
+    def _refresh_ltm_addresses(self):
+        """Refresh the internal node and virtual address caches."""
+        start_time = time()
+
+        query = "$filter=partition+eq+{}".format(self._partition)
+
+        ltm = self._bigip.tm.ltm
+        collections = self._get_collections([
+            ('nodes', "nodes", ltm.nodes, query),
+            ('virtual_addresses', "virtual addresses", ltm.virtual_address_s,
+             query)
+        ], phase="refresh_addresses")
+        self._update_address_caches(collections['nodes'],
+                                    collections['virtual_addresses'])
+
+        LOGGER.debug(
+            "BIG-IP ltm address refresh took %.5f seconds.",
+            (time() - start_time))
+
+    def _update_address_caches(self, nodes, virtual_addresses):
+        """Rebuild the node and virtual address caches."""
+        #  Refresh the virtual address cache.
+        self._virtual_addresses = self._create_resources(
+            IcrVirtualAddress,
+            [v for v in virtual_addresses if self._manageable_resource(v)])
+
+        #  Refresh the node cache
+        self._nodes = self._create_resources(Node, nodes)
+        self._node_index = dict(
+            (node.address_key(), node) for node in self._nodes.values())
+
+    def _get_cache_indexes(self, resource):
+        """Get the cached indexes that hold resources of this type."""
+        if isinstance(resource, VirtualServer):
+            return [self._virtuals, self._all_virtuals]
+        elif isinstance(resource, Pool):
+            return [self._pools, self._all_pools]
+        elif isinstance(resource, Policy):
+            return [self._policies]
+        elif isinstance(resource, IRule):
+            return [self._irules]
+        elif isinstance(resource, InternalDataGroup):
+            return [self._internal_data_groups]
+        elif isinstance(resource, ApplicationService):
+            return [self._iapps]
+        elif isinstance(resource, VirtualAddress):
+            return [self._virtual_addresses]
+        elif isinstance(resource, Node):
+            return [self._nodes]
+        elif isinstance(resource, HTTPMonitor):
+            return [self._monitors.setdefault('http', dict())]
+        elif isinstance(resource, HTTPSMonitor):
+            return [self._monitors.setdefault('https', dict())]
+        elif isinstance(resource, TCPMonitor):
+            return [self._monitors.setdefault('tcp', dict())]
+        elif isinstance(resource, ICMPMonitor):
+            return [self._monitors.setdefault('icmp', dict())]
+        elif isinstance(resource, UDPMonitor):
+            return [self._monitors.setdefault('udp', dict())]
+        elif isinstance(resource, Arp):
+            return [self._arps]
+        elif isinstance(resource, FDBTunnel):
+            if resource.name.startswith(self._prefix):
+                return [self._fdb_tunnels, self._all_fdb_tunnels]
+            return [self._all_fdb_tunnels]
+
+        LOGGER.warning("No cache for resource of type %s",
+                       resource.classname())
+        return []
+
+    def cache_resource(self, resource):
+        """Add or replace a resource in the cached BIG-IP state.
+
+        This is used to apply a successful create or update to the cache,
+        so that it reflects the state of the BIG-IP without a refresh.
+        """
+        for index in self._get_cache_indexes(resource):
+            index[resource.name] = resource
+        if isinstance(resource, Node):
+            self._node_index[resource.address_key()] = resource
+
+    def uncache_resource(self, resource):
+        """Remove a resource from the cached BIG-IP state.
+
+        This is used to apply a successful delete to the cache, so that it
+        reflects the state of the BIG-IP without a refresh.
+        """
+        for index in self._get_cache_indexes(resource):
+            index.pop(resource.name, None)
+        if isinstance(resource, Node):
+            node = self._node_index.get(resource.address_key())
+            if node is not None and node.name == resource.name:
+                del self._node_index[resource.address_key()]
+
+    def get_cached_resource(self, resource):
+        """Get the cached state of a resource, or None if it is not cached."""
+        for index in self._get_cache_indexes(resource):
+            if resource.name in index:
+                return index[resource.name]
+        return None
+
     def _refresh_net(self):
         """Refresh the internal net cache with the BIG-IP state."""
         start_time = time()
@@ -376,8 +920,9 @@ class BigIPProxy(object):
 
         # Retrieve the list of arps
         LOGGER.debug("Retrieving arps from BIG-IP /%s...", self._partition)
-        arps = self._bigip.tm.net.arps.get_collection(
-            requests_params={"params": query})
+        with self._report.timer("refresh.arps"):
+            arps = self._bigip.tm.net.arps.get_collection(
+                requests_params={"params": query})
 
         # Retrieve the list of tunnels
         # WORKAROUND: We don't pass the request_params in the fdb tunnel case,
@@ -387,23 +932,20 @@ class BigIPProxy(object):
         # our local list.
         LOGGER.debug(
             "Retrieving fdb tunnels from BIG-IP /%s...", self._partition)
-        tunnels = self._bigip.tm.net.fdb.tunnels.get_collection()
+        with self._report.timer("refresh.fdb_tunnels"):
+            tunnels = self._bigip.tm.net.fdb.tunnels.get_collection()
 
         # Refresh the arp cache
-        self._arps = {
-            a.name: self._create_resource(IcrArp, a)
-            for a in arps if self._manageable_resource(a)
-        }
+        self._arps = self._create_resources(
+            IcrArp,
+            [a for a in arps if self._manageable_resource(a)])
 
         # Refresh the tunnel cache
+        tunnels = [t for t in tunnels if t.partition == self._partition]
+        self._all_fdb_tunnels = self._create_resources(IcrFDBTunnel, tunnels)
         self._fdb_tunnels = {
-            t.name: self._create_resource(IcrFDBTunnel, t)
-            for t in tunnels if (self._manageable_resource(t) and
-                                 t.partition == self._partition)
-        }
-        self._all_fdb_tunnels = {
-            t.name: self._create_resource(IcrFDBTunnel, t)
-            for t in tunnels if t.partition == self._partition
+            t.name: self._all_fdb_tunnels[t.name]
+            for t in tunnels if self._manageable_resource(t)
         }
 
         LOGGER.debug(
@@ -468,6 +1010,10 @@ class BigIPProxy(object):
         """Return the index of nodes."""
         return self._nodes
 
+    def get_node_index(self):
+        """Return the index of nodes by (address, route domain id)."""
+        return self._node_index
+
     def get_virtual_addresses(self):
         """Return the index of virtual_addresses."""
         return self._virtual_addresses
@@ -16,8 +16,11 @@
 # limitations under the License.
 #
 
+import json
 import logging
 
+from requests.utils import quote as urlquote
+
 from f5_cccl.resource import Resource
 
 
@@ -80,17 +83,51 @@ class ApplicationService(Resource):
     def __hash__(self):  # pylint: disable=useless-super-delegation
         return super(ApplicationService, self).__hash__()
 
+    def changed_fields(self, existing):  # pylint: disable=unused-argument
+        """Application services are always redeployed as a whole."""
+        return None
+
+    def _canonical_data(self):
+        """Get the application service with its variables and tables sorted.
+
+        The variables and tables are compared regardless of their order,
+        the rows of a table are kept in order.
+        """
+        canonical_data = dict(self._data)
+        for key in ['variables', 'tables']:
+            canonical_data[key] = sorted(
+                self._data.get(key, list()),
+                key=lambda item: json.dumps(item, sort_keys=True,
+                                            default=str))
+        return canonical_data
+
     def _uri_path(self, bigip):
         return bigip.tm.sys.application.services.service
 
-    def update(self, bigip, data=None, modify=False):
+    def _item_uri(self, bigip):
+        """Get the iControl REST URI of this application service.
+
+        The application service is in the folder of its iApp, for example:
+
+        /mgmt/tm/sys/application/service/~Common~app1.app~app1
+        """
+        return "{0}~{1}~{2}.app~{2}".format(self._collection_uri(bigip),
+                                            self.partition,
+                                            urlquote(self.name))
+
+    def update(self, bigip, data=None, modify=False, direct=False,
+               headers=None):
         """Update an iApp Application Service.
 
         Args:
             bigip (f5.bigip.ManagementRoot): F5 SDK session object
         """
-        self._data['executeAction'] = 'definition'
-        super(ApplicationService, self).update(bigip, data=data, modify=modify)
+        # The desired resource may be reused, so it is not modified.
+        data = dict(data if data is not None else self._data)
+        data['executeAction'] = 'definition'
+        super(ApplicationService, self).update(
+            bigip, data=data, modify=modify, direct=direct,
+            headers=headers)
 
 
 class IcrApplicationService(ApplicationService):
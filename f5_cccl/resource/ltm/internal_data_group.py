@@ -16,20 +16,53 @@
 # limitations under the License.
 #
 
-from copy import deepcopy
 import logging
 
+from icontrol.exceptions import iControlUnexpectedHTTPError
+from requests.utils import quote as urlquote
+
 from f5_cccl.resource import Resource
 
 
 LOGGER = logging.getLogger(__name__)
 
+# Maximum number of records sent in a single request.
+RECORDS_CHUNK_SIZE = 100
+
 
 def get_record_key(record):
     """Allows data groups to be sorted by the 'name' member."""
     return record.get('name', '')
 
 
+def _tmsh_string(value):
+    """Quote a string for a tmsh command."""
+    value = u"{}".format(value)
+    return u'"{}"'.format(value.replace('\\', '\\\\').replace('"', '\\"'))
+
+
+def _records_option(action, records):
+    """Get the tmsh option that adds, modifies or deletes records."""
+    if action == 'delete':
+        items = [_tmsh_string(record['name']) for record in records]
+    else:
+        items = list()
+        for record in records:
+            if record.get('data') is None:
+                items.append("{} {{ }}".format(_tmsh_string(record['name'])))
+            else:
+                items.append("{} {{ data {} }}".format(
+                    _tmsh_string(record['name']),
+                    _tmsh_string(record['data'])))
+    return "records {} {{ {} }}".format(action, " ".join(items))
+
+
+def _chunks(records, chunk_size):
+    """Split a list of records into lists of at most chunk_size records."""
+    return [records[index:index + chunk_size]
+            for index in range(0, len(records), chunk_size)]
+
+
 class InternalDataGroup(Resource):
     """InternalDataGroup class."""
     # The property names class attribute defines the names of the
@@ -48,6 +81,7 @@ class InternalDataGroup(Resource):
         self._data['type'] = data.get('type', '')
         records = data.get('records', list())
         self._data['records'] = sorted(records, key=get_record_key)
+        self._record_index = None
 
     def __eq__(self, other_dg):
         """Check the equality of the two objects.
@@ -71,18 +105,118 @@ class InternalDataGroup(Resource):
     def __str__(self):
         return str(self._data)
 
-    def update(self, bigip, data=None, modify=False):
+    def changed_fields(self, existing):
+        """Get the changed fields, without the immutable type.
+
+        The records are not included, they are updated with
+        update_records.
+        """
+        changed = super(InternalDataGroup, self).changed_fields(existing)
+        if changed is not None:
+            changed.pop('type', None)
+            changed.pop('records', None)
+        return changed
+
+    def update(self, bigip, data=None, modify=False, direct=False,
+               headers=None):
         """Override of base class implemntation, required because data-groups
            are picky about what data can exist in the object when modifying.
         """
-        tmp_copy = deepcopy(self)
-        tmp_copy.do_update(bigip, data, modify)
-
-    def do_update(self, bigip, data, modify):
-        """Remove 'type' before doing the update."""
-        del self._data['type']
+        if data is None:
+            data = dict((key, value) for (key, value) in self._data.items()
+                        if key != 'type')
         super(InternalDataGroup, self).update(
-            bigip, data=data, modify=modify)
+            bigip, data=data, modify=modify, direct=direct,
+            headers=headers)
+
+    def record_index(self):
+        """Get the records of the data group indexed by name."""
+        if self._record_index is None:
+            self._record_index = dict(
+                (record['name'], record) for record in self._data['records'])
+        return self._record_index
+
+    def record_changes(self, existing):
+        """Get the records to add, modify and delete on a data group.
+
+        :param existing: The existing data group.
+
+        :returns: Tuple of the lists of records to add, to modify and to
+        delete.
+        """
+        desired_records = self.record_index()
+        existing_records = existing.record_index()
+
+        add_records = list()
+        modify_records = list()
+        for record in self._data['records']:
+            existing_record = existing_records.get(record['name'])
+            if existing_record is None:
+                add_records.append(record)
+            elif record != existing_record:
+                modify_records.append(record)
+        delete_records = [
+            record for record in existing.data['records']
+            if record['name'] not in desired_records
+        ]
+
+        return (add_records, modify_records, delete_records)
+
+    def update_records(self, bigip, existing,
+                       chunk_size=RECORDS_CHUNK_SIZE):
+        """Update the records of an existing data group.
+
+        Small changes are sent as tmsh options that add, modify and delete
+        the records that changed, with at most chunk_size records in a
+        request.  If more than half of the records changed, the data group
+        is replaced with all of its records in a single request, so that it
+        never holds only part of its records.
+
+        Args:
+            bigip: BigIP instance to use for updating the data group.
+            existing: The cached state of the data group.
+            chunk_size: Maximum number of records in a request.
+
+        Raises:
+            F5CcclResourceUpdateError: the records cannot be updated for an
+            unspecified reason.
+
+            F5CcclResourceNotFoundError: the data group does not exist on
+            the BIG-IP
+        """
+        (add_records, modify_records, delete_records) = (
+            self.record_changes(existing))
+        changes = len(add_records) + len(modify_records) + len(delete_records)
+        if not changes:
+            return
+
+        if changes * 2 > len(self._data['records']):
+            LOGGER.info("Replacing %d records of data group /%s/%s",
+                        len(self._data['records']),
+                        self.partition, self.name)
+            self.update(bigip, direct=True)
+            return
+
+        LOGGER.info("Updating %d records of data group /%s/%s",
+                    changes, self.partition, self.name)
+        options = (
+            [("delete", chunk)
+             for chunk in _chunks(delete_records, chunk_size)] +
+            [("modify", chunk)
+             for chunk in _chunks(modify_records, chunk_size)] +
+            [("add", chunk)
+             for chunk in _chunks(add_records, chunk_size)])
+
+        uri = self._item_uri(bigip)
+        icr_session = bigip._meta_data['icr_session']
+        try:
+            for (action, records) in options:
+                icr_session.patch(
+                    uri, json={},
+                    params="options={}".format(
+                        urlquote(_records_option(action, records), safe='')))
+        except iControlUnexpectedHTTPError as err:
+            self._handle_http_error(err)
 
 
 class IcrInternalDataGroup(InternalDataGroup):
@@ -68,11 +68,33 @@ class Node(Resource):
     def __hash__(self):  # pylint: disable=useless-super-delegation
         return super(Node, self).__hash__()
 
+    def changed_fields(self, existing):
+        """Get the changed fields, without the immutable address."""
+        changed = super(Node, self).changed_fields(existing)
+        if changed is not None:
+            changed.pop('address', None)
+        return changed
+
+    def _canonical_data(self):
+        """Nodes compare their states, not their data."""
+        return None
+
+    def address_key(self):
+        """Get the (address, route domain id) of the node."""
+        address = self._data['address'] or ""
+        if '%' in address:
+            (address, route_domain) = address.split('%', 1)
+            return (address, int(route_domain))
+        return (address, 0)
+
     def _uri_path(self, bigip):
         return bigip.tm.ltm.nodes.node
 
-    def update(self, bigip, data=None, modify=False):
+    def update(self, bigip, data=None, modify=False, direct=False,
+               headers=None):
         # 'address' is immutable, don't pass it in an update operation
         tmp_data = deepcopy(data) if data is not None else deepcopy(self.data)
         tmp_data.pop('address', None)
-        super(Node, self).update(bigip, data=tmp_data, modify=modify)
+        super(Node, self).update(
+            bigip, data=tmp_data, modify=modify, direct=direct,
+            headers=headers)
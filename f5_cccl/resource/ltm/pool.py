@@ -90,6 +90,43 @@ class Pool(Resource):
 
         return self_monitor_list == other_monitor_list
 
+    def changed_fields(self, existing):
+        """Get the changed pool properties, without the pool members.
+
+        The members subcollection is not included, members are updated
+        with their own requests.
+        """
+        if not isinstance(existing, Pool):
+            return None
+
+        changed = dict(
+            (key, self._data[key]) for key in self.properties
+            if key not in ['name', 'partition', 'membersReference',
+                           'monitor'] and
+            self._data[key] != existing.data.get(key, None))
+        if not self._monitors_equal(existing):
+            changed['monitor'] = self._data['monitor']
+
+        return changed
+
+    def _canonical_data(self):
+        """Get the pool properties with its members and monitors sorted."""
+        canonical_data = dict(
+            (key, self._data.get(key)) for key in self.properties
+            if key != 'membersReference' and key != 'monitor')
+        canonical_data['monitor'] = sorted(
+            [m.rstrip() for m in self._data['monitor'].split(" and ")])
+
+        members = list()
+        for member in sorted(self.members, key=lambda m: m.name):
+            member_data = member._canonical_data()
+            if member_data is None:
+                return None
+            members.append(member_data)
+        canonical_data['members'] = members
+
+        return canonical_data
+
     def __hash__(self):  # pylint: disable=useless-super-delegation
         return super(Pool, self).__hash__()
 
@@ -85,6 +85,38 @@ class PoolMember(Resource):
         return ("monitor" in self.data['session'] or
                 "monitor" in other_session)
 
+    def changed_fields(self, existing):
+        """Get the changed member properties.
+
+        The session is only included if it is not equivalent to the
+        existing one.
+        """
+        if not isinstance(existing, PoolMember):
+            return None
+
+        changed = dict(
+            (key, self._data[key]) for key in self.properties
+            if key not in ['name', 'partition'] and
+            self._data[key] != existing.data.get(key, None))
+        if 'session' in changed and self._check_states(existing):
+            del changed['session']
+
+        return changed
+
+    def _canonical_data(self):
+        """Get the member properties with equivalent sessions merged.
+
+        A 'user-enabled' session is equal to any monitor session, so they
+        are represented by the same value.
+        """
+        canonical_data = dict(
+            (key, self._data.get(key)) for key in self.properties)
+        session = canonical_data['session']
+        if session == "user-enabled" or "monitor" in (session or ""):
+            canonical_data['session'] = "monitor-enabled"
+
+        return canonical_data
+
     def _strip_route_domain_zero(self, name):
         """Remove the route domain from the address, if 0."""
         match = self.member_name_re.match(name)
@@ -98,6 +130,17 @@ class PoolMember(Resource):
                     match.group(1), match.group(3))
         return name
 
+    def address_key(self):
+        """Get the (address, route domain id) of the pool member node."""
+        name = self._data['name']
+        if '%' in name:
+            (address, route_domain) = name.split('%', 1)
+            return (address, int(re.split("[.:]", route_domain)[0]))
+        elif name.count(':') > 1:
+            # IPv6 <address>.<port>
+            return (name.rsplit('.', 1)[0], 0)
+        return (name.rsplit(':', 1)[0], 0)
+
     def _uri_path(self, bigip):
         if not self._pool:
             LOGGER.error(
@@ -107,6 +150,20 @@ class PoolMember(Resource):
         with self._pool.read(bigip) as pool:
             return pool.members_s.members
 
+    def _collection_uri(self, bigip):
+        """Get the members subcollection URI without reading the pool."""
+        if self._pool is None:
+            LOGGER.error(
+                "Performing REST operation on pool member not supported.")
+            raise NotImplementedError
+
+        return "{}/members/".format(self._pool._item_uri(bigip))
+
+    def _item_uri(self, bigip):
+        # The member name is already quoted.
+        return "{}~{}~{}".format(
+            self._collection_uri(bigip), self.partition, self.name)
+
     @property
     def name(self):
         u"""Override the name property to get quoted format.
@@ -363,3 +363,21 @@ def test_uri_path(bigip):
     assert appsvc
 
     assert appsvc._uri_path(bigip) == bigip.tm.sys.application.services.service
+
+
+def test_fingerprint():
+    """Test that the fingerprint does not depend on the variables order."""
+    appsvc1 = ApiApplicationService(**cfg_test)
+    appsvc2 = deepcopy(appsvc1)
+    appsvc2.data['variables'].reverse()
+    appsvc2.data['tables'].reverse()
+
+    assert appsvc1.data['variables'] != appsvc2.data['variables']
+    assert appsvc1.fingerprint == appsvc2.fingerprint
+    assert appsvc1.matches(appsvc2)
+    assert appsvc1 == appsvc2
+
+    appsvc3 = deepcopy(appsvc1)
+    appsvc3.data['variables'][0]['value'] = "changed"
+    assert appsvc1.fingerprint != appsvc3.fingerprint
+    assert not appsvc1.matches(appsvc3)
@@ -131,3 +131,84 @@ def test_uri_path(bigip):
     )
     assert idg
     assert idg._uri_path(bigip) == bigip.tm.ltm.data_group.internals.internal
+
+
+def _data_group(records):
+    return InternalDataGroup(
+        name='test_dg', partition='my_partition', type='string',
+        records=[{'name': name, 'data': data} for (name, data) in records])
+
+
+def _mgmt_root():
+    mgmt_root = Mock()
+    mgmt_root._meta_data = {'icr_session': Mock()}
+    internals = Mock()
+    internals._meta_data = {
+        'uri': "https://localhost/mgmt/tm/ltm/data-group/internal/"}
+    mgmt_root.tm.ltm.data_group.internals.internal._meta_data = {
+        'container': internals}
+    return mgmt_root
+
+
+def test_update_without_type(bigip):
+    """Test that an update does not send the type of the data group."""
+    idg = InternalDataGroup(**cfg_test)
+    obj = bigip.tm.ltm.data_group.internals.internal.load.return_value
+
+    idg.update(bigip)
+
+    assert 'type' not in obj.update.call_args[1]
+    assert idg.data['type'] == 'string'
+
+
+def test_record_changes():
+    """Test the record level changes between two data groups."""
+    existing = _data_group([('a', "1"), ('b', "2"), ('c', "3")])
+    desired = _data_group([('a', "1"), ('b', "4"), ('d', "5")])
+
+    (add_records, modify_records, delete_records) = (
+        desired.record_changes(existing))
+
+    assert add_records == [{'name': 'd', 'data': "5"}]
+    assert modify_records == [{'name': 'b', 'data': "4"}]
+    assert delete_records == [{'name': 'c', 'data': "3"}]
+    assert desired.changed_fields(existing) == {}
+
+
+def test_update_records_options():
+    """Test that a small change only sends the changed records."""
+    mgmt_root = _mgmt_root()
+    icr_session = mgmt_root._meta_data['icr_session']
+    existing = _data_group([(str(i), "pool") for i in range(10)])
+    desired = _data_group([(str(i), "pool") for i in range(1, 10)] +
+                          [('10', "other pool")])
+
+    desired.update_records(mgmt_root, existing)
+
+    uri = ("https://localhost/mgmt/tm/ltm/data-group/internal/"
+           "~my_partition~test_dg")
+    assert icr_session.patch.call_count == 2
+    assert not icr_session.put.called
+    icr_session.patch.assert_any_call(
+        uri, json={}, params="options=records%20delete%20%7B%20%220%22%20%7D")
+    icr_session.patch.assert_any_call(
+        uri, json={},
+        params="options=records%20add%20%7B%20%2210%22%20%7B%20data%20"
+               "%22other%20pool%22%20%7D%20%7D")
+
+
+def test_update_records_replace():
+    """Test that a large change replaces the records in one request."""
+    mgmt_root = _mgmt_root()
+    icr_session = mgmt_root._meta_data['icr_session']
+    existing = _data_group([('a', "1")])
+    desired = _data_group([(str(i), "pool") for i in range(5)])
+
+    desired.update_records(mgmt_root, existing, chunk_size=2)
+
+    assert not icr_session.patch.called
+    icr_session.put.assert_called_once_with(
+        "https://localhost/mgmt/tm/ltm/data-group/internal/"
+        "~my_partition~test_dg",
+        json={'name': 'test_dg', 'partition': 'my_partition',
+              'records': desired.data['records']})
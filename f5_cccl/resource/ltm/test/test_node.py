@@ -140,3 +140,13 @@ def test_uri_path(bigip):
     assert node
 
     assert node._uri_path(bigip) == bigip.tm.ltm.nodes.node
+
+
+def test_node_address_key():
+    """Test the address and route domain of the Node."""
+    node = Node(**cfg_test)
+    assert node.address_key() == ('1.2.3.4', 0)
+
+    node = Node(name='1.2.3.4%2', partition='my_partition',
+                address='1.2.3.4%2')
+    assert node.address_key() == ('1.2.3.4', 2)
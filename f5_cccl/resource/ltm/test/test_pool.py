@@ -215,6 +215,26 @@ def test_compare_bigip_cccl_pools(cccl_pool1, bigip_pool0):
     assert bigip_pool == cccl_pool
 
 
+def test_bigip_cccl_pool_fingerprints(cccl_pool1, bigip_pool0):
+    bigip_pool = IcrPool(**bigip_pool0)
+    cccl_pool = ApiPool(partition="Common", **cccl_pool1)
+
+    assert bigip_pool.fingerprint == cccl_pool.fingerprint
+    assert cccl_pool.matches(bigip_pool)
+
+
+def test_pool_fingerprint_order(cccl_pool1, cccl_pool5):
+    reordered_cfg = dict(cccl_pool1)
+    reordered_cfg['members'] = list(reversed(cccl_pool1['members']))
+    pool1 = ApiPool(partition="Common", **cccl_pool1)
+    reordered = ApiPool(partition="Common", **reordered_cfg)
+    pool5 = ApiPool(partition="Common", **cccl_pool5)
+
+    assert pool1.fingerprint == reordered.fingerprint
+    assert pool1.fingerprint != pool5.fingerprint
+    assert not pool1.matches(pool5)
+
+
 def test_create_bigip_pool_no_members(bigip_pool1):
 
     bigip_pool = IcrPool(**bigip_pool1)
@@ -151,3 +151,33 @@ def test_create_pool_member_with_rd_ipv6(pool, pool_member_with_rd_ipv6):
     # Test data
     assert member.data
     assert member.data['name'] == "2001:0db8:3c4d:0015:0000:0000:abcd:ef12.80"
+
+
+@pytest.mark.parametrize("name, address_key", [
+    ("192.168.100.101:80", ("192.168.100.101", 0)),
+    ("192.168.100.101%0:80", ("192.168.100.101", 0)),
+    ("192.168.100.101%2:80", ("192.168.100.101", 2)),
+    ("2001:db8::ef12.80", ("2001:db8::ef12", 0)),
+    ("2001:db8::ef12%3.80", ("2001:db8::ef12", 3)),
+])
+def test_pool_member_address_key(pool, name, address_key):
+    """Test the address and route domain of the PoolMember node."""
+    member = PoolMember(name=name, partition="Common", pool=pool)
+
+    assert member.address_key() == address_key
+
+
+def test_pool_member_changed_fields(pool):
+    existing = IcrPoolMember(name="10.1.1.1:80", partition="Common",
+                             pool=pool, session="monitor-enabled", ratio=1)
+    desired = PoolMember(name="10.1.1.1:80", partition="Common",
+                         pool=pool, session="user-enabled", ratio=2)
+
+    assert desired.changed_fields(existing) == {'ratio': 2}
+
+    desired = PoolMember(name="10.1.1.1:80", partition="Common",
+                         pool=pool, session="user-disabled", ratio=1)
+    existing = IcrPoolMember(name="10.1.1.1:80", partition="Common",
+                             pool=pool, session="user-enabled", ratio=1)
+
+    assert desired.changed_fields(existing) == {'session': "user-disabled"}
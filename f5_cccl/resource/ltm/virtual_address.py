@@ -47,14 +47,24 @@ class VirtualAddress(Resource):
 
         return super(VirtualAddress, self).__eq__(other)
 
+    def changed_fields(self, existing):
+        """Get the changed fields, without the immutable address."""
+        changed = super(VirtualAddress, self).changed_fields(existing)
+        if changed is not None:
+            changed.pop('address', None)
+        return changed
+
     def _uri_path(self, bigip):
         return bigip.tm.ltm.virtual_address_s.virtual_address
 
-    def update(self, bigip, data=None, modify=False):
+    def update(self, bigip, data=None, modify=False, direct=False,
+               headers=None):
         # 'address' is immutable, don't pass it in an update operation
         tmp_data = deepcopy(data) if data is not None else deepcopy(self.data)
         tmp_data.pop('address', None)
-        super(VirtualAddress, self).update(bigip, data=tmp_data, modify=modify)
+        super(VirtualAddress, self).update(
+            bigip, data=tmp_data, modify=modify, direct=direct,
+            headers=headers)
 
 
 class IcrVirtualAddress(VirtualAddress):
@@ -19,6 +19,7 @@
 import logging
 
 from f5_cccl.resource import Resource
+from requests.utils import quote as urlquote
 
 
 LOGGER = logging.getLogger(__name__)
@@ -28,9 +29,10 @@ class Record(Resource):
     """Record class for managing network configuration on BIG-IP."""
     properties = dict(name=None, endpoint=None)
 
-    def __init__(self, name, **data):
+    def __init__(self, name, tunnel=None, **data):
         """Create a record from CCCL recordType."""
         super(Record, self).__init__(name, partition=None)
+        self._tunnel = tunnel
         self._data['endpoint'] = data.get('endpoint', None)
 
     def __eq__(self, other):
@@ -40,4 +42,20 @@ class Record(Resource):
         return super(Record, self).__eq__(other)
 
     def _uri_path(self, bigip):
-        raise NotImplementedError
+        if self._tunnel is None:
+            raise NotImplementedError
+
+        with self._tunnel.read(bigip) as tunnel:
+            return tunnel.records_s.records
+
+    def _collection_uri(self, bigip):
+        """Get the records subcollection URI without reading the tunnel."""
+        if self._tunnel is None:
+            raise NotImplementedError
+
+        return "{}/records/".format(self._tunnel._item_uri(bigip))
+
+    def _item_uri(self, bigip):
+        # Records are not in a partition.
+        return "{}{}".format(self._collection_uri(bigip),
+                             urlquote(self.name))
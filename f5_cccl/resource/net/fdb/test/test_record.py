@@ -64,3 +64,15 @@ def test_uri_path(bigip):
 
     with pytest.raises(NotImplementedError):
         record._uri_path(bigip)
+
+
+def test_item_uri(bigip):
+    """Test the URI of a tunnel record."""
+    tunnel = Mock()
+    tunnel._item_uri.return_value = (
+        "https://localhost/mgmt/tm/net/fdb/tunnel/~Common~vxlan")
+    record = Record(tunnel=tunnel, **cfg_test)
+
+    assert record._item_uri(bigip) == (
+        "https://localhost/mgmt/tm/net/fdb/tunnel/~Common~vxlan/records/"
+        "12%3Aab%3A34%3Acd%3A56%3Aef")
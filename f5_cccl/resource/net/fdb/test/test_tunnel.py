@@ -114,3 +114,38 @@ def test_uri_path(bigip):
     """Test FDBTunnel URI."""
     tunnel = FDBTunnel(**cfg_test)
     assert tunnel._uri_path(bigip) == bigip.tm.net.fdb.tunnels.tunnel
+
+
+def test_eq_records_order():
+    """Test FDBTunnel equality does not depend on the records order."""
+    tunnel1 = FDBTunnel(**cfg_test)
+    cfg_changed = copy(cfg_test)
+    cfg_changed['records'] = list(reversed(cfg_test['records']))
+    tunnel2 = FDBTunnel(**cfg_changed)
+
+    assert tunnel1 == tunnel2
+    assert tunnel1.fingerprint == tunnel2.fingerprint
+
+
+def test_record_changes():
+    """Test the record level changes between two tunnels."""
+    existing = FDBTunnel(
+        name='test_tunnel', partition='test_partition',
+        records=[{'name': '12:ab:34:cd:56:ef', 'endpoint': '1.2.3.4'},
+                 {'name': '98:ab:76:cd:54:ef', 'endpoint': '4.3.2.1'},
+                 {'name': '56:ab:78:cd:90:ef', 'endpoint': '5.6.7.8'}])
+    desired = FDBTunnel(
+        name='test_tunnel', partition='test_partition',
+        records=[{'name': '12:ab:34:cd:56:ef', 'endpoint': '1.2.3.4'},
+                 {'name': '98:ab:76:cd:54:ef', 'endpoint': '4.3.2.2'},
+                 {'name': '34:ab:56:cd:78:ef', 'endpoint': '3.4.5.6'}])
+
+    (create_records, update_records, delete_records) = (
+        desired.record_changes(existing))
+
+    assert [r.name for r in create_records] == ['34:ab:56:cd:78:ef']
+    assert len(update_records) == 1
+    (record, existing_record) = update_records[0]
+    assert record.changed_fields(existing_record) == {'endpoint': '4.3.2.2'}
+    assert [r.name for r in delete_records] == ['56:ab:78:cd:90:ef']
+    assert desired.changed_fields(existing) == {}
@@ -37,6 +37,7 @@ class FDBTunnel(Resource):
 
         records = data.get('records', list())
         self._data['records'] = self._create_records(records)
+        self._record_index = None
 
     def __eq__(self, other):
         if not isinstance(other, FDBTunnel):
@@ -49,19 +50,74 @@ class FDBTunnel(Resource):
             if key == 'records':
                 if len(self._data[key]) != len(other.data[key]):
                     return False
+                other_records = other.record_index()
                 for record in self._data[key]:
-                    if record not in other.data[key]:
+                    if record != other_records.get(record['name']):
                         return False
-                    else:
-                        idx = other.data[key].index(record)
-                        if record != other.data[key][idx]:
-                            return False
                 continue
             if self._data[key] != other.data.get(key):
                 return False
 
         return True
 
+    def record_index(self):
+        """Get the records of the tunnel indexed by name."""
+        if self._record_index is None:
+            self._record_index = dict(
+                (record['name'], record) for record in self._data['records'])
+        return self._record_index
+
+    def record_changes(self, existing):
+        """Get the records to create, update and delete on a tunnel.
+
+        :param existing: The existing tunnel.
+
+        :returns: Tuple of the lists of Record objects to create, of
+        (Record, existing Record) pairs to update and of Record objects to
+        delete.
+        """
+        desired_records = self.record_index()
+        existing_records = existing.record_index()
+
+        create_records = list()
+        update_records = list()
+        for (name, record) in desired_records.items():
+            existing_record = existing_records.get(name)
+            if existing_record is None:
+                create_records.append(Record(tunnel=self, **record))
+            elif record != existing_record:
+                update_records.append(
+                    (Record(tunnel=self, **record),
+                     Record(tunnel=existing, **existing_record)))
+        delete_records = [
+            Record(tunnel=existing, **record)
+            for (name, record) in existing_records.items()
+            if name not in desired_records
+        ]
+
+        return (create_records, update_records, delete_records)
+
+    def changed_fields(self, existing):
+        """Get the changed tunnel properties, without the records.
+
+        The records subcollection is not included, records are updated
+        with their own requests.
+        """
+        if not isinstance(existing, FDBTunnel):
+            return None
+
+        return dict(
+            (key, self._data[key]) for key in self.properties
+            if key not in ['name', 'partition', 'records'] and
+            self._data[key] != existing.data.get(key))
+
+    def _canonical_data(self):
+        """Get the tunnel data with its records sorted by name."""
+        canonical_data = dict(self._data)
+        canonical_data['records'] = sorted(
+            self._data['records'], key=lambda record: record['name'])
+        return canonical_data
+
     def _create_records(self, records):
         """Create a list of records for the tunnel."""
         new_records = list()
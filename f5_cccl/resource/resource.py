@@ -18,6 +18,8 @@ u"""This module provides class for managing resource configuration."""
 #
 
 import copy
+import hashlib
+import json
 import logging
 
 import f5_cccl.exceptions as cccl_exc
@@ -30,6 +32,11 @@ from requests.utils import quote as urlquote
 LOGGER = logging.getLogger(__name__)
 
 
+def _request_params(headers):
+    u"""Get the keyword arguments of a direct request."""
+    return {'headers': headers} if headers else {}
+
+
 class Resource(object):
     u"""Resource super class to wrap BIG-IP configuration objects.
 
@@ -74,6 +81,7 @@ class Resource(object):
         self._data = dict()
         self._data['name'] = name
         self._data['partition'] = partition
+        self._fingerprint = None
 
     def __eq__(self, resource):
         u"""Compare two resources for equality.
@@ -89,22 +97,76 @@ class Resource(object):
     def __ne__(self, resource):
         return not self.__eq__(resource)
 
+    def changed_fields(self, existing):
+        u"""Get the fields of this resource that differ from another.
+
+        The result can be sent as the data of a modify (PATCH) update of
+        the existing resource.
+
+        Args:
+            existing (Resource): The resource to compare
+        Return:
+            A dictionary of the changed fields, or None if the resource
+            must be updated as a whole.
+        """
+        if not isinstance(existing, Resource):
+            return None
+
+        return dict(
+            (key, value) for (key, value) in self._data.items()
+            if key not in ['name', 'partition'] and
+            value != existing.data.get(key, None))
+
+    def matches(self, resource):
+        u"""Compare two resources, using their fingerprints if possible.
+
+        Resources with the same fingerprint are equal; otherwise the
+        resources are compared with __eq__.
+
+        Args:
+            resource (Resource): The resource to compare
+        Return:
+            True if equal
+            False otherwise
+        """
+        fingerprint = self.fingerprint
+        if (fingerprint is not None and isinstance(resource, Resource) and
+                fingerprint == resource.fingerprint):
+            return True
+        return self.__eq__(resource)
+
     def __hash__(self):
         return hash((self.name, self.partition))
 
+    def __deepcopy__(self, memo):
+        u"""Copy a resource, without its fingerprint.
+
+        The copy may be modified, so its fingerprint is computed again on
+        first use.
+        """
+        result = self.__class__.__new__(self.__class__)
+        memo[id(self)] = result
+        for (key, value) in self.__dict__.items():
+            result.__dict__[key] = copy.deepcopy(value, memo)
+        result._fingerprint = None
+        return result
+
     def __lt__(self, resource):
         return self.full_path() < resource.full_path()
 
     def __str__(self):
         return str(self._data)
 
-    def create(self, bigip):
+    def create(self, bigip, direct=False, headers=None):
         u"""Create resource on a BIG-IP system.
 
         The internal data model is applied to the BIG-IP
 
         Args:
             bigip (f5.bigip.ManagementRoot): F5 SDK session object
+            direct: Send the create to the collection URI in a single
+                request, without building the F5 SDK resource path
+            headers: Additional HTTP headers of the direct request
 
         Returns: created resource object.
 
@@ -118,6 +180,11 @@ class Resource(object):
         LOGGER.info("Creating %s: /%s/%s",
                     self.classname(), self.partition, self.name)
         try:
+            if direct:
+                icr_session = bigip._meta_data['icr_session']
+                return icr_session.post(
+                    self._collection_uri(bigip), json=self._data,
+                    **_request_params(headers)).json()
             obj = self._uri_path(bigip).create(**self._data)
             return obj
         except iControlUnexpectedHTTPError as err:
@@ -154,7 +221,8 @@ class Resource(object):
             LOGGER.error("Load FAILED: /%s/%s", self.partition, self.name)
             raise cccl_exc.F5CcclError(str(err))
 
-    def update(self, bigip, data=None, modify=False):
+    def update(self, bigip, data=None, modify=False, direct=False,
+               headers=None):
         u"""Update a resource (e.g., pool) on a BIG-IP system.
 
         Modifies a resource on a BIG-IP system using attributes
@@ -167,6 +235,9 @@ class Resource(object):
                 for update operation specifically
             modify: Specifies if this is a modify, or patch of specific
                 Key/Value Pairs rather than the whole object
+            direct: Send the update to the resource URI in a single request,
+                without loading the resource first
+            headers: Additional HTTP headers of the direct request
 
         Raises:
             F5CcclResourceUpdateError: resouce cannot be updated for an
@@ -180,10 +251,19 @@ class Resource(object):
         if not data:
             data = self._data
         try:
+            payload = copy.copy(data)
+            if direct:
+                icr_session = bigip._meta_data['icr_session']
+                if modify:
+                    icr_session.patch(self._item_uri(bigip), json=payload,
+                                      **_request_params(headers))
+                else:
+                    icr_session.put(self._item_uri(bigip), json=payload,
+                                    **_request_params(headers))
+                return
             obj = self._uri_path(bigip).load(
                 name=urlquote(self.name),
                 partition=self.partition)
-            payload = copy.copy(data)
             if modify:
                 obj.modify(**payload)
             else:
@@ -194,13 +274,16 @@ class Resource(object):
             LOGGER.error("Update FAILED: /%s/%s", self.partition, self.name)
             raise cccl_exc.F5CcclResourceUpdateError(str(err))
 
-    def delete(self, bigip):
+    def delete(self, bigip, direct=False, headers=None):
         u"""Delete a resource on a BIG-IP system.
 
         Loads a resource and deletes it.
 
         Args:
             bigip: BigIP instance to use for delete resource.
+            direct: Delete the resource URI in a single request, without
+                loading the resource first
+            headers: Additional HTTP headers of the direct request
 
         Raises:
             F5CcclResourceDeleteError: resouce cannot be deleted for an
@@ -212,6 +295,11 @@ class Resource(object):
         LOGGER.info("Deleting %s: /%s/%s",
                     self.classname(), self.partition, self.name)
         try:
+            if direct:
+                icr_session = bigip._meta_data['icr_session']
+                icr_session.delete(self._item_uri(bigip),
+                                   **_request_params(headers))
+                return
             obj = self._uri_path(bigip).load(
                 name=urlquote(self.name),
                 partition=self.partition)
@@ -241,6 +329,33 @@ class Resource(object):
         u"""Get the internal data model for this resource."""
         return self._data
 
+    @property
+    def fingerprint(self):
+        u"""Get the digest of the canonical data of this resource.
+
+        The digest is computed on first use, resources should not be
+        modified afterwards.  Returns None if the resource does not
+        support fingerprints.
+        """
+        if self._fingerprint is None:
+            canonical_data = self._canonical_data()
+            if canonical_data is None:
+                return None
+            serialized = json.dumps(canonical_data, sort_keys=True,
+                                    separators=(',', ':'), default=str)
+            self._fingerprint = hashlib.sha1(
+                serialized.encode('utf-8')).hexdigest()
+        return self._fingerprint
+
+    def _canonical_data(self):
+        u"""Get the data that determines the equality of this resource.
+
+        Two resources with the same canonical data must be equal according
+        to __eq__.  Subclasses whose __eq__ is not implied by equal data
+        return None, so that they are always compared with __eq__.
+        """
+        return self._data
+
     def full_path(self):
         u"""Concatenate the partition and name to form fullPath."""
         return "/{}/{}".format(self.partition, self.name)
@@ -256,6 +371,27 @@ class Resource(object):
         """
         raise NotImplementedError
 
+    def _collection_uri(self, bigip):
+        u"""Get the iControl REST URI of the collection of this resource.
+
+        The URI is taken from the F5 SDK resource path, for example:
+
+        https://10.1.1.1:443/mgmt/tm/ltm/pool/
+        """
+        container = self._uri_path(bigip)._meta_data['container']
+        return container._meta_data['uri']
+
+    def _item_uri(self, bigip):
+        u"""Get the iControl REST URI of this resource.
+
+        For example:
+
+        https://10.1.1.1:443/mgmt/tm/ltm/pool/~Common~pool1
+        """
+        return "{}~{}~{}".format(self._collection_uri(bigip),
+                                 self.partition,
+                                 urlquote(self.name))
+
     def _handle_http_error(self, error):
         u"""Extract the error code and reraise a CCCL Error."""
         code = error.response.status_code
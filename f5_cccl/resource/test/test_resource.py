@@ -14,6 +14,8 @@
 # limitations under the License.
 #
 
+from copy import deepcopy
+
 from f5.sdk_exception import F5SDKError
 import f5_cccl.exceptions as cccl_exc
 from f5_cccl.resource import Resource
@@ -142,6 +144,59 @@ def test_resource_not_equal():
     assert not res1 == res2
 
 
+def test_resource_fingerprint():
+    u"""Test the fingerprint and matches operation for Resources."""
+    data = resource_data()
+
+    res1 = Resource(**data)
+    res2 = Resource(**data)
+    res3 = Resource(name="other_resource", partition="Common")
+
+    assert res1.fingerprint == res2.fingerprint
+    assert res1.fingerprint != res3.fingerprint
+    assert res1.matches(res2)
+    assert not res1.matches(res3)
+
+
+def test_resource_deepcopy_fingerprint():
+    u"""Test that a copy of a Resource computes its own fingerprint."""
+    res1 = Resource(**resource_data())
+    fingerprint = res1.fingerprint
+
+    res2 = deepcopy(res1)
+    res2.data['description'] = "changed"
+
+    assert res1.fingerprint == fingerprint
+    assert res2.fingerprint != fingerprint
+    assert not res1.matches(res2)
+
+
+def test_resource_matches_without_fingerprint():
+    u"""Test that matches falls back to __eq__."""
+    data = resource_data()
+
+    res1 = Resource(**data)
+    res2 = Resource(**data)
+    res1._canonical_data = MagicMock(return_value=None)
+    res1.__eq__ = MagicMock(return_value=True)
+
+    assert res1.fingerprint is None
+    assert res1.matches(res2)
+
+
+def test_resource_changed_fields():
+    u"""Test the fields that differ from another resource."""
+    res1 = Resource(name="test_resource", partition="Common")
+    res2 = Resource(name="test_resource", partition="Common")
+    res1.data['description'] = "new"
+    res1.data['ratio'] = 1
+    res2.data['ratio'] = 1
+
+    assert res1.changed_fields(res2) == {'description': "new"}
+    assert res1.changed_fields(res1) == {}
+    assert res1.changed_fields(None) is None
+
+
 def test_resource_less_than():
     u"""Test the __eq__ operation for Resouces."""
     data = resource_data()
@@ -304,6 +359,51 @@ def test_delete_subresource(bigip):
     bigip.tm.ltm.subresources.subresource.obj.delete.assert_called()
 
 
+def test_update_subresource_direct(bigip):
+    u"""Test that a direct update is sent to the resource URI."""
+    data = resource_data()
+    subres = SubResource(name=data['name'], partition=data['partition'])
+
+    container = bigip.tm.ltm.subresources.subresource._meta_data['container']
+    container._meta_data = {
+        'uri': "https://localhost/mgmt/tm/ltm/subresource/"
+    }
+    icr_session = bigip._meta_data['icr_session']
+    uri = "https://localhost/mgmt/tm/ltm/subresource/~Common~test_resource"
+
+    subres.update(bigip, direct=True)
+    icr_session.put.assert_called_once_with(uri, json=subres.data)
+
+    subres.update(bigip, data={'description': "test"}, modify=True,
+                  direct=True)
+    icr_session.patch.assert_called_once_with(
+        uri, json={'description': "test"})
+
+    subres.delete(bigip, direct=True)
+    icr_session.delete.assert_called_once_with(uri)
+
+    bigip.tm.ltm.subresources.subresource.load.assert_not_called()
+
+
+def test_update_subresource_direct_404_exception(bigip, response):
+    u"""Test direct update and delete handle HTTP 404 not found."""
+    data = resource_data()
+    subres = SubResource(name=data['name'], partition=data['partition'])
+
+    response.status_code = 404
+    icr_session = bigip._meta_data['icr_session']
+    icr_session.put.side_effect = iControlUnexpectedHTTPError(
+        response=response)
+    icr_session.delete.side_effect = iControlUnexpectedHTTPError(
+        response=response)
+
+    with pytest.raises(cccl_exc.F5CcclResourceNotFoundError):
+        subres.update(bigip, direct=True)
+
+    with pytest.raises(cccl_exc.F5CcclResourceNotFoundError):
+        subres.delete(bigip, direct=True)
+
+
 def test_create_subresource_sdk_exception(bigip):
     u"""Test create can handle SDK exception."""
     data = resource_data()
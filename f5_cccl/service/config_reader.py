@@ -19,6 +19,8 @@
 from __future__ import print_function
 
 
+import hashlib
+import json
 import logging
 
 import f5_cccl.exceptions as cccl_error
@@ -31,6 +33,7 @@ from f5_cccl.resource.ltm.monitor.udp_monitor import ApiUDPMonitor
 from f5_cccl.resource.ltm.irule import ApiIRule
 from f5_cccl.resource.ltm.policy import ApiPolicy
 from f5_cccl.resource.ltm.pool import ApiPool
+from f5_cccl.resource.ltm.pool_member import ApiPoolMember
 from f5_cccl.resource.ltm.virtual import ApiVirtualServer
 from f5_cccl.resource.ltm.virtual_address import ApiVirtualAddress
 from f5_cccl.resource.ltm.app_service import ApiApplicationService
@@ -40,6 +43,8 @@ from f5_cccl.resource.ltm.internal_data_group import ApiInternalDataGroup
 from f5_cccl.resource.net.arp import ApiArp
 from f5_cccl.resource.net.fdb.tunnel import ApiFDBTunnel
 
+from f5_cccl.utils.lru_cache import LRUCache
+
 
 LOGGER = logging.getLogger(__name__)
 
@@ -47,9 +52,44 @@ LOGGER = logging.getLogger(__name__)
 class ServiceConfigReader(object):
     """Class that loads a service defined by cccl-api-schema."""
 
-    def __init__(self, partition):
-        """Initializer."""
+    def __init__(self, partition, cache_size=0):
+        """Initializer.
+
+        :param partition: The managed partition.
+        :param cache_size: Maximum number of resources to keep for reuse
+        when their configuration is read again unchanged, 0 to disable.
+        """
         self._partition = partition
+        self._cache = None
+        if cache_size > 0:
+            self._cache = LRUCache(cache_size)
+
+    def _read_config_item(self, resource_type, obj):
+        """Create an API resource object, or reuse an unchanged one.
+
+        The resource objects are cached by the digest of their
+        configuration, so reading a configuration object that did not
+        change returns the resource that was created for it before.
+
+        :param resource_type: The type of resource to create.
+        :param obj: The configuration object.
+        :returns: A resource object.
+        :rtype: f5_cccl.resource.Resource
+        :raises:  f5_cccl.exceptions.F5CcclConfigurationReadError
+        """
+        if self._cache is None:
+            return self._create_config_item(resource_type, obj)
+
+        serialized = json.dumps(obj, sort_keys=True, separators=(',', ':'),
+                                default=str)
+        key = (resource_type.__name__,
+               hashlib.sha1(serialized.encode('utf-8')).hexdigest())
+        config_resource = self._cache.get(key)
+        if config_resource is None:
+            config_resource = self._create_config_item(resource_type, obj)
+            self._cache.put(key, config_resource)
+
+        return config_resource
 
     def _create_config_item(self, resource_type, obj):
         """Create an API resource object and handle exceptions.
@@ -79,6 +119,15 @@ class ServiceConfigReader(object):
 
         return config_resource
 
+    def read_pool_members(self, pool_name, members):
+        """Read a list of pool member configurations of a pool."""
+        pool = ApiPool(name=pool_name, partition=self._partition)
+        return [
+            self._create_config_item(
+                ApiPoolMember, dict(m, name=m.get('name'), pool=pool))
+            for m in members
+        ]
+
     def read_ltm_config(self, service_config):
         """Read the LTM service configuration and save as resource object."""
         config_dict = dict()
@@ -92,38 +141,38 @@ class ServiceConfigReader(object):
 
         virtuals = service_config.get('virtualServers', list())
         config_dict['virtuals'] = {
-            v['name']: self._create_config_item(ApiVirtualServer, v)
+            v['name']: self._read_config_item(ApiVirtualServer, v)
             for v in virtuals
         }
 
         # Get the list of explicitly defined virtual addresses.
         virtual_addresses = service_config.get('virtualAddresses', list())
         config_dict['virtual_addresses'] = {
-            va['name']: self._create_config_item(ApiVirtualAddress, va)
+            va['name']: self._read_config_item(ApiVirtualAddress, va)
             for va in virtual_addresses
         }
 
         pools = service_config.get('pools', list())
         config_dict['pools'] = {
-            p['name']: self._create_config_item(ApiPool, p)
+            p['name']: self._read_config_item(ApiPool, p)
             for p in pools
         }
 
         irules = service_config.get('iRules', list())
         config_dict['irules'] = {
-            p['name']: self._create_config_item(ApiIRule, p)
+            p['name']: self._read_config_item(ApiIRule, p)
             for p in irules
         }
 
         policies = service_config.get('l7Policies', list())
         config_dict['l7policies'] = {
-            p['name']: self._create_config_item(ApiPolicy, p)
+            p['name']: self._read_config_item(ApiPolicy, p)
             for p in policies
         }
 
         internal_dgs = service_config.get('internalDataGroups', list())
         config_dict['internaldatagroups'] = {
-            p['name']: self._create_config_item(ApiInternalDataGroup, p)
+            p['name']: self._read_config_item(ApiInternalDataGroup, p)
             for p in internal_dgs
         }
 
@@ -133,28 +182,28 @@ class ServiceConfigReader(object):
             monitor_name = monitor.get('name', None)
             if monitor_type == "http":
                 config_dict['http_monitors'].update(
-                    {monitor_name: self._create_config_item(
+                    {monitor_name: self._read_config_item(
                         ApiHTTPMonitor, monitor)})
             if monitor_type == "https":
                 config_dict['https_monitors'].update(
-                    {monitor_name: self._create_config_item(
+                    {monitor_name: self._read_config_item(
                         ApiHTTPSMonitor, monitor)})
             if monitor_type == "icmp":
                 config_dict['icmp_monitors'].update(
-                    {monitor_name: self._create_config_item(
+                    {monitor_name: self._read_config_item(
                         ApiICMPMonitor, monitor)})
             if monitor_type == "tcp":
                 config_dict['tcp_monitors'].update(
-                    {monitor_name: self._create_config_item(
+                    {monitor_name: self._read_config_item(
                         ApiTCPMonitor, monitor)})
             if monitor_type == "udp":
                 config_dict['udp_monitors'].update(
-                    {monitor_name: self._create_config_item(
+                    {monitor_name: self._read_config_item(
                         ApiUDPMonitor, monitor)})
 
         iapps = service_config.get('iapps', list())
         config_dict['iapps'] = {
-            i['name']: self._create_config_item(ApiApplicationService, i)
+            i['name']: self._read_config_item(ApiApplicationService, i)
             for i in iapps
         }
 
@@ -166,19 +215,19 @@ class ServiceConfigReader(object):
 
         arps = service_config.get('arps', list())
         config_dict['arps'] = {
-            a['name']: self._create_config_item(ApiArp, a)
+            a['name']: self._read_config_item(ApiArp, a)
             for a in arps
         }
 
         tunnels = service_config.get('fdbTunnels', list())
         config_dict['fdbTunnels'] = {
-            t['name']: self._create_config_item(ApiFDBTunnel, t)
+            t['name']: self._read_config_item(ApiFDBTunnel, t)
             for t in tunnels
         }
 
         user_tunnels = service_config.get('userFdbTunnels', list())
         config_dict['userFdbTunnels'] = {
-            t['name']: self._create_config_item(ApiFDBTunnel, t)
+            t['name']: self._read_config_item(ApiFDBTunnel, t)
             for t in user_tunnels
         }
 
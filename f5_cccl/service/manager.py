@@ -18,13 +18,31 @@
 
 from __future__ import print_function
 
+from contextlib import contextmanager
+import hashlib
+import json
 import logging
 from time import time
 
+from icontrol.exceptions import iControlUnexpectedHTTPError
+
 import f5_cccl.exceptions as exc
 from f5_cccl.service.config_reader import ServiceConfigReader
+from f5_cccl.service.scheduler import TaskScheduler
+from f5_cccl.service.statistics import ServiceStatistics
 from f5_cccl.service.validation import ServiceConfigValidator
+from f5_cccl.resource.ltm.internal_data_group import InternalDataGroup
+from f5_cccl.resource.ltm.irule import IRule
+from f5_cccl.resource.ltm.monitor.monitor import Monitor
 from f5_cccl.resource.ltm.node import Node
+from f5_cccl.resource.ltm.policy import Policy
+from f5_cccl.resource.ltm.pool import Pool
+from f5_cccl.resource.ltm.virtual import VirtualServer
+from f5_cccl.resource.ltm.virtual_address import VirtualAddress
+from f5_cccl.resource.net.fdb.tunnel import FDBTunnel
+from f5_cccl.utils.apply_report import ApplyReport
+from f5_cccl.utils.apply_report import NULL_REPORT
+from f5_cccl.utils.ttl_cache import TTLCache
 
 
 LOGGER = logging.getLogger(__name__)
@@ -33,12 +51,25 @@ LOGGER = logging.getLogger(__name__)
 class ServiceConfigDeployer(object):
     """CCCL config deployer class."""
 
-    def __init__(self, bigip_proxy):
+    def __init__(self, bigip_proxy, direct_writes=False, deploy_workers=1,
+                 transaction_size=0):
         """Initialize the config deployer."""
         self._bigip = bigip_proxy
+        self._direct_writes = direct_writes
+        self._deploy_workers = deploy_workers
+        self._transaction_size = transaction_size
+        self._report = NULL_REPORT
+
+    def set_report(self, report):
+        """Report the timings and counters of the deployment to 'report'."""
+        self._report = report
 
-    def _get_resource_tasks(self, existing, desired):
-        """Get the list of resources to create, delete, update."""
+    def _get_resource_tasks(self, existing, desired, resource_type=None):
+        """Get the list of resources to create, delete, update.
+
+        The time taken is reported as the diff of 'resource_type'.
+        """
+        start_time = time()
         create_list = [
             desired[resource] for resource in
             set(desired) - set(existing)
@@ -46,13 +77,16 @@ class ServiceConfigDeployer(object):
         update_list = set(desired) & set(existing)
         update_list = [
             desired[resource] for resource in update_list
-            if desired[resource] != existing[resource]
+            if not desired[resource].matches(existing[resource])
         ]
         delete_list = [
             existing[resource] for resource in
             set(existing) - set(desired)
         ]
 
+        if resource_type:
+            self._report.add_time(
+                "diff.{}".format(resource_type), time() - start_time)
         return (create_list, update_list, delete_list)
 
     def _create_resources(self, create_list):
@@ -63,6 +97,7 @@ class ServiceConfigDeployer(object):
             try:
                 start_time = time()
                 resource.create(self._bigip.mgmt_root())
+                self._bigip.cache_resource(resource)
                 LOGGER.debug("Created %s in %.5f seconds.",
                              resource.name, (time() - start_time))
             except exc.F5CcclResourceConflictError:
@@ -86,13 +121,22 @@ class ServiceConfigDeployer(object):
         for resource in update_list:
             try:
                 start_time = time()
-                resource.update(self._bigip.mgmt_root())
+                if isinstance(resource, Pool):
+                    self._update_pool(resource)
+                elif isinstance(resource, FDBTunnel):
+                    self._update_tunnel(resource)
+                elif isinstance(resource, InternalDataGroup):
+                    self._update_data_group(resource)
+                else:
+                    self._modify_resource(resource, self._direct_writes)
+                self._bigip.cache_resource(resource)
                 LOGGER.debug("Updated %s in %.5f seconds.",
                              resource.name, (time() - start_time))
             except exc.F5CcclResourceNotFoundError as e:
                 LOGGER.warning(
                     "Resource /%s/%s does not exist, skipping task...",
                     resource.partition, resource.name)
+                self._bigip.uncache_resource(resource)
             except (exc.F5CcclResourceUpdateError,
                     exc.F5CcclResourceRequestError,
                     exc.F5CcclError) as e:
@@ -104,6 +148,23 @@ class ServiceConfigDeployer(object):
 
         return retry_list
 
+    def _modify_resource(self, resource, direct, headers=None):
+        """Update a resource with only the fields that changed.
+
+        The changes are computed against the cached state of the resource,
+        the resource is updated as a whole if it is not cached.
+        """
+        mgmt_root = self._bigip.mgmt_root()
+        existing = self._bigip.get_cached_resource(resource)
+        data = None
+        if existing is not None:
+            data = resource.changed_fields(existing)
+        if data:
+            resource.update(mgmt_root, data=data, modify=True, direct=direct,
+                            headers=headers)
+        else:
+            resource.update(mgmt_root, direct=direct, headers=headers)
+
     def _delete_resources(self, delete_list, retry=True):
         """Iterate over the resources and call delete method."""
         LOGGER.debug("Deleting %d resources...", len(delete_list))
@@ -111,13 +172,16 @@ class ServiceConfigDeployer(object):
         for resource in delete_list:
             try:
                 start_time = time()
-                resource.delete(self._bigip.mgmt_root())
+                resource.delete(self._bigip.mgmt_root(),
+                                direct=self._direct_writes)
+                self._bigip.uncache_resource(resource)
                 LOGGER.debug("Deleted %s in %.5f seconds.",
                              resource.name, (time() - start_time))
             except exc.F5CcclResourceNotFoundError:
                 LOGGER.warning(
                     "Resource /%s/%s does not exist, skipping task...",
                     resource.partition, resource.name)
+                self._bigip.uncache_resource(resource)
             except (exc.F5CcclResourceDeleteError,
                     exc.F5CcclResourceRequestError,
                     exc.F5CcclError) as e:
@@ -142,7 +206,7 @@ class ServiceConfigDeployer(object):
             desired = desired_config.get(config_key, dict())
 
             (create_hm, update_hm, delete_hm) = (
-                self._get_resource_tasks(existing, desired))
+                self._get_resource_tasks(existing, desired, config_key))
 
             create_monitors += create_hm
             update_monitors += update_hm
@@ -152,46 +216,55 @@ class ServiceConfigDeployer(object):
 
     def _get_user_tunnel_tasks(self, desired):
         """Get the update tasks for user-created fdb tunnels."""
+        start_time = time()
         all_tunnels = self._bigip.get_fdb_tunnels(all_tunnels=True)
         # Get only the tunnels we desire
         update_list = set(desired) & set(all_tunnels)
         update_list = [
             desired[resource] for resource in update_list
-            if desired[resource] != all_tunnels[resource]
+            if not desired[resource].matches(all_tunnels[resource])
         ]
 
+        self._report.add_time("diff.userFdbTunnels", time() - start_time)
         return update_list
 
     def _desired_nodes(self):
         """Desired nodes is inferred from the active pool members."""
         desired_nodes = dict()
 
-        nodes = self._bigip.get_nodes()
+        node_index = self._bigip.get_node_index()
         pools = self._bigip.get_pools(True)
-        for pool in pools:
-            for member in pools[pool].members:
-                addr = member.name.split('%3A')[0]
-                # make a copy to iterate over, then delete from 'nodes'
-                node_list = list(nodes.keys())
-                for key in node_list:
-                    if nodes[key].data['address'] == addr:
-                        node = {'name': key,
-                                'partition': nodes[key].partition,
-                                'address': addr,
-                                'state': 'user-up',
-                                'session': 'user-enabled'}
-                        desired_nodes[key] = Node(**node)
+        for pool in pools.values():
+            for member in pool.members:
+                node = node_index.get(member.address_key())
+                if node is None or node.name in desired_nodes:
+                    continue
+                desired_nodes[node.name] = Node(
+                    name=node.name,
+                    partition=node.partition,
+                    address=node.data['address'],
+                    state='user-up',
+                    session='user-enabled')
 
         return desired_nodes
 
-    def _post_deploy(self, desired_config):
+    def _post_deploy(self, desired_config, iapps_changed=False):
         """Perform post-deployment service tasks/cleanup.
 
         Remove superfluous resources that could not be inferred from the
         desired config.
+
+        The BIG-IP proxy cache has already been updated with the changes
+        applied by the deployment, so only the nodes and virtual addresses,
+        which the BIG-IP creates implicitly, need to be refreshed.  The
+        pools and virtuals of iApps are also created implicitly, so the
+        whole cache is refreshed when iApps have been deployed.
         """
         LOGGER.debug("Perform post-deploy service tasks...")
-        self._bigip.refresh_ltm()
+        if iapps_changed:
+            self._bigip.refresh_ltm()
+        else:
+            self._bigip.refresh_ltm_addresses()
 
         # Delete/update nodes (no creation)
         LOGGER.debug("Post-process nodes.")
@@ -217,8 +290,10 @@ class ServiceConfigDeployer(object):
         auto_created = self._get_resource_tasks(referenced, desired)[2]
         for vaddr in auto_created:
             if vaddr.data['enabled'] == "no":
-                vaddr.data['enabled'] = "yes"
-                update_vaddrs.append(vaddr)
+                # The cached resource is shared with the BIG-IP proxy and
+                # must not be modified, an enabled copy is deployed.
+                update_vaddrs.append(vaddr.__class__(
+                    **dict(vaddr.data, enabled="yes")))
 
         self._update_resources(update_vaddrs)
 
@@ -230,35 +305,40 @@ class ServiceConfigDeployer(object):
 
         :returns: The number of tasks that could not be completed.
         """
-        self._bigip.refresh_ltm()
+        with self._report.timer("refresh"):
+            self._bigip.refresh_ltm()
 
         # Get the list of virtual address tasks
         LOGGER.debug("Getting virtual address tasks...")
         existing = self._bigip.get_virtual_addresses()
         desired = desired_config.get('virtual_addresses', dict())
         (create_vaddrs, update_vaddrs) = (
-            self._get_resource_tasks(existing, desired))[0:2]
+            self._get_resource_tasks(existing, desired,
+                                     'virtual_addresses'))[0:2]
 
         # Get the list of virtual server tasks
         LOGGER.debug("Getting virtual server tasks...")
         existing = self._bigip.get_virtuals()
         desired = desired_config.get('virtuals', dict())
         (create_virtuals, update_virtuals, delete_virtuals) = (
-            self._get_resource_tasks(existing, desired))
+            self._get_resource_tasks(existing, desired,
+                                     'virtuals'))
 
         # Get the list of pool tasks
         LOGGER.debug("Getting pool tasks...")
         existing = self._bigip.get_pools()
         desired = desired_config.get('pools', dict())
         (create_pools, update_pools, delete_pools) = (
-            self._get_resource_tasks(existing, desired))
+            self._get_resource_tasks(existing, desired,
+                                     'pools'))
 
         # Get the list of irule tasks
         LOGGER.debug("Getting iRule tasks...")
         existing = self._bigip.get_irules()
         desired = desired_config.get('irules', dict())
         (create_irules, update_irules, delete_irules) = (
-            self._get_resource_tasks(existing, desired))
+            self._get_resource_tasks(existing, desired,
+                                     'irules'))
 
         # Get the list of internal data group tasks
         LOGGER.debug("Getting InternalDataGroup tasks...")
@@ -266,21 +346,24 @@ class ServiceConfigDeployer(object):
         desired = desired_config.get('internaldatagroups', dict())
         (create_internal_data_groups, update_internal_data_groups,
          delete_internal_data_groups) = (
-             self._get_resource_tasks(existing, desired))
+             self._get_resource_tasks(existing, desired,
+                                      'internaldatagroups'))
 
         # Get the list of policy tasks
         LOGGER.debug("Getting policy tasks...")
         existing = self._bigip.get_l7policies()
         desired = desired_config.get('l7policies', dict())
         (create_policies, update_policies, delete_policies) = (
-            self._get_resource_tasks(existing, desired))
+            self._get_resource_tasks(existing, desired,
+                                     'l7policies'))
 
         # Get the list of iapp tasks
         LOGGER.debug("Getting iApp tasks...")
         existing = self._bigip.get_app_svcs()
         desired = desired_config.get('iapps', dict())
         (create_iapps, update_iapps, delete_iapps) = (
-            self._get_resource_tasks(existing, desired))
+            self._get_resource_tasks(existing, desired,
+                                     'iapps'))
 
         # Get the list of monitor tasks
         LOGGER.debug("Getting monitor tasks...")
@@ -303,10 +386,180 @@ class ServiceConfigDeployer(object):
         taskq_len = self._run_tasks(
             taskq_len, create_tasks, update_tasks, delete_tasks)
 
-        self._post_deploy(desired_config)
+        with self._report.timer("post_deploy"):
+            self._post_deploy(
+                desired_config,
+                bool(create_iapps or update_iapps))
 
         return taskq_len
 
+    def _deploy_subresources(self, create_list, update_list, delete_list):
+        """Create, modify and delete subresources with their own requests.
+
+        The subresources are pool members or tunnel records.
+
+        :param update_list: The list of (subresource, existing subresource)
+        pairs of the subresources to modify.
+
+        :returns: The list of subresources that could not be deployed.
+        """
+        mgmt_root = self._bigip.mgmt_root()
+        failed = list()
+        for resource in create_list:
+            try:
+                resource.create(mgmt_root, direct=True)
+            except exc.F5CcclResourceConflictError:
+                LOGGER.warning(
+                    "%s %s already exists, skipping task...",
+                    resource.classname(), resource.name)
+            except exc.F5CcclError as e:
+                LOGGER.error(str(e))
+                failed.append(resource)
+        for (resource, existing) in update_list:
+            try:
+                data = resource.changed_fields(existing)
+                resource.update(mgmt_root, data=data, modify=True,
+                                direct=True)
+            except exc.F5CcclError as e:
+                LOGGER.error(str(e))
+                failed.append(resource)
+        for resource in delete_list:
+            try:
+                resource.delete(mgmt_root, direct=True)
+            except exc.F5CcclResourceNotFoundError:
+                LOGGER.warning(
+                    "%s %s does not exist, skipping task...",
+                    resource.classname(), resource.name)
+            except exc.F5CcclError as e:
+                LOGGER.error(str(e))
+                failed.append(resource)
+
+        return failed
+
+    def _update_pool(self, pool):
+        """Update a pool, with a request for each member that changed.
+
+        The pool itself is only modified if its own properties changed, so
+        the request size does not depend on the number of pool members.
+        """
+        existing = self._bigip.get_cached_resource(pool)
+        if existing is None:
+            pool.update(self._bigip.mgmt_root(), direct=self._direct_writes)
+            return
+
+        data = pool.changed_fields(existing)
+        if data:
+            pool.update(self._bigip.mgmt_root(), data=data, modify=True,
+                        direct=self._direct_writes)
+
+        existing_members = dict((m.name, m) for m in existing.members)
+        desired_members = dict((m.name, m) for m in pool.members)
+        create_members = [
+            m for (name, m) in desired_members.items()
+            if name not in existing_members
+        ]
+        update_members = [
+            (m, existing_members[name])
+            for (name, m) in desired_members.items()
+            if name in existing_members and m != existing_members[name]
+        ]
+        delete_members = [
+            m for (name, m) in existing_members.items()
+            if name not in desired_members
+        ]
+        LOGGER.debug("Pool %s: %d members to create, %d to update, "
+                     "%d to delete.", pool.name, len(create_members),
+                     len(update_members), len(delete_members))
+
+        failed = self._deploy_subresources(
+            create_members, update_members, delete_members)
+        if failed:
+            raise exc.F5CcclResourceUpdateError(
+                "Failed to update {} members of pool {}".format(
+                    len(failed), pool.name))
+
+    def _update_tunnel(self, tunnel):
+        """Update an fdb tunnel, with a request for each record that changed.
+
+        The requests are proportional to the change, not to the number of
+        records of the tunnel.
+        """
+        existing = self._bigip.get_cached_resource(tunnel)
+        if existing is None:
+            tunnel.update(self._bigip.mgmt_root(), direct=self._direct_writes)
+            return
+
+        (create_records, update_records, delete_records) = (
+            tunnel.record_changes(existing))
+        LOGGER.debug("Tunnel %s: %d records to create, %d to update, "
+                     "%d to delete.", tunnel.name, len(create_records),
+                     len(update_records), len(delete_records))
+
+        failed = self._deploy_subresources(
+            create_records, update_records, delete_records)
+        if failed:
+            raise exc.F5CcclResourceUpdateError(
+                "Failed to update {} records of tunnel {}".format(
+                    len(failed), tunnel.name))
+
+    def _update_data_group(self, data_group):
+        """Update an internal data group with the records that changed."""
+        mgmt_root = self._bigip.mgmt_root()
+        existing = self._bigip.get_cached_resource(data_group)
+        if existing is None:
+            data_group.update(mgmt_root, direct=self._direct_writes)
+            return
+
+        data_group.update_records(mgmt_root, existing)
+
+    def deploy_pool_member_delta(self, pool_name, added, removed, changed):
+        """Apply a change to the members of a single pool.
+
+        Only the pool is refreshed from the BIG-IP, and each member that
+        needs to change is created, modified or deleted with its own request.
+
+        :param pool_name: The name of the pool in the managed partition.
+        :param added: The list of pool members to add.
+        :param removed: The list of pool members to remove.
+        :param changed: The list of pool members to modify.
+
+        :returns: The number of tasks that could not be completed.
+        """
+        pool = self._bigip.refresh_pool(pool_name)
+        if pool is None:
+            raise exc.F5CcclResourceNotFoundError(
+                "Pool {} does not exist".format(pool_name))
+
+        members = dict((m.name, m) for m in pool.members)
+        create_members = list()
+        update_members = list()
+        delete_members = list()
+        for member in added + changed:
+            if member.name not in members:
+                create_members.append(member)
+            elif member != members[member.name]:
+                update_members.append((member, members[member.name]))
+            members[member.name] = member
+        for member in removed:
+            if members.pop(member.name, None) is not None:
+                delete_members.append(member)
+
+        failed = self._deploy_subresources(
+            create_members, update_members, delete_members)
+
+        if failed:
+            # The state of the failed members is unknown.
+            self._bigip.refresh_pool(pool_name)
+        else:
+            pool_data = dict(
+                (k, v) for (k, v) in pool.data.items()
+                if k not in ['name', 'partition', 'membersReference'])
+            self._bigip.cache_resource(
+                Pool(pool.name, pool.partition,
+                     members=sorted(members.values()), **pool_data))
+
+        return len(failed)
+
     def deploy_net(self, desired_config):  # pylint: disable=too-many-locals
         """Deploy the managed partition with the desired NET config.
 
@@ -315,21 +568,24 @@ class ServiceConfigDeployer(object):
 
         :returns: The number of tasks that could not be completed.
         """
-        self._bigip.refresh_net()
+        with self._report.timer("refresh"):
+            self._bigip.refresh_net()
 
         # Get the list of arp tasks
         LOGGER.debug("Getting arp tasks...")
         existing = self._bigip.get_arps()
         desired = desired_config.get('arps', dict())
         (create_arps, update_arps, delete_arps) = (
-            self._get_resource_tasks(existing, desired))
+            self._get_resource_tasks(existing, desired,
+                                     'arps'))
 
         # Get the list of tunnel tasks
         LOGGER.debug("Getting tunnel tasks...")
         existing = self._bigip.get_fdb_tunnels()
         desired = desired_config.get('fdbTunnels', dict())
         (create_tunnels, update_tunnels, delete_tunnels) = (
-            self._get_resource_tasks(existing, desired))
+            self._get_resource_tasks(existing, desired,
+                                     'fdbTunnels'))
 
         # If there are pre-existing (user-created) tunnels that we are
         # managing, we want to only update these tunnels.
@@ -349,6 +605,23 @@ class ServiceConfigDeployer(object):
 
     def _run_tasks(self, taskq_len, create_tasks, update_tasks, delete_tasks):
         """Create, update, and delete the necessary resources."""
+        self._report.count("create_tasks", len(create_tasks))
+        self._report.count("update_tasks", len(update_tasks))
+        self._report.count("delete_tasks", len(delete_tasks))
+        if self._transaction_size > 0:
+            with self._report.timer("transactions"):
+                (create_tasks, update_tasks, delete_tasks) = (
+                    self._run_transactions(
+                        create_tasks, update_tasks, delete_tasks))
+            taskq_len = (
+                len(create_tasks) + len(update_tasks) + len(delete_tasks))
+            if taskq_len == 0:
+                return 0
+
+        if self._deploy_workers > 1:
+            return self._run_scheduled_tasks(
+                create_tasks, update_tasks, delete_tasks)
+
         # 'finished' indicates that the task queue is empty, or there is
         # no way to continue to make progress.  If there are errors in
         # deploying any resource, it is saved in the queue until another
@@ -357,17 +630,22 @@ class ServiceConfigDeployer(object):
         # queue, it is determined that progress has stopped and the
         # loop is exited with work remaining.
         finished = False
+        passes = 0
         while not finished:
             LOGGER.debug("Service task queue length: %d", taskq_len)
+            passes += 1
 
             # Iterate over the list of resources to create
-            create_tasks = self._create_resources(create_tasks)
+            with self._report.timer("create"):
+                create_tasks = self._create_resources(create_tasks)
 
             # Iterate over the list of resources to update
-            update_tasks = self._update_resources(update_tasks)
+            with self._report.timer("update"):
+                update_tasks = self._update_resources(update_tasks)
 
             # Iterate over the list of resources to delete
-            delete_tasks = self._delete_resources(delete_tasks)
+            with self._report.timer("delete"):
+                delete_tasks = self._delete_resources(delete_tasks)
 
             tasks_remaining = (
                 len(create_tasks) + len(update_tasks) + len(delete_tasks))
@@ -380,13 +658,257 @@ class ServiceConfigDeployer(object):
             # Reset the taskq length.
             taskq_len = tasks_remaining
 
+        self._report.count("retry_passes", passes - 1)
         return taskq_len
 
+    def _run_transactions(self, create_tasks, update_tasks, delete_tasks):
+        """Create, update, and delete resources in iControl REST transactions.
+
+        The tasks are committed in order, in transactions of up to
+        'transaction_size' tasks.  When a transaction fails, it is split in
+        two until the failing tasks are isolated.
+
+        Returns:
+            The lists of create, update and delete tasks that failed, to be
+            run individually.
+        """
+        tasks = (
+            [('create', resource) for resource in create_tasks] +
+            [('update', resource) for resource in update_tasks] +
+            [('delete', resource) for resource in delete_tasks]
+        )
+        LOGGER.debug("Committing %d tasks in transactions...", len(tasks))
+
+        failed = list()
+        for start in range(0, len(tasks), self._transaction_size):
+            failed += self._run_transaction(
+                tasks[start:start + self._transaction_size])
+
+        return tuple(
+            [resource for (task, resource) in failed if task == action]
+            for action in ['create', 'update', 'delete']
+        )
+
+    def _run_transaction(self, tasks):
+        """Commit the tasks in one transaction, bisecting on failure.
+
+        Returns:
+            The list of tasks that could not be committed.
+        """
+        try:
+            start_time = time()
+            self._commit_transaction(tasks)
+            LOGGER.debug("Committed %d tasks in %.5f seconds.",
+                         len(tasks), (time() - start_time))
+        except exc.F5CcclError as e:
+            LOGGER.warning("Transaction of %d tasks failed: %s",
+                           len(tasks), str(e))
+            if len(tasks) == 1:
+                return tasks
+            middle = len(tasks) // 2
+            return (self._run_transaction(tasks[:middle]) +
+                    self._run_transaction(tasks[middle:]))
+
+        for (action, resource) in tasks:
+            if action == 'delete':
+                self._bigip.uncache_resource(resource)
+            else:
+                self._bigip.cache_resource(resource)
+
+        return list()
+
+    def _commit_transaction(self, tasks):
+        """Run the tasks in a single iControl REST transaction.
+
+        Raises:
+            F5CcclError: The transaction could not be committed, none of the
+            tasks have been applied.
+        """
+        mgmt_root = self._bigip.mgmt_root()
+        icr_session = mgmt_root._meta_data['icr_session']
+        transaction_uri = mgmt_root._meta_data['uri'] + "transaction"
+
+        try:
+            transaction = icr_session.post(transaction_uri, json={}).json()
+        except iControlUnexpectedHTTPError as err:
+            raise exc.F5CcclError(str(err))
+        transaction_uri += "/{}".format(transaction['transId'])
+
+        # The requests are queued in the transaction by their coordination
+        # id, other requests on the session are not affected.
+        headers = {'X-F5-REST-Coordination-Id': str(transaction['transId'])}
+        try:
+            for (action, resource) in tasks:
+                if action == 'create':
+                    resource.create(mgmt_root, direct=True, headers=headers)
+                elif action == 'update':
+                    self._update_in_transaction(resource, headers)
+                else:
+                    resource.delete(mgmt_root, direct=True, headers=headers)
+
+            result = icr_session.patch(
+                transaction_uri, json={'state': "VALIDATING"}).json()
+        except (iControlUnexpectedHTTPError, exc.F5CcclError) as err:
+            self._delete_transaction(transaction_uri)
+            raise exc.F5CcclError(str(err))
+
+        # Any state but COMPLETED, e.g. a transaction that is still
+        # validating, is not known to be applied.
+        state = result.get('state')
+        if state != "COMPLETED":
+            self._delete_transaction(transaction_uri)
+            raise exc.F5CcclError(
+                result.get('failureReason') or
+                "Transaction {} in state {}".format(transaction_uri, state))
+
+    def _delete_transaction(self, transaction_uri):
+        """Delete a transaction that could not be committed."""
+        icr_session = self._bigip.mgmt_root()._meta_data['icr_session']
+        try:
+            icr_session.delete(transaction_uri)
+        except iControlUnexpectedHTTPError as err:
+            LOGGER.warning("Failed to delete transaction %s: %s",
+                           transaction_uri, str(err))
+
+    def _update_in_transaction(self, resource, headers):
+        """Update a resource in the current transaction.
+
+        Pools, fdb tunnels and data groups are updated as a whole: their
+        members and records are not part of the changed fields, and cannot
+        be sent with their own requests before the transaction commits.
+        """
+        if isinstance(resource, (Pool, FDBTunnel, InternalDataGroup)):
+            resource.update(self._bigip.mgmt_root(), direct=True,
+                            headers=headers)
+        else:
+            self._modify_resource(resource, direct=True, headers=headers)
+
+    def _run_scheduled_tasks(self, create_tasks, update_tasks, delete_tasks):
+        """Create, update, and delete resources concurrently.
+
+        The tasks are run in the order of the references between the
+        resources, with up to 'deploy_workers' tasks running at a time.
+        """
+        tasks = (
+            [('create', resource) for resource in create_tasks] +
+            [('update', resource) for resource in update_tasks] +
+            [('delete', resource) for resource in delete_tasks]
+        )
+        dependencies = self._get_task_dependencies(tasks)
+
+        scheduler = TaskScheduler(self._deploy_workers)
+        remaining = scheduler.run(tasks, dependencies, self._run_task)
+        self._report.count("retry_passes", max(0, scheduler.passes - 1))
+
+        return len(remaining)
+
+    def _run_task(self, task):
+        """Run a single scheduled task, returning True if it completed."""
+        (action, resource) = task
+        with self._report.timer(action):
+            if action == 'create':
+                return not self._create_resources([resource])
+            elif action == 'update':
+                return not self._update_resources([resource])
+            return not self._delete_resources([resource])
+
+    def _get_task_dependencies(self, tasks):
+        """Get the dependencies between the scheduled tasks.
+
+        A resource is created or updated after the resources that it
+        references, and it is deleted after the resources that referenced
+        it have been updated or deleted.
+        """
+        writes = dict()
+        references = dict()
+        for (index, (action, resource)) in enumerate(tasks):
+            if action != 'delete':
+                writes.setdefault(_reference_key(resource), set()).add(index)
+            if action != 'create':
+                # The existing resource, which is the one being deleted,
+                # holds the references that must be removed first.
+                existing = resource
+                if action == 'update':
+                    existing = self._bigip.get_cached_resource(resource)
+                for key in _get_references(existing):
+                    references.setdefault(key, set()).add(index)
+
+        dependencies = dict()
+        for (index, (action, resource)) in enumerate(tasks):
+            required = set()
+            if action == 'delete':
+                required.update(references.get(_reference_key(resource), []))
+            else:
+                for key in _get_references(resource):
+                    required.update(writes.get(key, []))
+            required.discard(index)
+            dependencies[index] = required
+
+        return dependencies
+
+
+def _reference_key(resource):
+    """Get the key by which other resources reference a resource."""
+    if isinstance(resource, VirtualServer):
+        kind = 'virtual'
+    elif isinstance(resource, Pool):
+        kind = 'pool'
+    elif isinstance(resource, Policy):
+        kind = 'policy'
+    elif isinstance(resource, IRule):
+        kind = 'irule'
+    elif isinstance(resource, VirtualAddress):
+        kind = 'virtual_address'
+    elif isinstance(resource, Monitor):
+        kind = 'monitor'
+    else:
+        kind = resource.classname()
+
+    return (kind, resource.full_path())
+
+
+def _get_references(resource):
+    """Get the keys of the resources referenced by a resource."""
+    references = set()
+    if resource is None:
+        return references
+
+    data = resource.data
+    if isinstance(resource, VirtualServer):
+        if data.get('pool'):
+            references.add(('pool', data['pool']))
+        for policy in data.get('policies', list()):
+            references.add(('policy', "/{}/{}".format(
+                policy['partition'], policy['name'])))
+        for rule in data.get('rules', list()):
+            references.add(('irule', rule))
+        destination = resource.destination
+        if destination[1]:
+            references.add(('virtual_address', "/{}/{}".format(
+                destination[1], destination[2])))
+    elif isinstance(resource, Pool):
+        monitor = data.get('monitor')
+        if monitor and monitor != "default":
+            for name in monitor.split(" and "):
+                references.add(('monitor', name.strip()))
+    elif isinstance(resource, Policy):
+        for rule in data.get('rules', list()):
+            for action in rule.get('actions', list()):
+                if action.get('pool'):
+                    references.add(('pool', action['pool']))
+
+    return references
+
 
 class ServiceManager(object):
     """CCCL apply config implementation class."""
 
-    def __init__(self, bigip_proxy, partition, schema):
+    def __init__(self, bigip_proxy, partition, schema, direct_writes=False,
+                 deploy_workers=1, transaction_size=0, max_staleness=0,
+                 config_cache_size=0, validation_cache_size=0,
+                 compiled_validation=False, compiled_schema_dir=None,
+                 apply_reports=False, apply_report_callback=None,
+                 status_ttl=0, statistics_ttl=0):
         """Initialize the ServiceManager.
 
         Args:
@@ -394,20 +916,153 @@ class ServiceManager(object):
             partition: The managed partition.
             schema: Schema that defines the structure of a service
             configuration.
+            direct_writes: Update and delete resources by their URI,
+            without loading them first.
+            deploy_workers: Maximum number of deployment tasks to run
+            concurrently on the BIG-IP.
+            transaction_size: Maximum number of deployment tasks to commit
+            in a single transaction, 0 to disable transactions.
+            max_staleness: Maximum number of seconds to skip applying a
+            service configuration that is unchanged since it was last
+            successfully applied, if the BIG-IP configuration has not
+            changed either. 0 to always apply the configuration.
+            config_cache_size: Maximum number of desired resources to reuse
+            when their service configuration is unchanged, 0 to disable.
+            validation_cache_size: Maximum number of validated service
+            configuration items to cache, 0 to disable.
+            compiled_validation: Validate service configurations with
+            functions compiled from the schema.
+            compiled_schema_dir: Directory to cache the compiled schema in.
+            apply_reports: Report the timings of the phases and the REST
+            calls of each apply, see get_apply_report.
+            apply_report_callback: Function called with the report of each
+            apply, when apply_reports is enabled.
+            status_ttl: Number of seconds to reuse the status of the
+            managed resources, 0 to get it from the BIG-IP on every call.
+            statistics_ttl: Number of seconds to reuse a sample of the
+            statistics, 0 to sample the BIG-IP on every call.
 
         Raises:
             F5CcclError: Error initializing the validator or reading the
             API schema.
         """
+        self._bigip = bigip_proxy
+        self._max_staleness = max_staleness
+        self._applied_configs = dict()
         self._partition = partition
-        self._config_validator = ServiceConfigValidator(schema)
-        self._service_deployer = ServiceConfigDeployer(bigip_proxy)
-        self._config_reader = ServiceConfigReader(self._partition)
+        self._config_validator = ServiceConfigValidator(
+            schema, cache_size=validation_cache_size,
+            compiled=compiled_validation,
+            compiled_cache_dir=compiled_schema_dir)
+        self._service_deployer = ServiceConfigDeployer(
+            bigip_proxy, direct_writes=direct_writes,
+            deploy_workers=deploy_workers,
+            transaction_size=transaction_size)
+        self._config_reader = ServiceConfigReader(
+            self._partition, cache_size=config_cache_size)
+        self._apply_reports = apply_reports
+        self._apply_report_callback = apply_report_callback
+        self._last_apply_report = None
+        self._status = TTLCache(self._bigip.get_status, status_ttl)
+        self._statistics = ServiceStatistics(self._bigip, statistics_ttl)
 
     def get_partition(self):
         """Get the name of the managed partition."""
         return self._partition
 
+    def get_status(self):
+        """Get the status of the managed virtual servers and pools.
+
+        The status is shared by the callers within its time to live, and
+        must not be modified.
+
+        Returns:
+            The status returned by BigIPProxy.get_status.
+        """
+        return self._status.get()
+
+    def get_statistics(self):
+        """Get the statistics of the managed virtual servers and pools.
+
+        The statistics are shared by the callers within their time to
+        live, and must not be modified.
+
+        Returns:
+            The statistics returned by ServiceStatistics.get.
+        """
+        return self._statistics.get()
+
+    def get_apply_report(self):
+        """Get the report of the last apply.
+
+        Returns:
+            A dictionary with the 'type' of configuration applied, the
+            'timings' of its phases in seconds, the 'counters' of tasks and
+            the 'rest_calls' by HTTP method, or None if apply reports are
+            disabled or nothing was applied yet.
+        """
+        return self._last_apply_report
+
+    @contextmanager
+    def _apply_report(self, config_type):
+        """Report the phases of an apply, if apply reports are enabled."""
+        if not self._apply_reports:
+            yield NULL_REPORT
+            return
+
+        report = ApplyReport(config_type)
+        self._service_deployer.set_report(report)
+        self._bigip.set_report(report)
+        try:
+            with report.timer("total"):
+                yield report
+        finally:
+            self._service_deployer.set_report(NULL_REPORT)
+            self._bigip.set_report(NULL_REPORT)
+            self._last_apply_report = report.as_dict()
+            if self._apply_report_callback is not None:
+                self._apply_report_callback(self._last_apply_report)
+
+    @staticmethod
+    def _config_digest(service_config):
+        """Get the digest of a service configuration."""
+        serialized = json.dumps(service_config, sort_keys=True,
+                                separators=(',', ':'), default=str)
+        return hashlib.sha1(serialized.encode('utf-8')).hexdigest()
+
+    def _config_applied(self, config_type, digest):
+        """Determine whether a service configuration is already applied.
+
+        The configuration is applied if it is the last configuration that
+        was successfully applied, less than 'max_staleness' seconds ago,
+        and the BIG-IP configuration has not changed since.
+        """
+        if self._max_staleness <= 0:
+            return False
+
+        applied = self._applied_configs.get(config_type)
+        if applied is None:
+            return False
+
+        (applied_digest, change_token, applied_time) = applied
+        if (applied_digest != digest or
+                time() - applied_time >= self._max_staleness):
+            return False
+
+        return (change_token is not None and
+                change_token == self._bigip.get_change_token())
+
+    def _record_applied_config(self, config_type, digest, retval):
+        """Remember a service configuration that was applied."""
+        if self._max_staleness <= 0:
+            return
+
+        if retval:
+            self._applied_configs.pop(config_type, None)
+        else:
+            self._applied_configs[config_type] = (
+                digest, self._bigip.get_change_token(), time())
+
     def apply_ltm_config(self, service_config):
         """Apply the desired LTM service configuration.
         Args:
@@ -425,17 +1080,70 @@ class ServiceManager(object):
         LOGGER.debug("apply_ltm_config start")
         start_time = time()
 
-        # Validate the service configuration.
-        self._config_validator.validate(service_config)
+        with self._apply_report('ltm') as report:
+            # Skip a configuration that is already applied.  The digest is
+            # taken before the validation sets the default values.
+            digest = self._config_digest(service_config)
+            if self._config_applied('ltm', digest):
+                LOGGER.debug("LTM configuration unchanged, skipping apply.")
+                report.count("skipped")
+                return 0
+
+            # Validate the service configuration.
+            with report.timer("validate"):
+                self._config_validator.validate(service_config)
+
+            # Read in the configuration
+            with report.timer("read"):
+                desired_config = self._config_reader.read_ltm_config(
+                    service_config)
+
+            # Deploy the service desired configuration.
+            retval = self._service_deployer.deploy_ltm(desired_config)
+            report.count("failed_tasks", retval)
+            self._record_applied_config('ltm', digest, retval)
 
-        # Read in the configuration
-        desired_config = self._config_reader.read_ltm_config(service_config)
+        LOGGER.debug(
+            "apply_ltm_config took %.5f seconds.", (time() - start_time))
+
+        return retval
+
+    def apply_pool_member_delta(self, pool, added, removed, changed):
+        """Apply a change to the members of a single pool.
 
-        # Deploy the service desired configuration.
-        retval = self._service_deployer.deploy_ltm(desired_config)
+        Args:
+            pool: The name of the pool in the managed partition.
+            added: The list of pool members to add.
+            removed: The list of pool members to remove.
+            changed: The list of pool members to modify.
+
+        Returns:
+            The number of pool members that were not successfully deployed.
+
+        Raises:
+            F5CcclValidationError: Indicates that a pool member does not
+            conform to the API schema.
+        """
+        LOGGER.debug("apply_pool_member_delta start")
+        start_time = time()
+
+        # Validate the pool members.
+        self._config_validator.validate({
+            'pools': [{'name': pool, 'members': added + removed + changed}]
+        })
+
+        # Read in the pool members
+        (added, removed, changed) = (
+            self._config_reader.read_pool_members(pool, members)
+            for members in [added, removed, changed])
+
+        # Deploy the pool member changes.
+        retval = self._service_deployer.deploy_pool_member_delta(
+            pool, added, removed, changed)
 
         LOGGER.debug(
-            "apply_ltm_config took %.5f seconds.", (time() - start_time))
+            "apply_pool_member_delta took %.5f seconds.",
+            (time() - start_time))
 
         return retval
 
@@ -456,14 +1164,28 @@ class ServiceManager(object):
         LOGGER.debug("apply_net_config start")
         start_time = time()
 
-        # Validate the service configuration.
-        self._config_validator.validate(service_config)
-
-        # Read in the configuration
-        desired_config = self._config_reader.read_net_config(service_config)
-
-        # Deploy the service desired configuration.
-        retval = self._service_deployer.deploy_net(desired_config)
+        with self._apply_report('net') as report:
+            # Skip a configuration that is already applied.  The digest is
+            # taken before the validation sets the default values.
+            digest = self._config_digest(service_config)
+            if self._config_applied('net', digest):
+                LOGGER.debug("NET configuration unchanged, skipping apply.")
+                report.count("skipped")
+                return 0
+
+            # Validate the service configuration.
+            with report.timer("validate"):
+                self._config_validator.validate(service_config)
+
+            # Read in the configuration
+            with report.timer("read"):
+                desired_config = self._config_reader.read_net_config(
+                    service_config)
+
+            # Deploy the service desired configuration.
+            retval = self._service_deployer.deploy_net(desired_config)
+            report.count("failed_tasks", retval)
+            self._record_applied_config('net', digest, retval)
 
         LOGGER.debug(
             "apply_net_config took %.5f seconds.", (time() - start_time))
@@ -0,0 +1,156 @@
+#!/usr/bin/env python
+# Copyright 2017 F5 Networks Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Run deployment tasks concurrently in the order of their dependencies."""
+
+import logging
+from multiprocessing.pool import ThreadPool
+from threading import Condition
+
+
+LOGGER = logging.getLogger(__name__)
+
+
+class TaskScheduler(object):
+    """Dependency-aware task scheduler.
+
+    Each task is started as soon as all of the tasks it depends on have
+    completed, with at most 'workers' tasks running at any time.  A task
+    that fails is retried on the next pass, and only the tasks that depend
+    on it are held back until then.  Passes are made until every task has
+    completed, or until a pass does not complete any task.  Tasks that
+    depend on each other are run as if they had no dependencies.
+
+    Args:
+        workers: Maximum number of tasks to run concurrently.
+
+    Attributes:
+        passes: Number of passes made by the last run.
+    """
+
+    def __init__(self, workers):
+        """Initialize the task scheduler."""
+        self._workers = max(1, workers)
+        self.passes = 0
+
+    def run(self, tasks, dependencies, run_task):
+        """Run the tasks.
+
+        Args:
+            tasks: List of tasks to run.
+            dependencies: Map of task index to the set of the indexes of the
+                tasks that must complete before it.
+            run_task: Function that runs a task, returning True if the task
+                is complete, or False if it should be retried.
+
+        Returns:
+            The list of tasks that could not be completed.
+        """
+        remaining = set(range(len(tasks)))
+        dependents = dict()
+        for index, required in dependencies.items():
+            for dependency in required:
+                dependents.setdefault(dependency, set()).add(index)
+
+        failed = set()
+        break_cycles = False
+        self.passes = 0
+        thread_pool = ThreadPool(self._workers)
+        try:
+            while remaining:
+                LOGGER.debug("Service task queue length: %d", len(remaining))
+                self.passes += 1
+                required = dependencies
+                if break_cycles:
+                    # Only wait for the tasks that have failed, the others
+                    # could not be started because they depend on each other.
+                    required = dict(
+                        (index, set(required_tasks) & failed)
+                        for (index, required_tasks) in dependencies.items())
+
+                completed = self._run_pass(
+                    thread_pool, tasks, remaining, required, dependents,
+                    failed, run_task)
+                if completed:
+                    break_cycles = False
+                elif break_cycles:
+                    # We have stopped making progress.
+                    break
+                else:
+                    break_cycles = True
+        finally:
+            thread_pool.terminate()
+
+        return [tasks[index] for index in sorted(remaining)]
+
+    @staticmethod
+    def _run_pass(thread_pool, tasks, remaining, dependencies, dependents,
+                  failed, run_task):
+        """Run every remaining task whose dependencies are complete.
+
+        The completed tasks are removed from 'remaining', and the tasks that
+        did not complete are added to 'failed'.
+
+        Returns:
+            The number of tasks that were completed.
+        """
+        condition = Condition()
+        finished = list()
+        started = set()
+        completed = 0
+
+        def run(index):
+            """Run a task and report its result to the scheduler."""
+            try:
+                result = run_task(tasks[index])
+            except Exception as error:  # pylint: disable=broad-except
+                LOGGER.error("Unexpected task error: %s", error)
+                result = False
+            with condition:
+                finished.append((index, result))
+                condition.notify()
+
+        def start_ready(candidates):
+            """Start the candidate tasks that are ready to run."""
+            count = 0
+            for index in sorted(candidates):
+                if index in started or index not in remaining:
+                    continue
+                if dependencies.get(index, set()) & remaining:
+                    continue
+                started.add(index)
+                thread_pool.apply_async(run, (index,))
+                count += 1
+            return count
+
+        running = start_ready(remaining)
+        while running:
+            with condition:
+                while not finished:
+                    condition.wait()
+                results = list(finished)
+                del finished[:]
+
+            for (index, result) in results:
+                running -= 1
+                if not result:
+                    failed.add(index)
+                    continue
+                completed += 1
+                remaining.discard(index)
+                failed.discard(index)
+                running += start_ready(dependents.get(index, set()))
+
+        return completed
@@ -0,0 +1,373 @@
+# coding=utf-8
+#
+# Copyright 2017 F5 Networks Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Compile a CCCL API schema into Python validation functions.
+
+The generated functions check an instance against the Draft 4 keywords
+used by the CCCL API schemas, and set the default values of the properties
+the same way as the validator of f5_cccl.service.validation.  They only
+tell whether an instance is valid: the errors are reported by jsonschema.
+"""
+
+import hashlib
+import logging
+import numbers
+import os
+import re
+
+import simplejson as json
+
+
+LOGGER = logging.getLogger(__name__)
+
+# Increment when the generated code changes, to invalidate cached sources.
+COMPILER_VERSION = 1
+
+try:
+    STRING_TYPES = (basestring,)  # noqa pylint: disable=undefined-variable
+    INTEGER_TYPES = (int, long)  # noqa pylint: disable=undefined-variable
+except NameError:
+    STRING_TYPES = (str,)
+    INTEGER_TYPES = (int,)
+
+# Keywords that have no effect on the validation.
+ANNOTATION_KEYWORDS = set([
+    'default', 'definitions', 'description', 'id', 'title', '$schema'
+])
+
+# Draft 4 keywords that the compiler does not support.
+UNSUPPORTED_KEYWORDS = set([
+    'additionalItems', 'additionalProperties', 'allOf', 'anyOf',
+    'dependencies', 'exclusiveMaximum', 'exclusiveMinimum', 'format',
+    'maxItems', 'maxProperties', 'minProperties', 'multipleOf', 'not',
+    'pattern', 'uniqueItems'
+])
+
+TYPE_CHECKS = {
+    'array': "isinstance(i, list)",
+    'boolean': "isinstance(i, bool)",
+    'integer': "_is_integer(i)",
+    'null': "i is None",
+    'number': "_is_number(i)",
+    'object': "isinstance(i, dict)",
+    'string': "isinstance(i, _STRING_TYPES)"
+}
+
+
+class UnsupportedSchemaError(Exception):
+    """The schema uses a keyword that the compiler does not support."""
+    pass
+
+
+def _is_integer(instance):
+    """Check the Draft 4 'integer' type."""
+    return (isinstance(instance, INTEGER_TYPES) and
+            not isinstance(instance, bool))
+
+
+def _is_number(instance):
+    """Check the Draft 4 'number' type."""
+    return (isinstance(instance, numbers.Number) and
+            not isinstance(instance, bool))
+
+
+def _valid(instance):  # pylint: disable=unused-argument
+    """Accept any instance."""
+    return True
+
+
+def schema_digest(schema):
+    """Get the digest of a schema, for the cache of the generated code."""
+    serialized = json.dumps([COMPILER_VERSION, schema], sort_keys=True,
+                            separators=(',', ':'))
+    return hashlib.sha1(serialized.encode('utf-8')).hexdigest()
+
+
+class SchemaCompiler(object):
+    """Generate the Python source of the validation functions of a schema.
+
+    Args:
+        schema: The root schema, that local references are resolved in.
+    """
+
+    def __init__(self, schema):
+        """Initialize the compiler."""
+        self._schema = schema
+        self._functions = dict()
+        self._sources = list()
+        self._constants = list()
+
+    def generate(self, entries):
+        """Generate the source of a module of validation functions.
+
+        Args:
+            entries: Map of entry name to the schema (a node of the root
+                schema) that the entry validates.
+
+        Returns:
+            The source of a module that defines ENTRIES, a map of entry name
+            to validation function.
+
+        Raises:
+            UnsupportedSchemaError: The schema cannot be compiled.
+        """
+        names = dict(
+            (entry, self._compile(node) or '_valid')
+            for (entry, node) in entries.items())
+
+        lines = ["# Generated by {}, do not edit.".format(__name__), ""]
+        lines.extend(self._constants)
+        lines.append("")
+        for source in self._sources:
+            lines.extend(source)
+            lines.append("")
+        lines.append("ENTRIES = {")
+        for entry in sorted(names):
+            lines.append("    {!r}: {},".format(entry, names[entry]))
+        lines.append("}")
+        return "\n".join(lines) + "\n"
+
+    def _constant(self, expression):
+        """Define a module constant."""
+        name = "_C{}".format(len(self._constants))
+        self._constants.append("{} = {}".format(name, expression))
+        return name
+
+    def _resolve(self, ref):
+        """Resolve a local reference in the root schema."""
+        if not ref.startswith('#'):
+            raise UnsupportedSchemaError(
+                "Unsupported reference: {}".format(ref))
+        node = self._schema
+        # Like jsonschema, accept a fragment without its leading slash.
+        fragment = ref[1:].lstrip('/')
+        for part in fragment.split('/') if fragment else []:
+            part = part.replace('~1', '/').replace('~0', '~')
+            try:
+                node = node[part]
+            except (KeyError, TypeError):
+                raise UnsupportedSchemaError(
+                    "Unresolvable reference: {}".format(ref))
+        return node
+
+    def _compile(self, node):
+        """Compile a schema node into a function.
+
+        Returns:
+            The name of the function, or None if the node accepts any
+            instance.
+        """
+        if not isinstance(node, dict):
+            raise UnsupportedSchemaError("Schema is not an object")
+        if id(node) in self._functions:
+            return self._functions[id(node)]
+
+        name = "_v{}".format(len(self._functions))
+        self._functions[id(node)] = name
+        body = list()
+        if '$ref' in node:
+            # Like jsonschema, ignore the other keywords of a reference.
+            target = self._compile(self._resolve(node['$ref']))
+            if target:
+                body.append("return {}(i)".format(target))
+        else:
+            for keyword, value in node.items():
+                body.extend(self._compile_keyword(keyword, value))
+
+        if not body:
+            self._functions[id(node)] = None
+            return None
+        if not body[-1].startswith("return"):
+            body.append("return True")
+        source = ["def {}(i):".format(name)]
+        source.extend("    " + line for line in body)
+        self._sources.append(source)
+        return name
+
+    def _compile_keyword(self, keyword, value):
+        """Compile a keyword of a schema node into statements."""
+        # pylint: disable=too-many-return-statements,too-many-branches
+        if keyword in UNSUPPORTED_KEYWORDS:
+            if keyword.startswith('exclusive') and not value:
+                return []
+            raise UnsupportedSchemaError(
+                "Unsupported keyword: {}".format(keyword))
+        elif keyword in ANNOTATION_KEYWORDS:
+            return []
+        elif keyword == 'type':
+            return self._compile_type(value)
+        elif keyword == 'enum':
+            enums = self._constant(repr(tuple(value)))
+            return ["if i not in {}:".format(enums),
+                    "    return False"]
+        elif keyword in ('minLength', 'maxLength'):
+            operator = '<' if keyword == 'minLength' else '>'
+            return ["if isinstance(i, _STRING_TYPES) and "
+                    "len(i) {} {!r}:".format(operator, value),
+                    "    return False"]
+        elif keyword in ('minimum', 'maximum'):
+            operator = '<' if keyword == 'minimum' else '>'
+            return ["if _is_number(i) and i {} {!r}:".format(operator, value),
+                    "    return False"]
+        elif keyword == 'minItems':
+            return ["if isinstance(i, list) and len(i) < {!r}:".format(value),
+                    "    return False"]
+        elif keyword == 'required':
+            statements = ["if isinstance(i, dict):"]
+            for prop in value:
+                statements.extend(["    if {!r} not in i:".format(prop),
+                                   "        return False"])
+            return statements
+        elif keyword == 'properties':
+            return self._compile_properties(value)
+        elif keyword == 'patternProperties':
+            return self._compile_pattern_properties(value)
+        elif keyword == 'items':
+            if not isinstance(value, dict):
+                raise UnsupportedSchemaError("Unsupported tuple items")
+            function = self._compile(value)
+            if not function:
+                return []
+            return ["if isinstance(i, list):",
+                    "    for item in i:",
+                    "        if not {}(item):".format(function),
+                    "            return False"]
+        elif keyword == 'oneOf':
+            functions = [self._compile(subschema) or '_valid'
+                         for subschema in value]
+            # Every alternative is checked, to set the same defaults as
+            # jsonschema does.
+            return ["valid = [f(i) for f in ({},)]".format(
+                ", ".join(functions)),
+                    "if valid.count(True) != 1:",
+                    "    return False"]
+        # Like jsonschema, ignore unknown keywords.
+        return []
+
+    @staticmethod
+    def _compile_type(value):
+        """Compile the 'type' keyword."""
+        types = value if isinstance(value, list) else [value]
+        checks = list()
+        for json_type in types:
+            if json_type not in TYPE_CHECKS:
+                raise UnsupportedSchemaError(
+                    "Unsupported type: {}".format(json_type))
+            checks.append(TYPE_CHECKS[json_type])
+        return ["if not ({}):".format(" or ".join(checks)),
+                "    return False"]
+
+    def _compile_properties(self, properties):
+        """Compile the 'properties' keyword, setting the defaults."""
+        # A non-object instance is reported by jsonschema.
+        statements = ["if not isinstance(i, dict):", "    return False"]
+        for prop, subschema in properties.items():
+            if isinstance(subschema, dict) and 'default' in subschema:
+                statements.append("i.setdefault({!r}, {!r})".format(
+                    prop, subschema['default']))
+        for prop, subschema in properties.items():
+            function = self._compile(subschema)
+            if function:
+                statements.append(
+                    "if {0!r} in i and not {1}(i[{0!r}]):".format(
+                        prop, function))
+                statements.append("    return False")
+        return statements
+
+    def _compile_pattern_properties(self, pattern_properties):
+        """Compile the 'patternProperties' keyword."""
+        statements = list()
+        for pattern, subschema in pattern_properties.items():
+            function = self._compile(subschema)
+            if not function:
+                continue
+            regex = self._constant("re.compile({!r})".format(pattern))
+            statements.extend([
+                "if isinstance(i, dict):",
+                "    for key, value in i.items():",
+                "        if {}.search(key) and not {}(value):".format(
+                    regex, function),
+                "            return False"])
+        return statements
+
+
+def _load_module(source, filename):
+    """Execute the source of a generated module."""
+    namespace = {
+        're': re,
+        '_STRING_TYPES': STRING_TYPES,
+        '_is_integer': _is_integer,
+        '_is_number': _is_number,
+        '_valid': _valid
+    }
+    # pylint: disable=exec-used
+    exec(compile(source, filename, 'exec'), namespace)
+    return namespace['ENTRIES']
+
+
+def _read_source(path):
+    """Read a cached source, or return None."""
+    try:
+        with open(path, 'r') as source_file:
+            return source_file.read()
+    except (IOError, OSError):
+        return None
+
+
+def _write_source(path, source):
+    """Cache a generated source, ignoring errors."""
+    temp_path = "{}.{}".format(path, os.getpid())
+    try:
+        with open(temp_path, 'w') as source_file:
+            source_file.write(source)
+        os.rename(temp_path, path)
+    except (IOError, OSError) as error:
+        LOGGER.warning("Failed to cache compiled schema: %s", error)
+
+
+def compile_schema(schema, entries, cache_dir=None):
+    """Compile the validation functions of a schema.
+
+    Args:
+        schema: The root schema.
+        entries: Map of entry name to the schema node it validates.
+        cache_dir: Directory to cache the generated source in, keyed by the
+            digest of the schema and entries.  Only use a directory that
+            is not writable by untrusted users: the cached source is
+            executed.  None to generate the source every time.
+
+    Returns:
+        Map of entry name to a function of an instance, that sets the
+        defaults of the instance and returns whether it is valid.
+
+    Raises:
+        UnsupportedSchemaError: The schema cannot be compiled.
+    """
+    digest = schema_digest([schema, entries])
+    path = None
+    source = None
+    if cache_dir:
+        path = os.path.join(cache_dir, "cccl_schema_{}.py".format(digest))
+        source = _read_source(path)
+
+    if source is None:
+        source = SchemaCompiler(schema).generate(entries)
+        if path:
+            _write_source(path, source)
+    else:
+        LOGGER.debug("Loaded compiled schema from %s", path)
+
+    return _load_module(source, path or "<schema {}>".format(digest))
@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+# Copyright 2017 F5 Networks Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Rates of the traffic of the managed virtual servers and pools."""
+
+import logging
+from time import time
+
+from f5_cccl.utils.ttl_cache import TTLCache
+
+
+LOGGER = logging.getLogger(__name__)
+
+# Gauges reported as is, by type of resource: stats name to name.
+GAUGES = {
+    'virtuals': {
+        'clientside.curConns': 'curConns'
+    },
+    'pools': {
+        'serverside.curConns': 'curConns',
+        'activeMemberCnt': 'activeMembers'
+    }
+}
+
+# Counters reported as rates per second, by type of resource: stats name
+# to name.
+RATES = {
+    'virtuals': {
+        'clientside.totConns': 'connsPerSec',
+        'clientside.bitsIn': 'bitsInPerSec',
+        'clientside.bitsOut': 'bitsOutPerSec',
+        'clientside.pktsIn': 'pktsInPerSec',
+        'clientside.pktsOut': 'pktsOutPerSec',
+        'totRequests': 'requestsPerSec'
+    },
+    'pools': {
+        'serverside.totConns': 'connsPerSec',
+        'serverside.bitsIn': 'bitsInPerSec',
+        'serverside.bitsOut': 'bitsOutPerSec',
+        'serverside.pktsIn': 'pktsInPerSec',
+        'serverside.pktsOut': 'pktsOutPerSec',
+        'totRequests': 'requestsPerSec'
+    }
+}
+
+
+class ServiceStatistics(object):
+    """Statistics of the managed virtual servers and pools.
+
+    The counters of the BIG-IP are sampled with a single request per type
+    of resource, and the rates are computed from the previous sample.  A
+    sample is reused by the callers for its time to live.
+
+    Args:
+        bigip_proxy: BigIPProxy object, f5_cccl.bigip.BigIPProxy.
+        ttl: Number of seconds to reuse a sample, 0 to sample the BIG-IP
+        on every call.
+    """
+
+    def __init__(self, bigip_proxy, ttl=0):
+        """Initialize the statistics without a sample."""
+        self._bigip = bigip_proxy
+        self._previous = None
+        self._cache = TTLCache(self._sample, ttl)
+
+    def get(self):
+        """Get the statistics of the last sample.
+
+        Returns:
+            A dictionary with the statistics of the 'virtuals' and the
+            'pools', indexed by name, and the 'interval' in seconds since
+            the previous sample.  The rates are None on the first sample of
+            a resource, or when its counters were reset.
+        """
+        return self._cache.get()
+
+    def _sample(self):
+        """Sample the counters, and compute their rates."""
+        stats = self._bigip.get_statistics()
+        sample_time = time()
+        (previous_time, previous) = self._previous or (None, dict())
+        self._previous = (sample_time, stats)
+
+        interval = None
+        if previous_time is not None and sample_time > previous_time:
+            interval = sample_time - previous_time
+
+        statistics = {'interval': interval}
+        for (resource_type, resources) in stats.items():
+            previous_resources = previous.get(resource_type, dict())
+            statistics[resource_type] = dict(
+                (name, self._statistics(resource_type, values,
+                                        previous_resources.get(name),
+                                        interval))
+                for (name, values) in resources.items())
+        return statistics
+
+    @staticmethod
+    def _statistics(resource_type, values, previous_values, interval):
+        """Get the gauges and rates of a resource."""
+        statistics = dict(
+            (name, values.get(key))
+            for (key, name) in GAUGES[resource_type].items())
+        for (key, name) in RATES[resource_type].items():
+            statistics[name] = None
+            if interval is None or previous_values is None:
+                continue
+            (value, previous_value) = (values.get(key),
+                                       previous_values.get(key))
+            if (value is not None and previous_value is not None and
+                    value >= previous_value):
+                statistics[name] = (value - previous_value) / float(interval)
+        return statistics
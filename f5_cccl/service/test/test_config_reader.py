@@ -71,3 +71,26 @@ class TestServiceConfigReader:
             reader = ServiceConfigReader(self.partition)
             with pytest.raises(F5CcclConfigurationReadError) as e:
                 reader.read_ltm_config(self.ltm_service)
+
+    def test_get_config_cached(self):
+        reader = ServiceConfigReader(self.partition, cache_size=100)
+        config = reader.read_ltm_config(self.ltm_service)
+
+        # Unchanged configuration items are reused.
+        ltm_service = json.loads(json.dumps(self.ltm_service))
+        ltm_service['pools'][0]['description'] = "changed"
+        cached_config = reader.read_ltm_config(ltm_service)
+
+        for name, virtual in config['virtuals'].items():
+            assert cached_config['virtuals'][name] is virtual
+        for name, pool in config['pools'].items():
+            assert cached_config['pools'][name] is not pool
+            assert cached_config['pools'][name].data['description'] == \
+                "changed"
+
+        # The cache is bounded by the number of entries.
+        reader = ServiceConfigReader(self.partition, cache_size=1)
+        config = reader.read_ltm_config(self.ltm_service)
+        cached_config = reader.read_ltm_config(self.ltm_service)
+        for name, virtual in config['virtuals'].items():
+            assert cached_config['virtuals'][name] is not virtual
@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+# Copyright 2017 F5 Networks Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+from threading import Lock
+
+from f5_cccl.service.scheduler import TaskScheduler
+
+
+class TaskRecorder(object):
+    """Run tasks and record the order in which they complete."""
+
+    def __init__(self, failures=None):
+        self.order = list()
+        self.failures = failures or dict()
+        self.lock = Lock()
+
+    def __call__(self, task):
+        with self.lock:
+            if self.failures.get(task, 0) > 0:
+                self.failures[task] -= 1
+                return False
+            self.order.append(task)
+        return True
+
+
+def test_run_in_dependency_order():
+    """Test that tasks run after the tasks they depend on."""
+    tasks = ['virtual', 'pool', 'monitor', 'irule']
+    dependencies = {0: {1, 3}, 1: {2}}
+    recorder = TaskRecorder()
+
+    remaining = TaskScheduler(4).run(tasks, dependencies, recorder)
+
+    assert remaining == []
+    assert sorted(recorder.order) == sorted(tasks)
+    order = recorder.order
+    assert order.index('monitor') < order.index('pool')
+    assert order.index('pool') < order.index('virtual')
+    assert order.index('irule') < order.index('virtual')
+
+
+def test_retry_failed_task():
+    """Test that a failed task is retried before its dependents run."""
+    tasks = ['virtual', 'pool', 'irule']
+    dependencies = {0: {1}}
+    recorder = TaskRecorder(failures={'pool': 1})
+
+    remaining = TaskScheduler(2).run(tasks, dependencies, recorder)
+
+    assert remaining == []
+    assert recorder.order.index('pool') < recorder.order.index('virtual')
+
+
+def test_unfinished_tasks():
+    """Test that tasks which never complete are returned."""
+    tasks = ['virtual', 'pool', 'irule']
+    dependencies = {0: {1}}
+    recorder = TaskRecorder(failures={'pool': 100})
+
+    remaining = TaskScheduler(2).run(tasks, dependencies, recorder)
+
+    assert remaining == ['virtual', 'pool']
+    assert recorder.order == ['irule']
+
+
+def test_dependency_cycle():
+    """Test that tasks in a dependency cycle are still run."""
+    tasks = ['a', 'b']
+    dependencies = {0: {1}, 1: {0}}
+    recorder = TaskRecorder()
+
+    remaining = TaskScheduler(2).run(tasks, dependencies, recorder)
+
+    assert remaining == []
+    assert sorted(recorder.order) == ['a', 'b']
+
+
+def test_task_exception():
+    """Test that an unexpected task error is treated as a failure."""
+    def run_task(task):
+        raise ValueError(task)
+
+    remaining = TaskScheduler(2).run(['a'], dict(), run_task)
+
+    assert remaining == ['a']
@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+# Copyright 2017 F5 Networks Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+from jsonschema import Draft4Validator
+import pytest
+
+from f5_cccl.service.schema_compiler import compile_schema
+from f5_cccl.service.schema_compiler import UnsupportedSchemaError
+
+
+SCHEMA = {
+    "definitions": {
+        "memberType": {
+            "type": "object",
+            "properties": {
+                "address": {"type": "string", "minLength": 1},
+                "port": {"type": "integer", "minimum": 1, "maximum": 65535},
+                "ratio": {"type": "number", "default": 1}
+            },
+            "required": ["address"]
+        },
+        "actionType": {
+            "type": "object",
+            "properties": {
+                "forward": {"type": "boolean"},
+                "pool": {"type": "string"},
+                "reset": {"type": "boolean"}
+            },
+            "oneOf": [{"required": ["pool"]}, {"required": ["reset"]}]
+        }
+    },
+    "type": "object",
+    "properties": {
+        "mode": {"enum": ["round-robin", 0], "default": "round-robin"},
+        "members": {
+            "type": "array",
+            "minItems": 1,
+            "items": {"$ref": "#/definitions/memberType"}
+        },
+        "actions": {
+            "type": "array",
+            "items": {"$ref": "#definitions/actionType"}
+        },
+        "variables": {
+            "type": "object",
+            "patternProperties": {"^[a-z]+$": {"type": "string"}}
+        }
+    },
+    "required": ["members"]
+}
+
+
+@pytest.mark.parametrize("instance", [
+    {"members": [{"address": "10.0.0.1"}]},
+    {"members": [{"address": "10.0.0.1", "port": 80, "ratio": 2.5}]},
+    {"members": [{"address": "10.0.0.1"}], "mode": 0},
+    {"members": [{"address": "10.0.0.1"}], "actions": [{"pool": "p"}]},
+    {"members": [{"address": "10.0.0.1"}], "variables": {"a": "b", "1": 2}},
+    {"members": []},
+    {"members": [{"address": ""}]},
+    {"members": [{"address": "10.0.0.1", "port": 0}]},
+    {"members": [{"address": "10.0.0.1", "port": True}]},
+    {"members": [{"address": "10.0.0.1", "ratio": "1"}]},
+    {"members": [{"address": "10.0.0.1"}], "mode": False},
+    {"members": [{"address": "10.0.0.1"}], "mode": "least-connections"},
+    {"members": [{"address": "10.0.0.1"}],
+     "actions": [{"pool": "p", "reset": True}]},
+    {"members": [{"address": "10.0.0.1"}], "actions": [{"forward": True}]},
+    {"members": [{"address": "10.0.0.1"}], "variables": {"a": 1}},
+    {"mode": "round-robin"},
+    [],
+])
+def test_compiled_schema(instance):
+    """Test that a compiled schema agrees with jsonschema."""
+    validate = compile_schema(SCHEMA, {'': SCHEMA})['']
+
+    assert validate(instance) == Draft4Validator(SCHEMA).is_valid(instance)
+
+
+def test_compiled_defaults():
+    """Test that a compiled schema sets the default values."""
+    validate = compile_schema(SCHEMA, {'': SCHEMA})['']
+    instance = {"members": [{"address": "10.0.0.1"}]}
+
+    assert validate(instance)
+    assert instance == {"mode": "round-robin",
+                        "members": [{"address": "10.0.0.1", "ratio": 1}]}
+
+
+def test_compiled_entries():
+    """Test compiling the schema of the items of a list."""
+    items = SCHEMA['properties']['members']['items']
+    validate = compile_schema(SCHEMA, {'members': items})['members']
+
+    assert validate({"address": "10.0.0.1"})
+    assert not validate({"port": 80})
+
+
+@pytest.mark.parametrize("schema", [
+    {"type": "string", "pattern": "^a"},
+    {"type": "object", "additionalProperties": False},
+    {"$ref": "other.json#/definitions/type"},
+    {"type": "any"},
+])
+def test_unsupported_schema(schema):
+    """Test that unsupported schemas are not compiled."""
+    with pytest.raises(UnsupportedSchemaError):
+        compile_schema(schema, {'': schema})
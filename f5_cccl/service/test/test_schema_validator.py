@@ -17,6 +17,7 @@ import f5_cccl.service.validation as validation
 import f5_cccl.exceptions as cccl_exc
 import json
 import jsonschema
+import pytest
 
 
 def validate(validator, services):
@@ -158,7 +159,9 @@ def validate_types(validator, schema, services, rsc_type, rscs):
                         rsc[key] = tmp
 
 
-def test_resources():
+@pytest.mark.parametrize("cache_size, compiled", [
+    (0, False), (100, False), (0, True), (100, True)])
+def test_resources(cache_size, compiled):
     """Load a service description and validate it with the schema."""
     resourceTypes = [
         {
@@ -185,7 +188,8 @@ def test_resources():
         svcfile = rType['file']
         services = json.loads(open(svcfile, 'r').read())
     
-        validator = validation.ServiceConfigValidator(rType['schema'])
+        validator = validation.ServiceConfigValidator(
+            rType['schema'], cache_size=cache_size, compiled=compiled)
         result = validate(validator, services)
         assert result == 'Schema Valid'
     
@@ -199,3 +203,69 @@ def test_resources():
             validate_required(validator, schema, services, key, value)
             validate_defaults(validator, schema, services, key, value)
             validate_types(validator, schema, services, key, value)
+
+
+def test_validation_cache():
+    """Test that cached items are not validated again."""
+    services = json.loads(
+        open('f5_cccl/schemas/tests/ltm_service.json', 'r').read())
+    expected = json.loads(json.dumps(services))
+    validation.ServiceConfigValidator().validate(expected)
+
+    validator = validation.ServiceConfigValidator(cache_size=100)
+    validator.validate(json.loads(json.dumps(services)))
+
+    # The cached items get the same defaults as a full validation.
+    cached = json.loads(json.dumps(services))
+    validator._item_validators = dict(
+        (name, None) for name in validator._item_validators)
+    validator.validate(cached)
+    assert cached == expected
+
+    # The errors are the same as those of a full validation.
+    invalid = json.loads(json.dumps(services))
+    invalid['pools'][0]['loadBalancingMode'] = 'invalid'
+    with pytest.raises(cccl_exc.F5CcclValidationError) as full_error:
+        validation.ServiceConfigValidator().validate(
+            json.loads(json.dumps(invalid)))
+    validator = validation.ServiceConfigValidator(cache_size=100)
+    with pytest.raises(cccl_exc.F5CcclValidationError) as cached_error:
+        validator.validate(invalid)
+    assert str(cached_error.value) == str(full_error.value)
+
+
+def test_compiled_validation(tmpdir):
+    """Test validating with the compiled schema."""
+    services = json.loads(
+        open('f5_cccl/schemas/tests/ltm_service.json', 'r').read())
+    expected = json.loads(json.dumps(services))
+    validation.ServiceConfigValidator().validate(expected)
+
+    validator = validation.ServiceConfigValidator(
+        compiled=True, compiled_cache_dir=str(tmpdir))
+    assert validator._compiled is not None
+    assert len(tmpdir.listdir()) == 1
+
+    # The compiled schema sets the same defaults, without jsonschema.
+    compiled = json.loads(json.dumps(services))
+    validator.validator = None
+    validator.validate(compiled)
+    assert compiled == expected
+
+    # The cached source is used by the next validator.
+    with open(str(tmpdir.listdir()[0]), 'a') as source_file:
+        source_file.write("ENTRIES[''] = lambda instance: False\n")
+    validator = validation.ServiceConfigValidator(
+        compiled=True, compiled_cache_dir=str(tmpdir))
+    assert not validator._compiled[''](expected)
+
+    # The errors are reported by jsonschema.
+    invalid = json.loads(json.dumps(services))
+    invalid['pools'][0]['loadBalancingMode'] = 'invalid'
+    with pytest.raises(cccl_exc.F5CcclValidationError) as full_error:
+        validation.ServiceConfigValidator().validate(
+            json.loads(json.dumps(invalid)))
+    validator = validation.ServiceConfigValidator(compiled=True)
+    with pytest.raises(cccl_exc.F5CcclValidationError) as compiled_error:
+        validator.validate(invalid)
+    assert str(compiled_error.value) == str(full_error.value)
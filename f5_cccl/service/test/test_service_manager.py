@@ -19,13 +19,18 @@ import pickle
 import pytest
 from f5_cccl.test.conftest import bigip_proxy
 
+import f5_cccl.exceptions as exc
+
 from f5_cccl.resource.ltm.app_service import ApplicationService 
 from f5_cccl.resource.ltm.virtual import VirtualServer 
+from f5_cccl.resource.ltm.pool import IcrPool
 from f5_cccl.resource.ltm.pool import Pool 
 from f5_cccl.resource.ltm.monitor.http_monitor import HTTPMonitor 
+from f5_cccl.resource.ltm.node import Node
 from f5_cccl.resource.ltm.policy.policy import Policy 
 from f5_cccl.resource.ltm.internal_data_group import InternalDataGroup
 from f5_cccl.resource.ltm.irule import IRule
+from f5_cccl.resource.ltm.virtual_address import IcrVirtualAddress
 from f5_cccl.resource.net.arp import Arp
 from f5_cccl.resource.net.fdb.tunnel import FDBTunnel
 
@@ -36,6 +41,7 @@ from f5_cccl.service.config_reader import ServiceConfigReader
 from mock import MagicMock
 from mock import Mock
 from mock import patch
+from time import time
 
 
 @pytest.fixture
@@ -64,6 +70,17 @@ def net_service_manager():
     return service_mgr
 
 
+@pytest.fixture
+def mock_bigip_proxy():
+    """A mock BIG-IP proxy, whose requests are sent on a mock session."""
+    bigip_proxy = MagicMock()
+    bigip_proxy.mgmt_root()._meta_data = {
+        'uri': "https://localhost/mgmt/tm/",
+        'icr_session': MagicMock()
+    }
+    return bigip_proxy
+
+
 def test_apply_ltm_config(ltm_service_manager):
     services = {}
     assert ltm_service_manager.apply_ltm_config(services) == 0
@@ -343,3 +360,555 @@ class TestServiceConfigDeployer:
         objs = self.get_deleted_net_objects(net_service_manager, FDBTunnel)
         assert 1 == len(objs)
         assert 'tunnel1' == objs[0].name
+
+
+def test_deploy_ltm_write_through_cache(bigip_proxy):
+    """Test that deployed changes are applied to the BIG-IP proxy cache."""
+    ltm_svcfile = 'f5_cccl/schemas/tests/ltm_service.json'
+    with open(ltm_svcfile, 'r') as fp:
+        ltm_service = json.loads(fp.read())
+    # Deploying iApps refreshes the whole cache.
+    del ltm_service['iapps']
+    desired_config = ServiceConfigReader('test').read_ltm_config(ltm_service)
+
+    big_ip = bigip_proxy.mgmt_root()
+    deployer = ServiceConfigDeployer(bigip_proxy)
+    assert 0 == deployer.deploy_ltm(desired_config)
+
+    # The partition is downloaded in full only once per deployment.
+    assert big_ip.tm.ltm.pools.get_collection.call_count == 1
+    assert big_ip.tm.ltm.virtuals.get_collection.call_count == 1
+    assert big_ip.tm.ltm.nodes.get_collection.call_count == 2
+
+    pools = bigip_proxy.get_pools()
+    assert set(pools) == set(desired_config['pools'])
+    for name in pools:
+        assert pools[name] is desired_config['pools'][name]
+
+    virtuals = bigip_proxy.get_virtuals()
+    assert set(virtuals) == set(desired_config['virtuals'])
+    assert 'appsvc' not in bigip_proxy.get_iapps()
+
+
+def test_deploy_ltm_iapps_refresh(bigip_proxy):
+    """Test that the cache is refreshed after deploying iApps."""
+    ltm_svcfile = 'f5_cccl/schemas/tests/ltm_service.json'
+    with open(ltm_svcfile, 'r') as fp:
+        ltm_service = json.loads(fp.read())
+    desired_config = ServiceConfigReader('test').read_ltm_config(ltm_service)
+
+    big_ip = bigip_proxy.mgmt_root()
+    deployer = ServiceConfigDeployer(bigip_proxy)
+    assert 0 == deployer.deploy_ltm(desired_config)
+
+    # The pools and virtuals created by the iApp are retrieved.
+    assert big_ip.tm.ltm.pools.get_collection.call_count == 2
+    assert big_ip.tm.ltm.virtuals.get_collection.call_count == 2
+
+
+def test_deploy_ltm_scheduled(bigip_proxy):
+    """Test deploying the LTM config with concurrent tasks."""
+    ltm_svcfile = 'f5_cccl/schemas/tests/ltm_service.json'
+    with open(ltm_svcfile, 'r') as fp:
+        ltm_service = json.loads(fp.read())
+    del ltm_service['iapps']
+    desired_config = ServiceConfigReader('test').read_ltm_config(ltm_service)
+
+    deployer = ServiceConfigDeployer(bigip_proxy, deploy_workers=4)
+    assert 0 == deployer.deploy_ltm(desired_config)
+
+    pools = bigip_proxy.get_pools()
+    assert set(pools) == set(desired_config['pools'])
+    virtuals = bigip_proxy.get_virtuals()
+    assert set(virtuals) == set(desired_config['virtuals'])
+
+
+def test_task_dependencies(bigip_proxy):
+    """Test the dependencies between the scheduled tasks."""
+    ltm_svcfile = 'f5_cccl/schemas/tests/ltm_service.json'
+    with open(ltm_svcfile, 'r') as fp:
+        ltm_service = json.loads(fp.read())
+    desired_config = ServiceConfigReader('test').read_ltm_config(ltm_service)
+    bigip_proxy.refresh_ltm()
+
+    virtual = desired_config['virtuals']['vs1']
+    vaddr = desired_config['virtual_addresses']['MyVaddr']
+    irule = desired_config['irules']['https_redirect']
+    existing_virtual = bigip_proxy.get_virtuals()['virtual2']
+    existing_pool = bigip_proxy.get_pools()['pool1']
+
+    tasks = [('create', virtual),
+             ('create', vaddr),
+             ('create', irule),
+             ('delete', existing_virtual),
+             ('delete', existing_pool)]
+    deployer = ServiceConfigDeployer(bigip_proxy, deploy_workers=4)
+    dependencies = deployer._get_task_dependencies(tasks)
+
+    # The virtual is created after its virtual address.
+    assert dependencies[0] == {1}
+    assert dependencies[1] == set()
+    assert dependencies[2] == set()
+    # The pool is deleted after the virtual that references it.
+    assert dependencies[3] == set()
+    assert dependencies[4] == {3}
+
+
+def test_run_transactions(mock_bigip_proxy):
+    """Test committing the deployment tasks in transactions."""
+    bigip_proxy = mock_bigip_proxy
+    mgmt_root = bigip_proxy.mgmt_root()
+    icr_session = mgmt_root._meta_data['icr_session']
+    icr_session.session.headers = dict()
+    icr_session.post.return_value.json.return_value = {'transId': 1}
+
+    # A transaction fails when it includes the bad resource.
+    applied = list()
+    bad_resource = MagicMock()
+
+    def commit(uri, json):
+        resources = list(applied)
+        del applied[:]
+        response = MagicMock()
+        response.json.return_value = {
+            'state': "FAILED" if bad_resource in resources else "COMPLETED"
+        }
+        return response
+
+    def record(resource):
+        def apply_task(*args, **kwargs):
+            assert kwargs['headers'] == {'X-F5-REST-Coordination-Id': "1"}
+            applied.append(resource)
+        return apply_task
+
+    icr_session.patch.side_effect = commit
+    resources = [MagicMock() for _ in range(6)] + [bad_resource]
+    for resource in resources:
+        resource.create.side_effect = record(resource)
+        resource.update.side_effect = record(resource)
+        resource.delete.side_effect = record(resource)
+
+    deployer = ServiceConfigDeployer(bigip_proxy, transaction_size=4)
+    (create_tasks, update_tasks, delete_tasks) = deployer._run_transactions(
+        resources[0:2], resources[2:4] + [bad_resource], resources[4:6])
+
+    assert create_tasks == []
+    assert update_tasks == [bad_resource]
+    assert delete_tasks == []
+    # The session headers are left alone, and the failed transactions
+    # are deleted.
+    assert icr_session.session.headers == dict()
+    assert icr_session.delete.call_count == 2
+    icr_session.delete.assert_called_with(
+        "https://localhost/mgmt/tm/transaction/1")
+    headers = {'X-F5-REST-Coordination-Id': "1"}
+    for resource in resources[0:2]:
+        resource.create.assert_called_with(
+            mgmt_root, direct=True, headers=headers)
+    for resource in resources[2:4]:
+        resource.update.assert_called_with(
+            mgmt_root, data=resource.changed_fields.return_value,
+            modify=True, direct=True, headers=headers)
+    for resource in resources[4:6]:
+        resource.delete.assert_called_with(
+            mgmt_root, direct=True, headers=headers)
+    assert bigip_proxy.cache_resource.call_count == 4
+    assert bigip_proxy.uncache_resource.call_count == 2
+
+
+@pytest.mark.parametrize("result", [
+    {'state': "VALIDATING"},
+    {'state': "STARTED"},
+    {}
+])
+def test_run_transactions_not_completed(mock_bigip_proxy, result):
+    """Test that a transaction that did not complete is not cached."""
+    bigip_proxy = mock_bigip_proxy
+    mgmt_root = bigip_proxy.mgmt_root()
+    icr_session = mgmt_root._meta_data['icr_session']
+    icr_session.post.return_value.json.return_value = {'transId': 1}
+    icr_session.patch.return_value.json.return_value = result
+    resources = [MagicMock() for _ in range(2)]
+
+    deployer = ServiceConfigDeployer(bigip_proxy, transaction_size=4)
+    assert deployer._run_transactions(resources, [], []) == (
+        resources, [], [])
+
+    # The transaction and each of its halves are deleted.
+    assert icr_session.delete.call_count == 3
+    icr_session.delete.assert_called_with(
+        "https://localhost/mgmt/tm/transaction/1")
+    assert not bigip_proxy.cache_resource.called
+
+
+def test_run_transactions_pool_members(mock_bigip_proxy):
+    """Test that a pool update in a transaction includes its members."""
+    bigip_proxy = mock_bigip_proxy
+    mgmt_root = bigip_proxy.mgmt_root()
+    icr_session = mgmt_root._meta_data['icr_session']
+    icr_session.session.headers = dict()
+    icr_session.post.return_value.json.return_value = {'transId': 1}
+    icr_session.patch.return_value.json.return_value = {
+        'state': "COMPLETED"}
+    pools = MagicMock()
+    pools._meta_data = {'uri': "https://localhost/mgmt/tm/ltm/pool/"}
+    mgmt_root.tm.ltm.pools.pool._meta_data = {'container': pools}
+
+    existing = IcrPool(
+        name="pool1", partition="test",
+        membersReference={'items': [
+            {'name': "10.1.1.1:80", 'partition': "test"},
+            {'name': "10.1.1.2:80", 'partition': "test"}
+        ]})
+    bigip_proxy.get_cached_resource.return_value = existing
+    desired = ServiceConfigReader('test').read_ltm_config(
+        {'pools': [{'name': "pool1",
+                    'loadBalancingMode': "least-connections-member",
+                    'members': [{'address': "10.1.1.2", 'port': 80},
+                                {'address': "10.1.1.3", 'port': 80}]}]}
+    )['pools']['pool1']
+
+    deployer = ServiceConfigDeployer(bigip_proxy, transaction_size=4)
+    assert deployer._run_transactions([], [desired], []) == ([], [], [])
+
+    # The pool is replaced as a whole, with its properties and members.
+    assert icr_session.put.call_count == 1
+    assert icr_session.put.call_args[0][0] == (
+        "https://localhost/mgmt/tm/ltm/pool/~test~pool1")
+    payload = icr_session.put.call_args[1]['json']
+    assert payload['loadBalancingMode'] == "least-connections-member"
+    assert sorted(m['name'] for m in payload['membersReference']['items']) == [
+        "10.1.1.2:80", "10.1.1.3:80"]
+    assert icr_session.patch.call_count == 1
+    bigip_proxy.cache_resource.assert_called_once_with(desired)
+
+
+def test_deploy_pool_member_delta(mock_bigip_proxy):
+    """Test applying a pool member delta with member-level requests."""
+    bigip_proxy = mock_bigip_proxy
+    mgmt_root = bigip_proxy.mgmt_root()
+    icr_session = mgmt_root._meta_data['icr_session']
+    pools = MagicMock()
+    pools._meta_data = {'uri': "https://localhost/mgmt/tm/ltm/pool/"}
+    mgmt_root.tm.ltm.pools.pool._meta_data = {'container': pools}
+    members_uri = "https://localhost/mgmt/tm/ltm/pool/~test~pool1/members/"
+
+    existing = {
+        'name': "pool1", 'partition': "test",
+        'membersReference': {'items': [
+            {'name': "10.1.1.1:80", 'partition': "test", 'ratio': 1},
+            {'name': "10.1.1.2:80", 'partition': "test", 'ratio': 1},
+            {'name': "10.1.1.3:80", 'partition': "test", 'ratio': 1}
+        ]}
+    }
+    bigip_proxy.refresh_pool.return_value = IcrPool(**existing)
+
+    reader = ServiceConfigReader('test')
+    added = reader.read_pool_members(
+        'pool1', [{'address': "10.1.1.4", 'port': 80}])
+    removed = reader.read_pool_members(
+        'pool1', [{'address': "10.1.1.1", 'port': 80}])
+    changed = reader.read_pool_members(
+        'pool1', [{'address': "10.1.1.2", 'port': 80, 'ratio': 2},
+                  {'address': "10.1.1.3", 'port': 80}])
+
+    deployer = ServiceConfigDeployer(bigip_proxy)
+    assert 0 == deployer.deploy_pool_member_delta(
+        'pool1', added, removed, changed)
+
+    bigip_proxy.refresh_pool.assert_called_once_with('pool1')
+    icr_session.post.assert_called_once_with(
+        members_uri, json=added[0].data)
+    icr_session.delete.assert_called_once_with(
+        members_uri + "~test~10.1.1.1%3A80")
+    assert icr_session.patch.call_count == 1
+    assert icr_session.patch.call_args[0][0] == (
+        members_uri + "~test~10.1.1.2%3A80")
+    assert icr_session.patch.call_args[1]['json']['ratio'] == 2
+    assert not icr_session.put.called
+
+    # The cached pool reflects the new pool members.
+    pool = bigip_proxy.cache_resource.call_args[0][0]
+    assert sorted(m.name for m in pool.members) == [
+        "10.1.1.2%3A80", "10.1.1.3%3A80", "10.1.1.4%3A80"]
+
+
+def test_apply_pool_member_delta_validation():
+    """Test that the pool member delta is validated against the schema."""
+    schema = 'f5_cccl/schemas/cccl-ltm-api-schema.yml'
+    service_mgr = ServiceManager(MagicMock(), 'test', schema)
+
+    with pytest.raises(exc.F5CcclValidationError):
+        service_mgr.apply_pool_member_delta(
+            'pool1', [{'address': "10.1.1.4"}], [], [])
+
+
+def test_update_pool_members(mock_bigip_proxy):
+    """Test that a pool update only sends the changed pool members."""
+    bigip_proxy = mock_bigip_proxy
+    mgmt_root = bigip_proxy.mgmt_root()
+    icr_session = mgmt_root._meta_data['icr_session']
+    pools = MagicMock()
+    pools._meta_data = {'uri': "https://localhost/mgmt/tm/ltm/pool/"}
+    mgmt_root.tm.ltm.pools.pool._meta_data = {'container': pools}
+    members_uri = "https://localhost/mgmt/tm/ltm/pool/~test~pool1/members/"
+
+    existing = IcrPool(
+        name="pool1", partition="test",
+        membersReference={'items': [
+            {'name': "10.1.1.{}:80".format(i), 'partition': "test"}
+            for i in range(1, 101)
+        ]})
+    bigip_proxy.get_cached_resource.return_value = existing
+
+    members = [{'address': "10.1.1.{}".format(i), 'port': 80}
+               for i in range(2, 102)]
+    members[0]['ratio'] = 2
+    desired = ServiceConfigReader('test').read_ltm_config(
+        {'pools': [{'name': "pool1", 'members': members}]})['pools']['pool1']
+
+    deployer = ServiceConfigDeployer(bigip_proxy)
+    assert deployer._update_resources([desired]) == []
+
+    # Only the changed members are sent to the BIG-IP.
+    assert not mgmt_root.tm.ltm.pools.pool.load.called
+    icr_session.post.assert_called_once_with(
+        members_uri, json=desired.members[-1].data)
+    icr_session.patch.assert_called_once_with(
+        members_uri + "~test~10.1.1.2%3A80", json={'ratio': 2})
+    icr_session.delete.assert_called_once_with(
+        members_uri + "~test~10.1.1.1%3A80")
+    bigip_proxy.cache_resource.assert_called_once_with(desired)
+
+    # A change to the pool properties modifies the pool without members.
+    desired.data['loadBalancingMode'] = "least-connections-member"
+    mgmt_root.tm.ltm.pools.pool.load.return_value = MagicMock()
+    assert deployer._update_resources([desired]) == []
+    pool_obj = mgmt_root.tm.ltm.pools.pool.load.return_value
+    pool_obj.modify.assert_called_once_with(
+        loadBalancingMode="least-connections-member")
+    assert not pool_obj.update.called
+
+
+def test_modify_resource():
+    """Test that an update only sends the fields that changed."""
+    bigip_proxy = MagicMock()
+    mgmt_root = bigip_proxy.mgmt_root()
+    existing = Node(name="10.1.1.1", partition="test", address="10.1.1.1",
+                    state="user-down", description="node")
+    desired = Node(name="10.1.1.1", partition="test", address="10.1.1.2",
+                   state="user-up", description="node")
+    bigip_proxy.get_cached_resource.return_value = existing
+    node_obj = mgmt_root.tm.ltm.nodes.node.load.return_value
+
+    deployer = ServiceConfigDeployer(bigip_proxy)
+    assert deployer._update_resources([desired]) == []
+
+    # The address is immutable, only the state is changed.
+    node_obj.modify.assert_called_once_with(state="user-up")
+    assert not node_obj.update.called
+
+    # Resources that are not cached are updated as a whole.
+    bigip_proxy.get_cached_resource.return_value = None
+    assert deployer._update_resources([desired]) == []
+    assert node_obj.update.call_count == 1
+
+
+def test_post_deploy_enables_virtual_addresses():
+    """Test that auto-created virtual addresses are enabled."""
+    bigip_proxy = MagicMock()
+    bigip_proxy.get_nodes.return_value = dict()
+    bigip_proxy.get_pools.return_value = dict()
+    vaddr = IcrVirtualAddress(name="10.1.1.1", partition="test",
+                              address="10.1.1.1", enabled="no")
+    fingerprint = vaddr.fingerprint
+    bigip_proxy.get_virtual_address_references.return_value = (
+        {'10.1.1.1': vaddr}, dict())
+    bigip_proxy.get_cached_resource.return_value = vaddr
+    ltm = bigip_proxy.mgmt_root().tm.ltm
+    vaddr_obj = ltm.virtual_address_s.virtual_address.load.return_value
+
+    deployer = ServiceConfigDeployer(bigip_proxy)
+    deployer._post_deploy(dict())
+
+    vaddr_obj.modify.assert_called_once_with(enabled="yes")
+    enabled = bigip_proxy.cache_resource.call_args[0][0]
+    assert enabled.data['enabled'] == "yes"
+    assert enabled.fingerprint != fingerprint
+    # The cached virtual address is left unchanged.
+    assert vaddr.data['enabled'] == "no"
+    assert vaddr.fingerprint == fingerprint
+
+
+def test_desired_nodes():
+    """Test that the desired nodes are found by member address."""
+    bigip_proxy = MagicMock()
+    nodes = [
+        Node(name="10.1.1.1", partition="test", address="10.1.1.1"),
+        Node(name="10.1.1.2%2", partition="test", address="10.1.1.2%2"),
+        Node(name="2001:db8::1", partition="test", address="2001:db8::1"),
+        Node(name="10.1.1.3", partition="test", address="10.1.1.3")
+    ]
+    bigip_proxy.get_node_index.return_value = dict(
+        (node.address_key(), node) for node in nodes)
+    pool = IcrPool(
+        name="pool1", partition="test",
+        membersReference={'items': [
+            {'name': "10.1.1.1:80", 'partition': "test"},
+            {'name': "10.1.1.1:8080", 'partition': "test"},
+            {'name': "10.1.1.2%2:80", 'partition': "test"},
+            {'name': "2001:db8::1.80", 'partition': "test"}
+        ]})
+    bigip_proxy.get_pools.return_value = {'pool1': pool}
+
+    deployer = ServiceConfigDeployer(bigip_proxy)
+    desired_nodes = deployer._desired_nodes()
+
+    assert sorted(desired_nodes) == ["10.1.1.1", "10.1.1.2%2", "2001:db8::1"]
+    assert desired_nodes["10.1.1.2%2"].data['address'] == "10.1.1.2%2"
+    assert desired_nodes["10.1.1.1"].data['state'] == "user-up"
+
+
+def test_update_tunnel_records(mock_bigip_proxy):
+    """Test that a tunnel update only sends the changed records."""
+    bigip_proxy = mock_bigip_proxy
+    mgmt_root = bigip_proxy.mgmt_root()
+    icr_session = mgmt_root._meta_data['icr_session']
+    tunnels = MagicMock()
+    tunnels._meta_data = {'uri': "https://localhost/mgmt/tm/net/fdb/tunnel/"}
+    mgmt_root.tm.net.fdb.tunnels.tunnel._meta_data = {'container': tunnels}
+    records_uri = (
+        "https://localhost/mgmt/tm/net/fdb/tunnel/~test~vxlan/records/")
+
+    records = [{'name': "0a:0a:0a:0a:{:02x}:00".format(i),
+                'endpoint': "10.1.1.{}".format(i)} for i in range(1, 101)]
+    existing = FDBTunnel(name="vxlan", partition="test", records=records)
+    bigip_proxy.get_cached_resource.return_value = existing
+    desired = FDBTunnel(name="vxlan", partition="test",
+                        records=records[1:] + [
+                            {'name': "0a:0a:0a:0a:ff:00",
+                             'endpoint': "10.1.1.255"}])
+
+    deployer = ServiceConfigDeployer(bigip_proxy)
+    assert deployer._update_resources([desired]) == []
+
+    assert not mgmt_root.tm.net.fdb.tunnels.tunnel.load.called
+    assert not icr_session.put.called
+    icr_session.post.assert_called_once_with(
+        records_uri, json={'name': "0a:0a:0a:0a:ff:00", 'partition': None,
+                           'endpoint': "10.1.1.255"})
+    icr_session.delete.assert_called_once_with(
+        records_uri + "0a%3A0a%3A0a%3A0a%3A01%3A00")
+    bigip_proxy.cache_resource.assert_called_once_with(desired)
+
+
+def test_apply_unchanged_config():
+    """Test that an unchanged configuration is not applied again."""
+    bigip_proxy = MagicMock()
+    bigip_proxy.get_change_token.return_value = "1500000000"
+    schema = 'f5_cccl/schemas/cccl-ltm-api-schema.yml'
+    service_mgr = ServiceManager(bigip_proxy, 'test', schema,
+                                 max_staleness=60)
+    deployer = MagicMock()
+    deployer.deploy_ltm.return_value = 0
+    service_mgr._service_deployer = deployer
+
+    def services():
+        return {'pools': [{'name': "pool1"}]}
+
+    assert service_mgr.apply_ltm_config(services()) == 0
+    assert service_mgr.apply_ltm_config(services()) == 0
+    assert deployer.deploy_ltm.call_count == 1
+
+    # A change on the BIG-IP forces the configuration to be applied.
+    bigip_proxy.get_change_token.return_value = "1500000001"
+    assert service_mgr.apply_ltm_config(services()) == 0
+    assert deployer.deploy_ltm.call_count == 2
+
+    # A change to the configuration is applied.
+    assert service_mgr.apply_ltm_config({'pools': []}) == 0
+    assert deployer.deploy_ltm.call_count == 3
+
+    # A configuration that failed to apply is applied again.
+    deployer.deploy_ltm.return_value = 1
+    assert service_mgr.apply_ltm_config(services()) == 1
+    assert service_mgr.apply_ltm_config(services()) == 1
+    assert deployer.deploy_ltm.call_count == 5
+
+    # The configuration is applied again when it is too old.
+    deployer.deploy_ltm.return_value = 0
+    assert service_mgr.apply_ltm_config(services()) == 0
+    with patch('f5_cccl.service.manager.time', return_value=time() + 61):
+        assert service_mgr.apply_ltm_config(services()) == 0
+    assert deployer.deploy_ltm.call_count == 7
+
+
+def test_apply_report(bigip_proxy):
+    """Test the report of the phases of an apply."""
+    ltm_svcfile = 'f5_cccl/schemas/tests/ltm_service.json'
+    with open(ltm_svcfile, 'r') as fp:
+        ltm_service = json.loads(fp.read())
+    schema = 'f5_cccl/schemas/cccl-ltm-api-schema.yml'
+    callback = MagicMock()
+    service_mgr = ServiceManager(bigip_proxy, 'test', schema,
+                                 apply_reports=True,
+                                 apply_report_callback=callback)
+    assert service_mgr.get_apply_report() is None
+
+    assert service_mgr.apply_ltm_config(ltm_service) == 0
+    report = service_mgr.get_apply_report()
+    callback.assert_called_once_with(report)
+    assert report['type'] == 'ltm'
+    for phase in ['total', 'validate', 'read', 'refresh', 'refresh.pools',
+                  'diff.virtuals', 'diff.pools', 'create', 'update',
+                  'delete', 'post_deploy']:
+        assert phase in report['timings']
+    assert report['counters']['create_tasks'] > 0
+    assert report['counters']['retry_passes'] == 0
+    assert report['counters']['failed_tasks'] == 0
+
+    # The REST calls are counted while applying only.
+    response = MagicMock()
+    response.request.method = 'GET'
+    bigip_proxy._count_rest_call(response)
+    assert report['rest_calls'] == {}
+
+
+def test_apply_report_disabled(bigip_proxy):
+    """Test that no report is recorded by default."""
+    schema = 'f5_cccl/schemas/cccl-ltm-api-schema.yml'
+    service_mgr = ServiceManager(bigip_proxy, 'test', schema)
+    assert service_mgr.apply_ltm_config({}) == 0
+    assert service_mgr.get_apply_report() is None
+
+
+def test_get_status():
+    """Test that the status is reused for its time to live."""
+    bigip_proxy = MagicMock()
+    bigip_proxy.get_status.side_effect = [{'virtuals': {}, 'pools': {}},
+                                          {'virtuals': {'vs1': {}},
+                                           'pools': {}}]
+    schema = 'f5_cccl/schemas/cccl-ltm-api-schema.yml'
+    service_mgr = ServiceManager(bigip_proxy, 'test', schema, status_ttl=5)
+
+    assert service_mgr.get_status() == {'virtuals': {}, 'pools': {}}
+    assert service_mgr.get_status() == {'virtuals': {}, 'pools': {}}
+    assert bigip_proxy.get_status.call_count == 1
+    with patch('f5_cccl.utils.ttl_cache.time', return_value=time() + 6):
+        assert 'vs1' in service_mgr.get_status()['virtuals']
+    assert bigip_proxy.get_status.call_count == 2
+
+
+def test_get_statistics():
+    """Test that the statistics are sampled from the BIG-IP."""
+    bigip_proxy = MagicMock()
+    bigip_proxy.get_statistics.return_value = {
+        'virtuals': {'vs1': {'clientside.curConns': 1}}, 'pools': {}}
+    schema = 'f5_cccl/schemas/cccl-ltm-api-schema.yml'
+    service_mgr = ServiceManager(bigip_proxy, 'test', schema)
+
+    statistics = service_mgr.get_statistics()
+    assert statistics['virtuals']['vs1']['curConns'] == 1
+    assert statistics['virtuals']['vs1']['connsPerSec'] is None
+    service_mgr.get_statistics()
+    assert bigip_proxy.get_statistics.call_count == 2
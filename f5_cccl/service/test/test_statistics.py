@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# Copyright 2017 F5 Networks Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+from mock import MagicMock
+from mock import patch
+
+from f5_cccl.service.statistics import ServiceStatistics
+
+
+def _sample(conns, bits_in, pool_conns=None):
+    virtuals = {'vs1': {'clientside.curConns': 2,
+                        'clientside.totConns': conns,
+                        'clientside.bitsIn': bits_in}}
+    pools = dict()
+    if pool_conns is not None:
+        pools['pool1'] = {'serverside.totConns': pool_conns,
+                          'activeMemberCnt': 1}
+    return {'virtuals': virtuals, 'pools': pools}
+
+
+def test_statistics_rates():
+    """Test the rates computed from consecutive samples."""
+    bigip_proxy = MagicMock()
+    bigip_proxy.get_statistics.side_effect = [
+        _sample(100, 8000),
+        _sample(150, 12000, pool_conns=40),
+        _sample(10, 16000, pool_conns=60)]
+    statistics = ServiceStatistics(bigip_proxy)
+
+    with patch('f5_cccl.service.statistics.time', return_value=1000.0):
+        first = statistics.get()
+    assert first['interval'] is None
+    assert first['virtuals']['vs1']['curConns'] == 2
+    assert first['virtuals']['vs1']['connsPerSec'] is None
+    assert first['pools'] == {}
+
+    with patch('f5_cccl.service.statistics.time', return_value=1010.0):
+        second = statistics.get()
+    assert second['interval'] == 10.0
+    assert second['virtuals']['vs1']['connsPerSec'] == 5.0
+    assert second['virtuals']['vs1']['bitsInPerSec'] == 400.0
+    assert second['virtuals']['vs1']['bitsOutPerSec'] is None
+    assert second['pools']['pool1']['activeMembers'] == 1
+    assert second['pools']['pool1']['connsPerSec'] is None
+
+    # The counters of the virtual server were reset.
+    with patch('f5_cccl.service.statistics.time', return_value=1015.0):
+        third = statistics.get()
+    assert third['virtuals']['vs1']['connsPerSec'] is None
+    assert third['virtuals']['vs1']['bitsInPerSec'] == 800.0
+    assert third['pools']['pool1']['connsPerSec'] == 4.0
+
+
+def test_statistics_ttl():
+    """Test that a sample is reused for its time to live."""
+    bigip_proxy = MagicMock()
+    bigip_proxy.get_statistics.return_value = _sample(100, 8000)
+    statistics = ServiceStatistics(bigip_proxy, ttl=10)
+
+    assert statistics.get() is statistics.get()
+    assert bigip_proxy.get_statistics.call_count == 1
@@ -18,6 +18,8 @@
 
 from __future__ import print_function
 
+import copy
+import hashlib
 import logging
 from time import time
 
@@ -28,6 +30,9 @@ import simplejson as json
 import yaml
 
 import f5_cccl.exceptions as cccl_exc
+from f5_cccl.service.schema_compiler import compile_schema
+from f5_cccl.service.schema_compiler import UnsupportedSchemaError
+from f5_cccl.utils.lru_cache import LRUCache
 
 LOGGER = logging.getLogger(__name__)
 DEFAULT_LTM_SCHEMA = "./f5_cccl/schemas/cccl-ltm-api-schema.yml"
@@ -48,6 +53,19 @@ def read_json(target):
     return json_data
 
 
+def _replay_defaults(instance, validated):
+    """Set the default values of a validated copy of an instance."""
+    if isinstance(instance, dict) and isinstance(validated, dict):
+        for key, value in validated.items():
+            if key not in instance:
+                instance[key] = copy.deepcopy(value)
+            else:
+                _replay_defaults(instance[key], value)
+    elif isinstance(instance, list) and isinstance(validated, list):
+        for (item, validated_item) in zip(instance, validated):
+            _replay_defaults(item, validated_item)
+
+
 def read_yaml_or_json(target):
     """Read json or yaml, return a dict."""
     if target.lower().endswith('.json'):
@@ -67,10 +85,28 @@ class ServiceConfigValidator(object):
 
     Optionally accepts an alternate json or yaml schema to validate against.
 
+    Optionally caches the items of the top-level lists (each virtual server,
+    pool, etc.) that were validated, so that only the items that are new or
+    changed are validated again.
+
+    Optionally compiles the schema into Python functions that check whether
+    a configuration is valid, only using the Draft4Validator to report the
+    errors of an invalid configuration.
+
     """
-    def __init__(self, schema=DEFAULT_LTM_SCHEMA):
+    def __init__(self, schema=DEFAULT_LTM_SCHEMA, cache_size=0,
+                 compiled=False, compiled_cache_dir=None):
         """Choose schema and initialize extended Draft4Validator.
 
+        Args:
+            schema: Path of the json or yaml API schema.
+            cache_size: Maximum number of validated items to cache, 0 to
+                validate the whole configuration every time.
+            compiled: Check configurations with validation functions
+                compiled from the schema.
+            compiled_cache_dir: Directory to cache the compiled schema in,
+                None to compile the schema every time.
+
         Raises:
             F5CcclSchemaError: Failed to read or validate the CCCL
             API schema file.
@@ -98,6 +134,63 @@ class ServiceConfigValidator(object):
             LOGGER.error("%s", error)
             raise cccl_exc.F5CcclSchemaError("Invalid API schema")
 
+        self._cache = None
+        self._item_validators = dict()
+        if cache_size > 0:
+            self._cache = LRUCache(cache_size)
+            self._item_validators = self._get_item_validators(
+                validator_with_defaults)
+
+        self._compiled = None
+        if compiled:
+            self._compiled = self._compile(compiled_cache_dir)
+
+    def _item_schemas(self):
+        """Get the schemas of the items of the top-level lists.
+
+        Only the lists that are not constrained by anything but the schema
+        of their items are validated item by item.
+        """
+        item_schemas = dict()
+        for name, subschema in self.schema.get('properties', {}).items():
+            if 'items' not in subschema:
+                continue
+            if set(subschema) - set(['items', 'type', 'description']):
+                continue
+            item_schemas[name] = subschema['items']
+        return item_schemas
+
+    def _get_item_validators(self, validator_class):
+        """Get the validators of the items of the top-level lists."""
+        return dict(
+            (name, validator_class(subschema,
+                                   resolver=self.validator.resolver))
+            for (name, subschema) in self._item_schemas().items())
+
+    def _compile(self, cache_dir):
+        """Compile the schema, and the schemas of the list items.
+
+        Returns:
+            Map of the list name ('' for the whole configuration) to its
+            validation function, or None if the schema cannot be compiled.
+        """
+        entries = dict(self._item_schemas())
+        entries[''] = self.schema
+        try:
+            return compile_schema(self.schema, entries, cache_dir=cache_dir)
+        except UnsupportedSchemaError as error:
+            LOGGER.warning("Schema not compiled, using jsonschema: %s",
+                           error)
+        return None
+
+    def _is_valid(self, instance, name=''):
+        """Check a configuration, or an item of the list 'name'."""
+        if self._compiled is not None:
+            return self._compiled[name](instance)
+        elif name:
+            return self._item_validators[name].is_valid(instance)
+        return self.validator.is_valid(instance)
+
     def __set_defaults(self, validator, properties, instance, schema):
         """Helper function to simply return when setting defaults."""
         for item, subschema in properties.items():
@@ -115,9 +208,53 @@ class ServiceConfigValidator(object):
 
         try:
             LOGGER.debug("validate start")
-            self.validator.validate(cfg)
+            if self._cache is None or not isinstance(cfg, dict):
+                if not self._compiled or not self._is_valid(cfg):
+                    self.validator.validate(cfg)
+            elif not self._validate_items(cfg):
+                # Get the same error as a full validation.
+                self.validator.validate(cfg)
         except jsonschema.exceptions.ValidationError as err:
             msg = str(err)
             raise cccl_exc.F5CcclValidationError(msg)
         finally:
             LOGGER.debug("validate took %.5f seconds.", (time() - start_time))
+
+    def _validate_items(self, cfg):
+        """Validate a config, item by item for the top-level lists.
+
+        The items that were validated before are not validated again, the
+        default values that the validation set are copied instead.
+
+        Returns:
+            True if the config is valid, False otherwise.
+        """
+        lists = dict(
+            (name, items) for (name, items) in cfg.items()
+            if name in self._item_validators and isinstance(items, list))
+
+        # Validate the config without the items of the lists.
+        shell = dict(cfg)
+        for name in lists:
+            shell[name] = list()
+        if not self._is_valid(shell):
+            return False
+        for name, value in shell.items():
+            if name not in lists:
+                cfg.setdefault(name, value)
+
+        for name, items in lists.items():
+            for item in items:
+                serialized = json.dumps(item, sort_keys=True,
+                                        separators=(',', ':'))
+                key = (name, hashlib.sha1(
+                    serialized.encode('utf-8')).hexdigest())
+                validated = self._cache.get(key)
+                if validated is not None:
+                    _replay_defaults(item, validated)
+                    continue
+                if not self._is_valid(item, name):
+                    return False
+                self._cache.put(key, copy.deepcopy(item))
+
+        return True
@@ -28,7 +28,7 @@ class MockNode():
         self.name = name
         for key in kwargs:
             setattr(self, key, kwargs[key])
-        self.raw = self.__dict__
+        self.raw = dict(self.__dict__)
 
     def modify(self, **kwargs):
         """Placeholder: This will be mocked."""
@@ -59,7 +59,7 @@ class Pool():
         self.name = name
         for key in kwargs:
             setattr(self, key, kwargs[key])
-        self.raw = self.__dict__
+        self.raw = dict(self.__dict__)
 
     def modify(self, **kwargs):
         """Placeholder: This will be mocked."""
@@ -90,7 +90,7 @@ class Policy():
         self.name = name
         for key in kwargs:
             setattr(self, key, kwargs[key])
-        self.raw = self.__dict__
+        self.raw = dict(self.__dict__)
 
     def modify(self, **kwargs):
         """Placeholder: This will be mocked."""
@@ -121,7 +121,7 @@ class IRule():
         self.name = name
         for key in kwargs:
             setattr(self, key, kwargs[key])
-        self.raw = self.__dict__
+        self.raw = dict(self.__dict__)
 
     def modify(self, **kwargs):
         """Placeholder: This will be mocked."""
@@ -152,7 +152,7 @@ class VirtualAddress():
         self.name = name
         for key in kwargs:
             setattr(self, key, kwargs[key])
-        self.raw = self.__dict__
+        self.raw = dict(self.__dict__)
 
     def modify(self, **kwargs):
         """Placeholder: This will be mocked."""
@@ -259,7 +259,7 @@ class Virtual():
         for key in kwargs:
             setattr(self, key, kwargs[key])
 
-        self.raw = self.__dict__
+        self.raw = dict(self.__dict__)
 
     def modify(self, **kwargs):
         """Placeholder: This will be mocked."""
@@ -307,7 +307,7 @@ class Arp():
         for key in kwargs:
             setattr(self, key, kwargs[key])
 
-        self.raw = self.__dict__
+        self.raw = dict(self.__dict__)
 
     def modify(self, **kwargs):
         """Placeholder: This will be mocked."""
@@ -335,7 +335,7 @@ class FDBTunnel():
         for key in kwargs:
             setattr(self, key, kwargs[key])
 
-        self.raw = self.__dict__
+        self.raw = dict(self.__dict__)
 
     def modify(self, **kwargs):
         """Placeholder: This will be mocked."""
@@ -431,7 +431,7 @@ class Iapp():
         self.name = name
         for key in kwargs:
             setattr(self, key, kwargs[key])
-        self.raw = self.__dict__
+        self.raw = dict(self.__dict__)
 
     def delete(self):
         """Mock delete method."""
@@ -452,7 +452,7 @@ class InternalDataGroup():
         #self.partition = partition
         for key in kwargs:
             setattr(self, key, kwargs[key])
-        self.raw = self.__dict__
+        self.raw = dict(self.__dict__)
 
     def modify(self, **kwargs):
         """Placeholder: This will be mocked."""
@@ -491,7 +491,7 @@ class MockHttp():
         self.name = name
         for key in kwargs:
             setattr(self, key, kwargs[key])
-        self.raw = self.__dict__
+        self.raw = dict(self.__dict__)
 
     def create(self, partition=None, **kwargs):
         """Create a http healthcheck object."""
@@ -14,6 +14,14 @@
 # limitations under the License.
 #
 
+from f5.sdk_exception import F5SDKError
+from icontrol.exceptions import iControlUnexpectedHTTPError
+from mock import MagicMock
+import pytest
+
+from f5_cccl import bigip
+import f5_cccl.exceptions as exceptions
+
 # LTM resources
 from f5_cccl.resource.ltm.pool import IcrPool
 from f5_cccl.resource.ltm.virtual import VirtualServer
@@ -148,3 +156,444 @@ def test_bigip_properties(bigip_proxy):
     tcp_hc = big_ip.get_tcp_monitors()
     udp_hc = big_ip.get_udp_monitors()
     icmp_hc = big_ip.get_icmp_monitors()
+
+
+def test_bigip_concurrent_refresh_ltm(bigip_proxy):
+    """Test BIG-IP refresh_ltm with concurrent collection retrieval."""
+    big_ip = bigip_proxy.mgmt_root()
+    concurrent_proxy = bigip.BigIPProxy(big_ip, 'test', refresh_workers=4)
+
+    bigip_proxy.refresh_ltm()
+    concurrent_proxy.refresh_ltm()
+
+    assert big_ip.tm.ltm.pools.get_collection.call_count == 2
+    assert big_ip.tm.ltm.virtuals.get_collection.call_count == 2
+
+    assert concurrent_proxy.get_pools() == bigip_proxy.get_pools()
+    assert concurrent_proxy.get_virtuals() == bigip_proxy.get_virtuals()
+    assert concurrent_proxy.get_nodes() == bigip_proxy.get_nodes()
+    assert concurrent_proxy.get_iapps() == bigip_proxy.get_iapps()
+
+
+def test_bigip_concurrent_refresh_ltm_error(bigip_proxy):
+    """Test BIG-IP concurrent refresh_ltm raises a cache refresh error."""
+    big_ip = bigip_proxy.mgmt_root()
+    concurrent_proxy = bigip.BigIPProxy(big_ip, 'test', refresh_workers=4)
+
+    big_ip.tm.ltm.pools.get_collection.side_effect = F5SDKError
+
+    with pytest.raises(exceptions.F5CcclCacheRefreshError):
+        concurrent_proxy.refresh_ltm()
+
+
+def test_bigip_cache_resource(bigip_proxy):
+    """Test applying created, updated and deleted resources to the cache."""
+    bigip_proxy.refresh_ltm()
+
+    pool = IcrPool(name='pool2', partition='test')
+    bigip_proxy.cache_resource(pool)
+    assert bigip_proxy.get_pools()['pool2'] is pool
+    assert bigip_proxy.get_pools(all_pools=True)['pool2'] is pool
+
+    virtual = VirtualServer(name='vs2', partition='test',
+                            destination='/test/10.0.0.2:80')
+    bigip_proxy.cache_resource(virtual)
+    assert bigip_proxy.get_virtuals()['vs2'] is virtual
+    assert bigip_proxy.get_virtuals(all_virtuals=True)['vs2'] is virtual
+
+    bigip_proxy.uncache_resource(pool)
+    assert 'pool2' not in bigip_proxy.get_pools()
+    assert 'pool2' not in bigip_proxy.get_pools(all_pools=True)
+
+    # Removing a resource that is not cached is a no-op.
+    bigip_proxy.uncache_resource(pool)
+
+
+def test_bigip_refresh_ltm_addresses(bigip_proxy):
+    """Test BIG-IP refresh of only the nodes and virtual addresses."""
+    big_ip = bigip_proxy.mgmt_root()
+
+    bigip_proxy.refresh_ltm_addresses()
+
+    assert big_ip.tm.ltm.nodes.get_collection.called
+    assert big_ip.tm.ltm.virtual_address_s.get_collection.called
+    assert not big_ip.tm.ltm.pools.get_collection.called
+    assert not big_ip.tm.ltm.virtuals.get_collection.called
+    assert len(bigip_proxy.get_nodes()) == 4
+
+
+def test_bigip_node_index(bigip_proxy):
+    """Test the index of nodes by address and route domain."""
+    bigip_proxy.refresh_ltm()
+
+    nodes = bigip_proxy.get_nodes()
+    node_index = bigip_proxy.get_node_index()
+    assert len(node_index) == len(nodes)
+    for node in nodes.values():
+        assert node_index[node.address_key()] is node
+
+    node = Node(name='10.10.10.10%2', partition='test',
+                address='10.10.10.10%2')
+    bigip_proxy.cache_resource(node)
+    assert node_index[('10.10.10.10', 2)] is node
+
+    bigip_proxy.uncache_resource(node)
+    assert ('10.10.10.10', 2) not in node_index
+
+
+def test_bigip_refresh_pool(bigip_proxy):
+    """Test BIG-IP refresh of a single pool and its members."""
+    big_ip = bigip_proxy.mgmt_root()
+    icr_session = MagicMock()
+    big_ip._meta_data = {
+        'uri': "https://localhost/mgmt/tm/",
+        'icr_session': icr_session
+    }
+    pool_data = [
+        p for p in big_ip.bigip_data['pools'] if p['name'] == 'pool1'
+    ][0]
+    icr_session.get.return_value.json.return_value = pool_data
+
+    pool = bigip_proxy.refresh_pool('pool1')
+
+    icr_session.get.assert_called_once_with(
+        "https://localhost/mgmt/tm/ltm/pool/~test~pool1",
+        params="expandSubcollections=true")
+    assert pool == IcrPool(**pool_data)
+    assert len(pool.members) == len(
+        pool_data['membersReference']['items'])
+    assert bigip_proxy.get_pools()['pool1'] is pool
+    assert not big_ip.tm.ltm.pools.get_collection.called
+
+    response = MagicMock()
+    response.status_code = 404
+    icr_session.get.side_effect = iControlUnexpectedHTTPError(
+        response=response)
+    assert bigip_proxy.refresh_pool('pool1') is None
+    assert 'pool1' not in bigip_proxy.get_pools()
+
+
+def test_bigip_get_change_token(bigip_proxy):
+    """Test retrieving the BIG-IP configuration change token."""
+    big_ip = bigip_proxy.mgmt_root()
+    icr_session = MagicMock()
+    big_ip._meta_data = {
+        'uri': "https://localhost/mgmt/tm/",
+        'icr_session': icr_session
+    }
+    icr_session.get.return_value.json.return_value = {
+        'name': "configsync.localconfigtime", 'value': "1500000000"}
+
+    assert bigip_proxy.get_change_token() == "1500000000"
+    icr_session.get.assert_called_once_with(
+        "https://localhost/mgmt/tm/sys/db/configsync.localconfigtime")
+
+    response = MagicMock()
+    response.status_code = 401
+    icr_session.get.side_effect = iControlUnexpectedHTTPError(
+        response=response)
+    assert bigip_proxy.get_change_token() is None
+
+
+
+def _stats_entry(collection, partition, name, **stats):
+    entries = {'tmName': {'description': "/{}/{}".format(partition, name)}}
+    for (key, value) in stats.items():
+        if isinstance(value, int):
+            entries[key] = {'value': value}
+        else:
+            entries[key] = {'description': value}
+    uri = "https://localhost/mgmt/tm/ltm/{}/~{}~{}/stats".format(
+        collection, partition, name)
+    return {uri: {'nestedStats': {'entries': entries}}}
+
+
+def test_bigip_get_status(bigip_proxy):
+    """Test retrieving the status of the managed resources."""
+    big_ip = bigip_proxy.mgmt_root()
+    icr_session = MagicMock()
+    big_ip._meta_data = {
+        'uri': "https://localhost/mgmt/tm/",
+        'icr_session': icr_session
+    }
+    virtual_stats = dict()
+    virtual_stats.update(_stats_entry(
+        'virtual', 'test', 'vs1', **{
+            'status.availabilityState': 'available',
+            'status.enabledState': 'enabled',
+            'status.statusReason': 'The virtual server is available',
+            'clientside.curConns': 3}))
+    virtual_stats.update(_stats_entry(
+        'virtual', 'test', 'app.app/vs2', **{
+            'status.availabilityState': 'available'}))
+    pool_stats = _stats_entry(
+        'pool', 'test', 'pool1', **{
+            'status.availabilityState': 'offline',
+            'status.enabledState': 'enabled',
+            'status.statusReason': 'The children pool member(s) are down'})
+    pools = [{
+        'name': 'pool1', 'partition': 'test',
+        'membersReference': {'items': [
+            {'name': '10.1.1.1:80', 'state': 'down',
+             'session': 'monitor-enabled'}]}
+    }, {'name': 'pool2', 'partition': 'test'}]
+
+    def get(uri, params=None):
+        response = MagicMock()
+        if uri.endswith('ltm/virtual/stats'):
+            response.json.return_value = {'entries': virtual_stats}
+        elif uri.endswith('ltm/pool/stats'):
+            response.json.return_value = {'entries': pool_stats}
+        else:
+            response.json.return_value = {'items': pools}
+        assert params.startswith("$filter=partition+eq+test")
+        return response
+    icr_session.get.side_effect = get
+
+    assert bigip_proxy.get_status() == {
+        'virtuals': {
+            'vs1': {'availabilityState': 'available',
+                    'enabledState': 'enabled',
+                    'statusReason': 'The virtual server is available'}
+        },
+        'pools': {
+            'pool1': {'availabilityState': 'offline',
+                      'enabledState': 'enabled',
+                      'statusReason': 'The children pool member(s) are down',
+                      'members': {'10.1.1.1:80': {
+                          'state': 'down', 'session': 'monitor-enabled'}}}
+        }
+    }
+    assert icr_session.get.call_count == 3
+
+    response = MagicMock()
+    response.status_code = 401
+    icr_session.get.side_effect = iControlUnexpectedHTTPError(
+        response=response)
+    with pytest.raises(exceptions.F5CcclResourceRequestError):
+        bigip_proxy.get_status()
+
+
+def test_bigip_get_statistics(bigip_proxy):
+    """Test retrieving the stats of the managed resources."""
+    big_ip = bigip_proxy.mgmt_root()
+    icr_session = MagicMock()
+    big_ip._meta_data = {
+        'uri': "https://localhost/mgmt/tm/",
+        'icr_session': icr_session
+    }
+    stats = dict()
+    stats.update(_stats_entry('virtual', 'test', 'vs1', **{
+        'clientside.totConns': 10, 'status.enabledState': 'enabled'}))
+    stats.update(_stats_entry('virtual', 'Common', 'vs2', **{
+        'clientside.totConns': 20}))
+    virtual_response = MagicMock()
+    virtual_response.json.return_value = {'entries': stats}
+    pool_response = MagicMock()
+    pool_response.json.return_value = {'entries': {}}
+    icr_session.get.side_effect = [virtual_response, pool_response]
+
+    assert bigip_proxy.get_statistics() == {
+        'virtuals': {'vs1': {'clientside.totConns': 10,
+                             'status.enabledState': 'enabled'}},
+        'pools': {}
+    }
+    assert [call[0][0] for call in icr_session.get.call_args_list] == [
+        "https://localhost/mgmt/tm/ltm/virtual/stats",
+        "https://localhost/mgmt/tm/ltm/pool/stats"]
+
+    response = MagicMock()
+    response.status_code = 500
+    icr_session.get.side_effect = iControlUnexpectedHTTPError(
+        response=response)
+    with pytest.raises(exceptions.F5CcclResourceRequestError):
+        bigip_proxy.get_statistics()
+
+
+def test_bigip_refresh_ltm_select_fields(bigip_proxy):
+    """Test that only the compared fields are selected on refresh."""
+    big_ip = bigip_proxy.mgmt_root()
+    bigip_proxy.refresh_ltm()
+    pools = dict(bigip_proxy.get_pools())
+    virtuals = dict(bigip_proxy.get_virtuals())
+
+    select_proxy = bigip.BigIPProxy(big_ip, 'test', select_fields=True)
+    select_proxy.refresh_ltm()
+    assert select_proxy.get_pools() == pools
+    assert select_proxy.get_virtuals() == virtuals
+
+    def select(collection):
+        params = collection.get_collection.call_args[1][
+            'requests_params']['params']
+        assert params.startswith(
+            "$filter=partition+eq+test&expandSubcollections=true&$select=")
+        return params.split("$select=")[1].split(',')
+
+    virtual_fields = select(big_ip.tm.ltm.virtuals)
+    for field in ['kind', 'selfLink', 'name', 'partition', 'appService',
+                  'destination', 'profilesReference', 'policiesReference']:
+        assert field in virtual_fields
+    assert 'profiles' not in virtual_fields
+    assert 'membersReference' in select(big_ip.tm.ltm.pools)
+    policy_fields = select(big_ip.tm.ltm.policys)
+    assert 'rulesReference' in policy_fields
+    assert 'status' in policy_fields
+
+
+@pytest.mark.parametrize("select_fields", [False, True])
+def test_bigip_policy_status_check(bigip_proxy, select_fields):
+    """Test that a non-legacy policy is removed from its virtuals."""
+    check_proxy = bigip.BigIPProxy(bigip_proxy.mgmt_root(), 'test',
+                                   select_fields=select_fields)
+    policy = MagicMock(status='published', partition='test')
+    policy.name = 'policy1'
+    virtual = MagicMock(policiesReference={'items': [
+        {'name': 'policy1'}, {'name': 'policy2'}]})
+
+    assert not check_proxy._policy_status_check(policy, [virtual])
+    assert policy.delete.called
+    if select_fields:
+        # Only the policies of a partially retrieved virtual are sent.
+        virtual.modify.assert_called_once_with(
+            policiesReference={'items': [{'name': 'policy2'}]})
+        assert not virtual.update.called
+    else:
+        assert virtual.policiesReference['items'] == [{'name': 'policy2'}]
+        virtual.update.assert_called_once_with()
+        assert not virtual.modify.called
+
+
+class PagedCollection(object):
+    """A collection that returns the pages given by $top and $skip."""
+
+    def __init__(self, names):
+        self.names = names
+        self.requests = 0
+        self.on_request = None
+
+    def get_collection(self, requests_params):
+        params = dict(param.split('=', 1)
+                      for param in requests_params['params'].split('&')
+                      if param)
+        self.requests += 1
+        if self.on_request:
+            self.on_request(self)
+        skip = int(params['$skip'])
+        page = []
+        for name in self.names[skip:skip + int(params['$top'])]:
+            resource = MagicMock(fullPath="/test/" + name)
+            resource.name = name
+            page.append(resource)
+        return page
+
+
+def test_bigip_paged_collection(bigip_proxy):
+    """Test retrieving a collection page by page."""
+    paged_proxy = bigip.BigIPProxy(bigip_proxy.mgmt_root(), 'test',
+                                   page_size=3)
+    names = ["pool{}".format(i) for i in range(7)]
+    collection = PagedCollection(names)
+    request = ('pools', "pools", collection, "$filter=partition+eq+test")
+
+    # Consecutive pages overlap by one pool.
+    resources = list(paged_proxy._iter_collection(*request))
+    assert [r.name for r in resources] == names
+    assert collection.requests == 4
+
+    collection = PagedCollection(names[:5])
+    resources = list(paged_proxy._iter_collection(
+        'pools', "pools", collection, ""))
+    assert [r.name for r in resources] == names[:5]
+    assert collection.requests == 3
+
+    # A pool deleted while the collection is retrieved restarts it.
+    def delete_pool(collection):
+        if collection.requests == 2:
+            collection.names = collection.names[1:]
+    collection = PagedCollection(list(names))
+    collection.on_request = delete_pool
+    request = ('pools', "pools", collection, "")
+    resources = paged_proxy._stream_collection(request, list)
+    assert [r.name for r in resources] == names[1:]
+    assert collection.requests == 5
+
+    # The collection keeps changing.
+    collection.on_request = lambda c: c.names.insert(0, "pool")
+    with pytest.raises(exceptions.F5CcclCacheRefreshError):
+        paged_proxy._stream_collection(request, list)
+
+
+def test_bigip_refresh_ltm_paged(bigip_proxy):
+    """Test refreshing the ltm cache page by page."""
+    big_ip = bigip_proxy.mgmt_root()
+    bigip_proxy.refresh_ltm()
+    pools = dict(bigip_proxy.get_pools())
+    nodes = dict(bigip_proxy.get_nodes())
+
+    paged_proxy = bigip.BigIPProxy(big_ip, 'test', page_size=100)
+    paged_proxy.refresh_ltm()
+    assert paged_proxy.get_pools() == pools
+    assert paged_proxy.get_nodes() == nodes
+    assert set(paged_proxy._all_pools) >= set(pools)
+    params = big_ip.tm.ltm.virtuals.get_collection.call_args[1][
+        'requests_params']['params']
+    assert params.startswith("$top=100&$skip=0&$filter=partition+eq+test")
+
+
+def test_bigip_refresh_ltm_reuses_unchanged(bigip_proxy):
+    """Test that refresh_ltm only reconstructs changed resources."""
+    big_ip = bigip_proxy.mgmt_root()
+
+    bigip_proxy.refresh_ltm()
+    pools = dict(bigip_proxy.get_pools())
+    nodes = dict(bigip_proxy.get_nodes())
+
+    # Nothing changed on the BIG-IP, the cached resources are reused.
+    bigip_proxy.refresh_ltm()
+    for name in pools:
+        assert bigip_proxy.get_pools()[name] is pools[name]
+    for name in nodes:
+        assert bigip_proxy.get_nodes()[name] is nodes[name]
+
+    # Change a pool on the BIG-IP, which updates its generation, only that
+    # pool is reconstructed.
+    for pool in big_ip.bigip_data['pools']:
+        if pool['name'] in pools:
+            pool['loadBalancingMode'] = 'least-connections-member'
+            pool['generation'] += 1
+    bigip_proxy.refresh_ltm()
+    for name in pools:
+        assert bigip_proxy.get_pools()[name] is not pools[name]
+        assert bigip_proxy.get_pools()[name] != pools[name]
+    for name in nodes:
+        assert bigip_proxy.get_nodes()[name] is nodes[name]
+
+    # Removing a pool member does not change the generation of the pool.
+    pools = dict(bigip_proxy.get_pools())
+    for pool in big_ip.bigip_data['pools']:
+        if pool['name'] in pools:
+            del pool['membersReference']['items'][0]
+    bigip_proxy.refresh_ltm()
+    for name in pools:
+        assert len(bigip_proxy.get_pools()[name]) == len(pools[name]) - 1
+
+
+def test_bigip_resource_token():
+    """Test the change tokens of the iControl REST resources."""
+    def token(raw):
+        return bigip.BigIPProxy._resource_token(MagicMock(raw=raw))
+
+    pool = {'name': 'pool1', 'generation': 2, 'lastUpdateMicros': 10,
+            'loadBalancingMode': 'round-robin',
+            'membersReference': {'items': [
+                {'name': '10.1.1.1:80', 'generation': 1},
+                {'name': '10.1.1.2:80', 'generation': 2}]}}
+    assert token(pool) == token(dict(pool))
+    assert token(pool) != token(dict(pool, generation=3))
+    assert token(pool) != token(dict(pool, membersReference={'items': [
+        {'name': '10.1.1.1:80', 'generation': 1}]}))
+
+    # Resources without a generation are compared by their content.
+    arp = {'name': 'arp1', 'macAddress': '12:ab:34:cd:56:ef'}
+    assert token(arp) == token(dict(arp))
+    assert token(arp) != token(dict(arp, macAddress='12:ab:34:cd:56:00'))
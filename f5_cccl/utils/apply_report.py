@@ -0,0 +1,106 @@
+# coding=utf-8
+#
+# Copyright 2017 F5 Networks Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Timings and counters of the application of a service configuration."""
+
+from collections import OrderedDict
+from contextlib import contextmanager
+from threading import Lock
+from time import time
+
+
+class ApplyReport(object):
+    """Report of the phases of an apply, e.g. of apply_ltm_config.
+
+    Timings are accumulated by phase name, in seconds.  The phases that
+    run concurrently, e.g. the refresh of the collections with several
+    workers, or the deployment tasks with several deploy workers, report
+    the sum of their durations.
+
+    Args:
+        config_type: The type of the configuration applied, e.g. 'ltm'.
+    """
+
+    def __init__(self, config_type):
+        """Initialize an empty report."""
+        self.config_type = config_type
+        self._lock = Lock()
+        self._timings = OrderedDict()
+        self._counters = OrderedDict()
+        self._rest_calls = dict()
+
+    @contextmanager
+    def timer(self, name):
+        """Time the phase 'name'."""
+        start_time = time()
+        try:
+            yield
+        finally:
+            self.add_time(name, time() - start_time)
+
+    def add_time(self, name, seconds):
+        """Add to the duration of a phase."""
+        with self._lock:
+            self._timings[name] = self._timings.get(name, 0.0) + seconds
+
+    def count(self, name, value=1):
+        """Add to a counter."""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def count_rest_call(self, method):
+        """Count an iControl REST request by HTTP method."""
+        with self._lock:
+            self._rest_calls[method] = self._rest_calls.get(method, 0) + 1
+
+    def as_dict(self):
+        """Get the report as a dictionary.
+
+        Returns:
+            A dictionary with the 'type' of configuration, the 'timings' of
+            the phases, the 'counters' and the 'rest_calls' by method.
+        """
+        with self._lock:
+            return {
+                'type': self.config_type,
+                'timings': OrderedDict(self._timings),
+                'counters': OrderedDict(self._counters),
+                'rest_calls': dict(self._rest_calls)
+            }
+
+
+class _NullReport(object):
+    """Report that ignores everything, used when reports are disabled."""
+
+    @contextmanager
+    def timer(self, name):  # pylint: disable=unused-argument
+        """Do not time anything."""
+        yield
+
+    def add_time(self, name, seconds):
+        """Ignore a duration."""
+        pass
+
+    def count(self, name, value=1):
+        """Ignore a counter."""
+        pass
+
+    def count_rest_call(self, method):
+        """Ignore a request."""
+        pass
+
+
+NULL_REPORT = _NullReport()
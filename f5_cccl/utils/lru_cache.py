@@ -0,0 +1,59 @@
+# coding=utf-8
+#
+# Copyright 2017 F5 Networks Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Least recently used cache bounded by its number of entries."""
+
+from collections import OrderedDict
+
+
+class LRUCache(object):
+    """Map of keys to values that evicts the least recently used entries.
+
+    Args:
+        max_size: Maximum number of entries in the cache.
+    """
+
+    def __init__(self, max_size):
+        """Initialize an empty cache."""
+        self._max_size = max_size
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key, default=None):
+        """Get the value of a key, and mark it as the most recently used."""
+        try:
+            value = self._entries.pop(key)
+        except KeyError:
+            return default
+        self._entries[key] = value
+        return value
+
+    def put(self, key, value):
+        """Set the value of a key, evicting the least recently used entries.
+        """
+        self._entries.pop(key, None)
+        self._entries[key] = value
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        """Remove all of the entries."""
+        self._entries.clear()
@@ -18,7 +18,14 @@
 
 from f5.bigip import ManagementRoot
 
+from f5_cccl.utils.rest_client import RestClient
+
 
 def mgmt_root(host, username, password, port, token):
     """Create a BIG-IP Management Root object"""
     return ManagementRoot(host, username, password, port=port, token=token)
+
+
+def rest_client(host, username, password, port, token):
+    """Create a lightweight iControl REST client for a BIG-IP"""
+    return RestClient(host, username, password, port=port, token=token)
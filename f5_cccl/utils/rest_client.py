@@ -0,0 +1,254 @@
+# coding=utf-8
+#
+# Copyright 2017 F5 Networks Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Lightweight iControl REST client.
+
+The client is a drop-in replacement for the f5-sdk ManagementRoot, for the
+subset of the SDK that is used by CCCL.  Rather than building an SDK object
+for every resource, it works with the plain dictionaries returned by the
+iControl REST endpoints, and all requests are sent on the pooled session of
+a single iControlRESTSession.
+
+Endpoints are addressed with the same attribute paths as the SDK, e.g.:
+
+    client.tm.ltm.pools.get_collection()
+    client.tm.ltm.pools.pool.load(name='pool1', partition='Common')
+    client.tm.ltm.monitor.https_s.https.create(name='mon', partition='Common')
+"""
+
+import logging
+
+from icontrol.session import iControlRESTSession
+from requests.utils import quote as urlquote
+
+
+LOGGER = logging.getLogger(__name__)
+
+# Pairs of mutually exclusive attributes: setting one on an update removes
+# the other from the payload.
+REDUCTION_FORCING_PAIRS = [
+    ('enabled', 'disabled'),
+    ('online', 'offline'),
+    ('vlansEnabled', 'vlansDisabled')
+]
+
+
+def _singular(name):
+    """Get the resource name of an SDK collection attribute name."""
+    if name.endswith('_s'):
+        return name[:-2]
+    elif name.endswith('s'):
+        return name[:-1]
+    return name
+
+
+class RestClient(object):
+    """Lightweight iControl REST client for a BIG-IP.
+
+    Args:
+        hostname: BIG-IP management address
+        username: BIG-IP user
+        password: BIG-IP user password
+        port: BIG-IP management port (default: 443)
+        token: Use token-based authentication, e.g. 'tmos' (default: None)
+        scheme: URI scheme of the management endpoint (default: 'https')
+        timeout: Request timeout in seconds (default: 30)
+        verify: Verify the BIG-IP certificate (default: False)
+    """
+
+    def __init__(self, hostname, username, password, port=443, token=None,
+                 scheme='https', timeout=30, verify=False):
+        """Initialize the client and its iControl REST session."""
+        icr_session = iControlRESTSession(username, password,
+                                          token=token,
+                                          timeout=timeout,
+                                          verify=verify)
+        self._meta_data = {
+            'hostname': hostname,
+            'port': port,
+            'uri': "{}://{}:{}/mgmt/tm/".format(scheme, hostname, port),
+            'icr_session': icr_session
+        }
+
+    @property
+    def tm(self):
+        """Get the root of the /mgmt/tm endpoints."""
+        return RestPath(self, list())
+
+    @property
+    def icr_session(self):
+        """Get the iControl REST session."""
+        return self._meta_data['icr_session']
+
+    def get(self, uri, **kwargs):
+        """Send a GET request and return the decoded response."""
+        return self.icr_session.get(uri, **kwargs).json()
+
+    def post(self, uri, payload, **kwargs):
+        """Send a POST request and return the decoded response."""
+        return self.icr_session.post(uri, json=payload, **kwargs).json()
+
+    def put(self, uri, payload, **kwargs):
+        """Send a PUT request and return the decoded response."""
+        return self.icr_session.put(uri, json=payload, **kwargs).json()
+
+    def patch(self, uri, payload, **kwargs):
+        """Send a PATCH request and return the decoded response."""
+        return self.icr_session.patch(uri, json=payload, **kwargs).json()
+
+    def delete(self, uri, **kwargs):
+        """Send a DELETE request."""
+        self.icr_session.delete(uri, **kwargs)
+
+
+class RestPath(object):
+    """An iControl REST endpoint, addressed by its SDK attribute path.
+
+    The URI of the endpoint is derived from the path: SDK collection
+    attributes (e.g. 'pools') are mapped to the name of their resource
+    (e.g. 'pool'), and underscores are replaced by hyphens.
+    """
+
+    def __init__(self, client, path, base_uri=None):
+        """Initialize the endpoint."""
+        self._client = client
+        self._path = path
+        self._base_uri = base_uri or client._meta_data['uri']
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return RestPath(self._client, self._path + [name], self._base_uri)
+
+    @property
+    def uri(self):
+        """Get the URI of the collection addressed by this path."""
+        segments = list()
+        resource = False
+        for index, segment in enumerate(self._path):
+            following = self._path[index + 1:index + 2]
+            if following and _singular(segment) == following[0]:
+                # The collection of the resource that follows.
+                resource = True
+                continue
+            if not following and not resource:
+                segment = _singular(segment)
+            resource = False
+            segments.append(segment.replace('_', '-'))
+
+        return self._base_uri + "/".join(segments) + "/"
+
+    @property
+    def _meta_data(self):
+        """Get the F5 SDK style metadata of the endpoint."""
+        return {'uri': self.uri, 'container': self}
+
+    def _item_uri(self, name, partition=None):
+        """Get the URI of a resource in the collection."""
+        if self._path[-3:] == ['application', 'services', 'service']:
+            # An iApp application service is in the folder of its iApp.
+            name = "{0}.app~{0}".format(name)
+        if partition:
+            return "{}~{}~{}".format(self.uri, partition, name)
+        return "{}{}".format(self.uri, name)
+
+    def get_collection(self, requests_params=None):
+        """Get the resources of the collection.
+
+        Returns:
+            A list of RestResource objects.
+        """
+        kwargs = dict()
+        if requests_params:
+            kwargs.update(requests_params)
+        collection = self._client.get(self.uri, **kwargs)
+
+        return [
+            RestResource(self._client, self, item)
+            for item in collection.get('items', list())
+        ]
+
+    def create(self, **kwargs):
+        """Create a resource in the collection."""
+        item = self._client.post(self.uri, kwargs)
+        return RestResource(self._client, self, item)
+
+    def load(self, name, partition=None, **kwargs):
+        """Load a resource of the collection."""
+        item = self._client.get(self._item_uri(name, partition), **kwargs)
+        return RestResource(self._client, self, item, name, partition)
+
+    def exists(self, name, partition=None):
+        """Determine whether a resource of the collection exists."""
+        response = self._client.icr_session.session.get(
+            self._item_uri(name, partition))
+        return response.status_code == 200
+
+
+class RestResource(object):
+    """An iControl REST resource backed by its plain dictionary.
+
+    The attributes of the resource can be read as object attributes, like
+    those of an SDK object.  Subcollections are addressed with their SDK
+    attribute names, e.g. pool.members_s.members.
+    """
+
+    def __init__(self, client, collection, raw, name=None, partition=None):
+        """Initialize the resource from its iControl REST representation."""
+        self.__dict__['_client'] = client
+        if name is None:
+            name = urlquote(raw.get('name', ''))
+        self.__dict__['_uri'] = collection._item_uri(
+            name, partition or raw.get('partition'))
+        self.__dict__['raw'] = raw
+
+    def __getattr__(self, name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        if name in self.raw:
+            return self.raw[name]
+        elif name.endswith('_s'):
+            return RestPath(self._client, [name], self._uri + "/")
+        raise AttributeError(name)
+
+    def __setattr__(self, name, value):
+        self.raw[name] = value
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_tb):
+        return False
+
+    def update(self, **kwargs):
+        """Replace the resource with its current state updated by kwargs."""
+        payload = dict(self.raw)
+        for attr, other in REDUCTION_FORCING_PAIRS:
+            if attr in kwargs:
+                payload.pop(other, None)
+            elif other in kwargs:
+                payload.pop(attr, None)
+        payload.update(kwargs)
+
+        self.__dict__['raw'] = self._client.put(self._uri, payload)
+
+    def modify(self, **kwargs):
+        """Modify the attributes of the resource given by kwargs."""
+        self.__dict__['raw'] = self._client.patch(self._uri, kwargs)
+
+    def delete(self):
+        """Delete the resource."""
+        self._client.delete(self._uri)
@@ -0,0 +1,234 @@
+# coding=utf-8
+#
+# Copyright 2017 F5 Networks Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Metrics of the iControl REST traffic, in the Prometheus text format.
+
+A RestMetrics collector is installed on the session of a management root,
+either a f5-sdk ManagementRoot or a f5_cccl.utils.rest_client.RestClient,
+and records every response received from the BIG-IP:
+
+    metrics = RestMetrics()
+    metrics.instrument(mgmt_root)
+    ...
+    text = metrics.export()
+
+The endpoints are recorded without the names of the resources, e.g.
+/mgmt/tm/ltm/pool/~Test~pool1/members is recorded as
+/mgmt/tm/ltm/pool/{name}/members, to keep the number of series bounded.
+"""
+
+from threading import Lock
+
+from requests.compat import urlparse
+
+
+# Upper bounds of the request latency buckets, in seconds.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+                   10.0, 30.0)
+
+# Upper bounds of the response size buckets, in bytes.
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304,
+                16777216, 67108864)
+
+# Subcollections whose items are addressed by name.
+SUBCOLLECTIONS = ('members', 'records')
+
+# Content type of the exported metrics.
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _endpoint(url):
+    """Get the endpoint of a request URL, without the resource names."""
+    segments = list()
+    for segment in urlparse(url).path.split('/'):
+        if segment.startswith('~'):
+            segment = '{name}'
+        elif segment.isdigit():
+            segment = '{id}'
+        elif segment and segments and segments[-1] in SUBCOLLECTIONS:
+            # Subcollection items are not always named by their path,
+            # e.g. fdb tunnel records are named by their MAC address.
+            segment = '{name}'
+        segments.append(segment)
+    return '/'.join(segments).rstrip('/') or '/'
+
+
+def _escape(value):
+    """Escape a label value."""
+    return (value.replace('\\', '\\\\').replace('"', '\\"')
+            .replace('\n', '\\n'))
+
+
+def _labels(**labels):
+    """Format the labels of a sample."""
+    return '{' + ','.join(
+        '{}="{}"'.format(name, _escape(str(labels[name])))
+        for name in sorted(labels)) + '}'
+
+
+def _number(value):
+    """Format the value of a sample."""
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Histogram(object):
+    """Cumulative histogram of observed values."""
+
+    def __init__(self, buckets):
+        """Initialize an empty histogram."""
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.total = 0
+
+    def observe(self, value):
+        """Add a value to the histogram."""
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+                break
+        self.count += 1
+        self.total += value
+
+    def samples(self, name, labels):
+        """Get the samples of the histogram in the text format."""
+        lines = list()
+        cumulative = 0
+        for (bound, count) in zip(self.buckets, self.counts):
+            cumulative += count
+            lines.append('{}_bucket{} {}'.format(
+                name, _labels(le=_number(bound), **labels), cumulative))
+        lines.append('{}_bucket{} {}'.format(
+            name, _labels(le='+Inf', **labels), self.count))
+        lines.append('{}_sum{} {}'.format(
+            name, _labels(**labels), _number(self.total)))
+        lines.append('{}_count{} {}'.format(
+            name, _labels(**labels), self.count))
+        return lines
+
+
+class RestMetrics(object):
+    """Collector of the iControl REST requests sent to a BIG-IP.
+
+    It records the number of requests by method, endpoint and HTTP status
+    code, and the histograms of the request latencies and the response
+    sizes by method and endpoint.
+
+    Args:
+        prefix: Prefix of the metric names (default: 'f5_cccl_rest')
+    """
+
+    def __init__(self, prefix='f5_cccl_rest'):
+        """Initialize an empty collector."""
+        self._prefix = prefix
+        self._lock = Lock()
+        self._requests = dict()
+        self._latencies = dict()
+        self._sizes = dict()
+
+    def instrument(self, mgmt_root):
+        """Record the responses to the requests sent by a management root.
+
+        Args:
+            mgmt_root: f5-sdk ManagementRoot or RestClient.
+        """
+        session = mgmt_root._meta_data['icr_session'].session
+        hooks = session.hooks['response']
+        if self.observe_response not in hooks:
+            hooks.append(self.observe_response)
+
+    def observe_response(self, response, *args, **kwargs):
+        """Record a response, as a requests response hook."""
+        # pylint: disable=unused-argument
+        size = response.headers.get('Content-Length')
+        if size is None:
+            size = len(response.content or b'')
+        self.observe(response.request.method,
+                     _endpoint(response.request.url),
+                     response.status_code,
+                     response.elapsed.total_seconds(),
+                     int(size))
+
+    def observe(self, method, endpoint, status_code, latency, size):
+        """Record a request.
+
+        Args:
+            method: HTTP method of the request.
+            endpoint: Endpoint of the request, without the resource names.
+            status_code: HTTP status code of the response.
+            latency: Duration of the request, in seconds.
+            size: Size of the response body, in bytes.
+        """
+        key = (method, endpoint)
+        with self._lock:
+            request_key = key + (status_code,)
+            self._requests[request_key] = (
+                self._requests.get(request_key, 0) + 1)
+            if key not in self._latencies:
+                self._latencies[key] = _Histogram(LATENCY_BUCKETS)
+                self._sizes[key] = _Histogram(SIZE_BUCKETS)
+            self._latencies[key].observe(latency)
+            self._sizes[key].observe(size)
+
+    def clear(self):
+        """Forget the recorded requests."""
+        with self._lock:
+            self._requests.clear()
+            self._latencies.clear()
+            self._sizes.clear()
+
+    def get_request_counts(self):
+        """Get the number of requests.
+
+        Returns:
+            A dictionary of the number of requests, indexed by
+            (method, endpoint, status_code).
+        """
+        with self._lock:
+            return dict(self._requests)
+
+    def export(self):
+        """Export the metrics in the Prometheus text format."""
+        requests_name = self._prefix + '_requests_total'
+        latency_name = self._prefix + '_request_duration_seconds'
+        size_name = self._prefix + '_response_size_bytes'
+
+        with self._lock:
+            lines = [
+                '# HELP {} iControl REST requests by method, endpoint and '
+                'status code.'.format(requests_name),
+                '# TYPE {} counter'.format(requests_name)
+            ]
+            for (method, endpoint, code) in sorted(self._requests):
+                lines.append('{}{} {}'.format(
+                    requests_name,
+                    _labels(method=method, endpoint=endpoint, code=code),
+                    self._requests[(method, endpoint, code)]))
+
+            for (name, histograms, text) in [
+                    (latency_name, self._latencies,
+                     'Latency of the iControl REST requests.'),
+                    (size_name, self._sizes,
+                     'Size of the iControl REST responses.')]:
+                lines.append('# HELP {} {}'.format(name, text))
+                lines.append('# TYPE {} histogram'.format(name))
+                for (method, endpoint) in sorted(histograms):
+                    lines.extend(histograms[(method, endpoint)].samples(
+                        name, dict(method=method, endpoint=endpoint)))
+
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,51 @@
+#!/usr/bin/env python
+# Copyright 2017 F5 Networks Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import pytest
+
+from f5_cccl.utils.apply_report import ApplyReport
+from f5_cccl.utils.apply_report import NULL_REPORT
+
+
+def test_apply_report():
+    """Test that the timings and the counters are accumulated."""
+    report = ApplyReport('ltm')
+    with report.timer('refresh'):
+        pass
+    report.add_time('refresh', 1.0)
+    with pytest.raises(ValueError):
+        with report.timer('validate'):
+            raise ValueError()
+    report.count('create_tasks', 3)
+    report.count('retry_passes')
+    report.count_rest_call('GET')
+    report.count_rest_call('GET')
+    report.count_rest_call('POST')
+
+    result = report.as_dict()
+    assert result['type'] == 'ltm'
+    assert list(result['timings']) == ['refresh', 'validate']
+    assert result['timings']['refresh'] >= 1.0
+    assert result['counters'] == {'create_tasks': 3, 'retry_passes': 1}
+    assert result['rest_calls'] == {'GET': 2, 'POST': 1}
+
+
+def test_null_report():
+    """Test that the null report ignores everything."""
+    with NULL_REPORT.timer('refresh'):
+        NULL_REPORT.add_time('refresh', 1.0)
+        NULL_REPORT.count('create_tasks')
+        NULL_REPORT.count_rest_call('GET')
@@ -0,0 +1,36 @@
+#!/usr/bin/env python
+# Copyright 2017 F5 Networks Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+from f5_cccl.utils.lru_cache import LRUCache
+
+
+def test_lru_cache():
+    """Test that the least recently used entries are evicted."""
+    cache = LRUCache(2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+
+    assert cache.get('a') == 1
+    cache.put('c', 3)
+
+    assert len(cache) == 2
+    assert 'b' not in cache
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    assert cache.get('c') == 3
+
+    cache.clear()
+    assert len(cache) == 0
@@ -0,0 +1,183 @@
+#!/usr/bin/env python
+# Copyright 2017 F5 Networks Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+from mock import MagicMock
+import pytest
+
+from f5_cccl.resource.ltm.app_service import ApiApplicationService
+from f5_cccl.resource.ltm.pool import ApiPool
+from f5_cccl.utils.rest_client import RestClient
+
+BASE_URI = "https://10.190.1.1:443/mgmt/tm/"
+
+
+@pytest.fixture
+def client():
+    rest_client = RestClient('10.190.1.1', 'admin', 'admin')
+    rest_client._meta_data['icr_session'] = MagicMock()
+    return rest_client
+
+
+@pytest.mark.parametrize("path, uri", [
+    (['ltm', 'pools'], "ltm/pool/"),
+    (['ltm', 'pools', 'pool'], "ltm/pool/"),
+    (['ltm', 'virtual_address_s'], "ltm/virtual-address/"),
+    (['ltm', 'virtual_address_s', 'virtual_address'], "ltm/virtual-address/"),
+    (['ltm', 'data_group', 'internals', 'internal'],
+     "ltm/data-group/internal/"),
+    (['ltm', 'monitor', 'https_s', 'https'], "ltm/monitor/https/"),
+    (['ltm', 'monitor', 'https', 'http'], "ltm/monitor/http/"),
+    (['ltm', 'monitor', 'gateway_icmps', 'gateway_icmp'],
+     "ltm/monitor/gateway-icmp/"),
+    (['ltm', 'policys'], "ltm/policy/"),
+    (['sys', 'application', 'services', 'service'],
+     "sys/application/service/"),
+    (['net', 'tunnels', 'tunnels'], "net/tunnels/tunnel/"),
+    (['net', 'fdb', 'tunnels', 'tunnel'], "net/fdb/tunnel/"),
+])
+def test_path_uri(client, path, uri):
+    """Test the URIs derived from the SDK attribute paths."""
+    rest_path = client.tm
+    for attr in path:
+        rest_path = getattr(rest_path, attr)
+
+    assert rest_path.uri == BASE_URI + uri
+
+
+def test_get_collection(client):
+    """Test retrieving a collection as plain dictionaries."""
+    icr_session = client.icr_session
+    icr_session.get.return_value.json.return_value = {
+        'items': [{'name': 'pool1', 'partition': 'test',
+                   'loadBalancingMode': 'round-robin'}]
+    }
+
+    pools = client.tm.ltm.pools.get_collection(
+        requests_params={'params': '$filter=partition+eq+test'})
+
+    icr_session.get.assert_called_once_with(
+        BASE_URI + "ltm/pool/", params='$filter=partition+eq+test')
+    assert len(pools) == 1
+    assert pools[0].name == 'pool1'
+    assert pools[0].raw['loadBalancingMode'] == 'round-robin'
+    with pytest.raises(AttributeError):
+        pools[0].monitor
+
+
+def test_resource_operations(client):
+    """Test creating, updating and deleting a resource."""
+    icr_session = client.icr_session
+    pool_uri = BASE_URI + "ltm/pool/~test~pool1"
+    data = {'name': 'pool1', 'partition': 'test', 'monitor': '/Common/http'}
+
+    icr_session.post.return_value.json.return_value = dict(data)
+    client.tm.ltm.pools.pool.create(**data)
+    icr_session.post.assert_called_once_with(
+        BASE_URI + "ltm/pool/", json=data)
+
+    icr_session.get.return_value.json.return_value = dict(data)
+    pool = client.tm.ltm.pools.pool.load(name='pool1', partition='test')
+    icr_session.get.assert_called_once_with(pool_uri)
+
+    pool.update(monitor='/Common/https')
+    icr_session.put.assert_called_once_with(
+        pool_uri, json={'name': 'pool1', 'partition': 'test',
+                        'monitor': '/Common/https'})
+
+    pool.modify(description='test')
+    icr_session.patch.assert_called_once_with(
+        pool_uri, json={'description': 'test'})
+
+    members = pool.members_s.members
+    assert members.uri == pool_uri + "/members/"
+
+    pool.delete()
+    icr_session.delete.assert_called_once_with(pool_uri)
+
+
+def test_update_reduction_pairs(client):
+    """Test that an update replaces mutually exclusive attributes."""
+    icr_session = client.icr_session
+    icr_session.get.return_value.json.return_value = {
+        'name': 'virtual1', 'partition': 'test', 'enabled': True
+    }
+
+    virtual = client.tm.ltm.virtuals.virtual.load(
+        name='virtual1', partition='test')
+    virtual.update(disabled=True)
+
+    icr_session.put.assert_called_once_with(
+        BASE_URI + "ltm/virtual/~test~virtual1",
+        json={'name': 'virtual1', 'partition': 'test', 'disabled': True})
+
+
+def test_resource_create(client):
+    """Test creating a CCCL resource with the REST client."""
+    icr_session = client.icr_session
+    pool = ApiPool(name='pool1', partition='test', monitor='/Common/http',
+                   loadBalancingMode='round-robin', members=[])
+    icr_session.post.return_value.json.return_value = pool.data
+
+    pool.create(client)
+
+    assert icr_session.post.called
+    assert icr_session.post.call_args[0][0] == BASE_URI + "ltm/pool/"
+    assert icr_session.post.call_args[1]['json']['name'] == 'pool1'
+
+
+def test_resource_update_direct(client):
+    """Test a direct update of a CCCL resource with the REST client."""
+    icr_session = client.icr_session
+    pool = ApiPool(name='pool1', partition='test', monitor='/Common/http',
+                   loadBalancingMode='round-robin', members=[])
+
+    pool.update(client, direct=True)
+
+    assert not icr_session.get.called
+    assert icr_session.put.call_args[0][0] == (
+        BASE_URI + "ltm/pool/~test~pool1")
+
+
+def test_app_service_direct(client):
+    """Test direct writes of an iApp, in the folder of its iApp."""
+    icr_session = client.icr_session
+    app_uri = BASE_URI + "sys/application/service/~test~app1.app~app1"
+    appsvc = ApiApplicationService(name='app1', partition='test',
+                                   template='/Common/f5.http',
+                                   variables={}, tables=[])
+
+    appsvc.update(client, direct=True)
+    assert icr_session.put.call_args[0][0] == app_uri
+    assert icr_session.put.call_args[1]['json']['executeAction'] == (
+        'definition')
+
+    appsvc.delete(client, direct=True)
+    icr_session.delete.assert_called_once_with(app_uri)
+
+
+def test_app_service_operations(client):
+    """Test loading and deleting an iApp with the REST client."""
+    icr_session = client.icr_session
+    app_uri = BASE_URI + "sys/application/service/~test~app1.app~app1"
+    icr_session.get.return_value.json.return_value = {
+        'name': 'app1', 'partition': 'test', 'subPath': 'app1.app'}
+
+    services = client.tm.sys.application.services
+    appsvc = services.service.load(name='app1', partition='test')
+    icr_session.get.assert_called_once_with(app_uri)
+
+    appsvc.delete()
+    icr_session.delete.assert_called_once_with(app_uri)
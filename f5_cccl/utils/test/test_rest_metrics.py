@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+# Copyright 2017 F5 Networks Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+from datetime import timedelta
+
+from mock import MagicMock
+
+from f5_cccl.utils.rest_client import RestClient
+from f5_cccl.utils.rest_metrics import _endpoint
+from f5_cccl.utils.rest_metrics import RestMetrics
+
+
+def _response(method, url, status_code, seconds, content):
+    response = MagicMock()
+    response.request.method = method
+    response.request.url = url
+    response.status_code = status_code
+    response.elapsed = timedelta(seconds=seconds)
+    response.headers = {}
+    response.content = content
+    return response
+
+
+def test_endpoint():
+    """Test that the resource names are removed from the endpoints."""
+    assert _endpoint(
+        "https://localhost/mgmt/tm/ltm/pool/~Test~pool1/members/"
+        "~Test~10.1.1.1:80?expandSubcollections=true") == \
+        "/mgmt/tm/ltm/pool/{name}/members/{name}"
+    assert _endpoint("https://localhost/mgmt/tm/ltm/pool/") == \
+        "/mgmt/tm/ltm/pool"
+    assert _endpoint("https://localhost/mgmt/tm/transaction/1500000/") == \
+        "/mgmt/tm/transaction/{id}"
+    assert _endpoint(
+        "https://localhost/mgmt/tm/net/fdb/tunnel/~Common~vxlan0/records/"
+        "12%3Aab%3A34%3Acd%3A56%3Aef") == \
+        "/mgmt/tm/net/fdb/tunnel/{name}/records/{name}"
+    assert _endpoint(
+        "https://localhost/mgmt/tm/net/fdb/tunnel/~Common~vxlan0/records") == \
+        "/mgmt/tm/net/fdb/tunnel/{name}/records"
+
+
+def test_rest_metrics():
+    """Test the metrics of the recorded responses."""
+    client = RestClient('127.0.0.1', 'admin', 'admin')
+    metrics = RestMetrics()
+    metrics.instrument(client)
+    metrics.instrument(client)
+    hooks = client.icr_session.session.hooks['response']
+    assert hooks == [metrics.observe_response]
+
+    uri = client.tm.ltm.pools.uri
+    metrics.observe_response(_response('GET', uri, 200, 0.02, b'x' * 2000))
+    metrics.observe_response(_response('GET', uri, 200, 0.2, b'x' * 100))
+    metrics.observe_response(
+        _response('POST', uri, 409, 0.003, b'{"code":409}'))
+
+    assert metrics.get_request_counts() == {
+        ('GET', '/mgmt/tm/ltm/pool', 200): 2,
+        ('POST', '/mgmt/tm/ltm/pool', 409): 1}
+
+    lines = metrics.export().splitlines()
+    assert '# TYPE f5_cccl_rest_requests_total counter' in lines
+    assert ('f5_cccl_rest_requests_total{code="409",'
+            'endpoint="/mgmt/tm/ltm/pool",method="POST"} 1') in lines
+    assert ('f5_cccl_rest_request_duration_seconds_bucket{'
+            'endpoint="/mgmt/tm/ltm/pool",le="0.025",method="GET"} 1') in lines
+    assert ('f5_cccl_rest_request_duration_seconds_bucket{'
+            'endpoint="/mgmt/tm/ltm/pool",le="+Inf",method="GET"} 2') in lines
+    assert ('f5_cccl_rest_response_size_bytes_sum{'
+            'endpoint="/mgmt/tm/ltm/pool",method="GET"} 2100') in lines
+    assert ('f5_cccl_rest_response_size_bytes_count{'
+            'endpoint="/mgmt/tm/ltm/pool",method="POST"} 1') in lines
+
+    metrics.clear()
+    assert metrics.get_request_counts() == {}
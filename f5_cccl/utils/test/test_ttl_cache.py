@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+# Copyright 2017 F5 Networks Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+from multiprocessing.pool import ThreadPool
+from time import sleep
+from time import time
+
+from mock import MagicMock
+from mock import patch
+import pytest
+
+from f5_cccl.utils.ttl_cache import TTLCache
+
+
+def test_ttl_cache():
+    """Test that the value is fetched once per time to live."""
+    fetch = MagicMock(side_effect=[1, 2, ValueError(), 3])
+    cache = TTLCache(fetch, 10)
+
+    assert cache.get() == 1
+    assert cache.get() == 1
+    with patch('f5_cccl.utils.ttl_cache.time', return_value=time() + 11):
+        assert cache.get() == 2
+    assert fetch.call_count == 2
+
+    # Errors are not cached.
+    cache.clear()
+    with pytest.raises(ValueError):
+        cache.get()
+    assert cache.get() == 3
+
+    # The value is always fetched without a time to live.
+    fetch = MagicMock(side_effect=[1, 2])
+    cache = TTLCache(fetch, 0)
+    assert cache.get() == 1
+    assert cache.get() == 2
+
+
+def test_ttl_cache_concurrent():
+    """Test that concurrent callers share a single fetch."""
+    def fetch():
+        sleep(0.05)
+        return object()
+    fetch = MagicMock(side_effect=fetch)
+    cache = TTLCache(fetch, 10)
+
+    thread_pool = ThreadPool(4)
+    values = thread_pool.map(lambda _: cache.get(), range(8))
+    thread_pool.close()
+
+    assert fetch.call_count == 1
+    assert all(value is values[0] for value in values)
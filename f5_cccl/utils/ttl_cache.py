@@ -0,0 +1,55 @@
+# coding=utf-8
+#
+# Copyright 2017 F5 Networks Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Value fetched at most once per time to live."""
+
+from threading import Lock
+from time import time
+
+
+class TTLCache(object):
+    """Cache of the value returned by a function, for a time to live.
+
+    Concurrent callers share a single call of the function: the callers
+    that arrive while the value is fetched wait for it, and get it unless
+    the time to live is 0.  Errors raised by the function are not cached.
+
+    Args:
+        fetch: Function that returns the value.
+        ttl: Number of seconds to reuse the value, 0 to always fetch it.
+    """
+
+    def __init__(self, fetch, ttl):
+        """Initialize an empty cache."""
+        self._fetch = fetch
+        self._ttl = ttl
+        self._lock = Lock()
+        self._value = None
+        self._expiry = 0
+
+    def get(self):
+        """Get the value, fetching it if it is expired."""
+        with self._lock:
+            if time() >= self._expiry:
+                self._value = self._fetch()
+                self._expiry = time() + self._ttl
+            return self._value
+
+    def clear(self):
+        """Expire the value."""
+        with self._lock:
+            self._value = None
+            self._expiry = 0
@@ -50,7 +50,7 @@ def instrument_bigip(mgmt_root):
 
 @pytest.fixture(scope="module")
 def bigip():
-    if pytest.symbols:
+    if getattr(pytest, 'symbols', None):
         hostname = pytest.symbols.bigip_mgmt_ip
         username = pytest.symbols.bigip_username
         password = pytest.symbols.bigip_password
@@ -119,7 +119,7 @@ def partition(bigip):
 def cccl(bigip, partition):
     cccl = F5CloudServiceManager(bigip, partition)
     yield cccl
-    cccl.apply_config({})
+    cccl.apply_ltm_config({})
 
 
 @pytest.fixture()
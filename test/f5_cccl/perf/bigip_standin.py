@@ -0,0 +1,533 @@
+#!/usr/bin/env python
+
+# Copyright 2017 F5 Networks Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Local iControl REST stand-in, for benchmarks without a BIG-IP.
+
+The stand-in is an in-memory HTTP server that emulates the collection and
+item endpoints of /mgmt/tm/ltm/*, /mgmt/tm/net/*, the application services
+and the folders:
+
+    GET     <collection>[?$filter=partition+eq+X&expandSubcollections=true
+                         &$select=field1,field2&$top=N&$skip=M]
+    POST    <collection>
+    GET     <collection>/~Partition~name[?expandSubcollections=true]
+    PUT     <collection>/~Partition~name
+    PATCH   <collection>/~Partition~name
+    DELETE  <collection>/~Partition~name
+
+Subcollections, e.g. the members of a pool, are created from the lists
+sent in the POST, PUT or PATCH of their resource, and are addressed at
+<item>/<subcollection>.  Pool members implicitly create their node, and
+virtual servers their virtual address, like on a BIG-IP.  The stats of the
+virtual servers and pools are returned by GET <collection>/stats, and are
+set with set_stats.
+
+Every request waits for the configured latency before it is handled, and
+is counted by HTTP method.
+"""
+
+import copy
+import json
+import threading
+import time
+from collections import OrderedDict
+
+try:
+    from http.server import BaseHTTPRequestHandler
+    from http.server import HTTPServer
+    from socketserver import ThreadingMixIn
+    from urllib.parse import parse_qs
+    from urllib.parse import unquote
+    from urllib.parse import urlparse
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler
+    from BaseHTTPServer import HTTPServer
+    from SocketServer import ThreadingMixIn
+    from urllib import unquote
+    from urlparse import parse_qs
+    from urlparse import urlparse
+
+
+API_PREFIX = "/mgmt/tm/"
+
+COLLECTIONS = [
+    'ltm/data-group/internal',
+    'ltm/monitor/gateway-icmp',
+    'ltm/monitor/http',
+    'ltm/monitor/https',
+    'ltm/monitor/tcp',
+    'ltm/monitor/udp',
+    'ltm/node',
+    'ltm/policy',
+    'ltm/pool',
+    'ltm/rule',
+    'ltm/virtual',
+    'ltm/virtual-address',
+    'net/arp',
+    'net/fdb/tunnel',
+    'net/tunnels/tunnel',
+    'sys/application/service',
+    'sys/folder',
+]
+
+# Lists of a resource that are stored as subcollections.
+SUBCOLLECTIONS = {
+    'ltm/pool': ['members'],
+    'ltm/policy': ['rules'],
+    'ltm/virtual': ['profiles', 'policies'],
+    'net/fdb/tunnel': ['records'],
+}
+
+# Subcollections that are returned as lists rather than references.
+INLINE_SUBCOLLECTIONS = ['records']
+
+CHANGE_TOKEN_PATH = 'sys/db/configsync.localconfigtime'
+
+# Collections with a stats endpoint.
+STATS_COLLECTIONS = ['ltm/pool', 'ltm/virtual']
+
+# Stats of a resource that were not set, by collection.
+DEFAULT_STATS = {
+    'ltm/pool': {
+        'status.availabilityState': 'unknown',
+        'status.enabledState': 'enabled',
+        'status.statusReason': 'Monitor results are not available',
+        'activeMemberCnt': 0,
+        'serverside.bitsIn': 0,
+        'serverside.bitsOut': 0,
+        'serverside.curConns': 0,
+        'serverside.totConns': 0,
+        'totRequests': 0,
+    },
+    'ltm/virtual': {
+        'status.availabilityState': 'unknown',
+        'status.enabledState': 'enabled',
+        'status.statusReason': 'Monitor results are not available',
+        'clientside.bitsIn': 0,
+        'clientside.bitsOut': 0,
+        'clientside.curConns': 0,
+        'clientside.totConns': 0,
+        'totRequests': 0,
+    },
+}
+
+
+class StandInError(Exception):
+    """An error returned as the HTTP response of a request."""
+
+    def __init__(self, code, message):
+        super(StandInError, self).__init__(message)
+        self.code = code
+        self.message = message
+
+
+def _item_key(data, parent_partition=None):
+    """Get the URI key of a resource, e.g. ~Common~pool1."""
+    partition = data.get('partition', parent_partition)
+    if not partition:
+        return data['name']
+    if data.get('subPath'):
+        return "~{}~{}~{}".format(partition, data['subPath'], data['name'])
+    return "~{}~{}".format(partition, data['name'])
+
+
+def _destination_address(destination):
+    """Get the address of a virtual server destination."""
+    address = destination.split('/')[-1]
+    if address.count(':') == 1:
+        return address.rsplit(':', 1)[0]
+    # IPv6 addresses are separated from the port by a dot.
+    return address.rsplit('.', 1)[0]
+
+
+class BigIPStandIn(object):
+    """In-memory emulation of the iControl REST endpoints used by CCCL.
+
+    Args:
+        latency: Number of seconds each request waits before it is handled.
+    """
+
+    def __init__(self, latency=0.0):
+        """Initialize an empty BIG-IP configuration."""
+        self.latency = latency
+        self.counters = dict(
+            (method, 0)
+            for method in ['get', 'post', 'put', 'patch', 'delete'])
+        self._lock = threading.Lock()
+        self._collections = dict(
+            (path, OrderedDict()) for path in COLLECTIONS)
+        self._collections['sys/folder']['Common'] = {
+            'data': {'name': 'Common', 'subPath': '/'}, 'subcollections': {}
+        }
+        self._stats = dict()
+        self._changes = 0
+        self._server = None
+        self._thread = None
+
+    @property
+    def port(self):
+        """Get the port of the HTTP server."""
+        return self._server.server_address[1]
+
+    def start(self):
+        """Start serving requests on a local port."""
+        standin = self
+
+        class Handler(_RequestHandler):
+            """Request handler bound to this stand-in."""
+            bigip = standin
+
+        self._server = _ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._thread = threading.Thread(target=self._server.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """Stop the HTTP server."""
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    def reset_counters(self):
+        """Reset the request counters."""
+        with self._lock:
+            for method in self.counters:
+                self.counters[method] = 0
+
+    def count(self, path):
+        """Get the number of resources in a collection."""
+        with self._lock:
+            return len(self._collections[path])
+
+    def set_stats(self, path, partition, name, **stats):
+        """Set stats of a resource, e.g. of a pool in 'ltm/pool'."""
+        with self._lock:
+            key = "~{}~{}".format(partition, name)
+            self._stats.setdefault((path, key), dict()).update(stats)
+
+    def handle(self, method, path, query, body):
+        """Handle a request.
+
+        Returns:
+            The decoded response body.
+
+        Raises:
+            StandInError: The request failed.
+        """
+        if self.latency:
+            time.sleep(self.latency)
+        params = parse_qs(query)
+        with self._lock:
+            self.counters[method] += 1
+            if path == CHANGE_TOKEN_PATH and method == 'get':
+                return {'name': 'configsync.localconfigtime',
+                        'value': str(self._changes)}
+
+            if (method == 'get' and path.endswith('/stats') and
+                    path[:-len('/stats')] in STATS_COLLECTIONS):
+                return self._handle_stats(path[:-len('/stats')], params)
+
+            (collection_path, segments) = self._split_path(path)
+            (collection, parent) = self._find_collection(
+                collection_path, segments)
+            if len(segments) % 2 == 0:
+                return self._handle_collection(
+                    method, path, collection_path, collection, parent,
+                    params, body)
+            return self._handle_item(
+                method, path, collection_path, collection, segments[-1],
+                len(segments) > 1, params, body)
+
+    @staticmethod
+    def _split_path(path):
+        """Split a path into its top collection and the other segments."""
+        for collection_path in COLLECTIONS:
+            if path == collection_path:
+                return (collection_path, [])
+            if path.startswith(collection_path + '/'):
+                segments = path[len(collection_path) + 1:].split('/')
+                return (collection_path, [unquote(s) for s in segments])
+        raise StandInError(404, "Unknown endpoint: {}".format(path))
+
+    def _find_collection(self, collection_path, segments):
+        """Find the (sub)collection addressed by the path segments.
+
+        Returns:
+            The collection, and the item that it is a subcollection of.
+        """
+        collection = self._collections[collection_path]
+        parent = None
+        for index in range(0, len(segments) - 1, 2):
+            key, name = segments[index], segments[index + 1]
+            parent = collection.get(key)
+            if parent is None or name not in parent['subcollections']:
+                raise StandInError(404, "Not found: {}".format(key))
+            collection = parent['subcollections'][name]
+        return (collection, parent)
+
+    @staticmethod
+    def _partition_filter(params):
+        """Get the partition of the $filter query parameter."""
+        partition = None
+        for query_filter in params.get('$filter', []):
+            field, _, value = query_filter.split(' ', 2)
+            if field != 'partition':
+                raise StandInError(
+                    400, "Unsupported filter: {}".format(query_filter))
+            partition = value
+        return partition
+
+    def _handle_stats(self, collection_path, params):
+        """Handle a request on the stats of a collection."""
+        partition = self._partition_filter(params)
+        entries = dict()
+        for (key, item) in self._collections[collection_path].items():
+            if partition is not None and \
+                    item['data'].get('partition') != partition:
+                continue
+            stats = dict(DEFAULT_STATS[collection_path])
+            stats.update(self._stats.get((collection_path, key), dict()))
+            nested = {'tmName': {'description': "/{}/{}".format(
+                item['data'].get('partition'), item['data']['name'])}}
+            for (name, value) in stats.items():
+                if isinstance(value, str):
+                    nested[name] = {'description': value}
+                else:
+                    nested[name] = {'value': value}
+            link = "https://localhost{}{}/{}/stats".format(
+                API_PREFIX, collection_path, key)
+            entries[link] = {'nestedStats': {'entries': nested}}
+        return {
+            'kind': 'tm:{}:collectionstats'.format(
+                collection_path.replace('/', ':')),
+            'selfLink': "https://localhost{}{}/stats".format(
+                API_PREFIX, collection_path),
+            'entries': entries
+        }
+
+    def _handle_collection(self, method, path, collection_path, collection,
+                           parent, params, body):
+        """Handle a request on a collection."""
+        if method == 'get':
+            partition = self._partition_filter(params)
+            expand = params.get('expandSubcollections') == ['true']
+            select = None
+            if '$select' in params:
+                select = set(params['$select'][0].split(','))
+            items = [
+                (key, item) for (key, item) in collection.items()
+                if partition is None or
+                item['data'].get('partition') == partition
+            ]
+            skip = int(params.get('$skip', ['0'])[0])
+            if '$top' in params:
+                items = items[skip:skip + int(params['$top'][0])]
+            return {
+                'kind': 'tm:{}:collectionstate'.format(
+                    path.replace('/', ':')),
+                'selfLink': "https://localhost{}{}".format(API_PREFIX, path),
+                'items': [
+                    self._render(path, key, item, expand, select)
+                    for (key, item) in items
+                ]
+            }
+        elif method == 'post':
+            if parent is not None and path.split('/')[-1] not in \
+                    INLINE_SUBCOLLECTIONS:
+                partition = parent['data'].get('partition')
+                if partition:
+                    body.setdefault('partition', partition)
+            key = _item_key(body)
+            if key in collection:
+                raise StandInError(409, "Already exists: {}".format(key))
+            item = {'data': dict(), 'subcollections': dict()}
+            if parent is None:
+                for name in SUBCOLLECTIONS.get(collection_path, []):
+                    item['subcollections'][name] = OrderedDict()
+            collection[key] = item
+            self._write(collection_path, item, body, parent is not None)
+            return self._render(path, key, item, True)
+        raise StandInError(405, "Method not allowed: {}".format(method))
+
+    def _handle_item(self, method, path, collection_path, collection, key,
+                     nested, params, body):
+        """Handle a request on a resource."""
+        # pylint: disable=too-many-arguments
+        # Resources without a partition, e.g. folders, can be addressed
+        # as ~name.
+        if key not in collection:
+            key = key.lstrip('~')
+        item = collection.get(key)
+        if item is None:
+            raise StandInError(404, "Not found: {}".format(key))
+        collection_uri = path.rsplit('/', 1)[0]
+
+        if method == 'get':
+            expand = params.get('expandSubcollections') == ['true']
+            return self._render(collection_uri, key, item, expand)
+        elif method == 'delete':
+            del collection[key]
+            self._changes += 1
+            return None
+        elif method in ('put', 'patch'):
+            if 'options' in params:
+                raise StandInError(
+                    400, "Unsupported options: {}".format(params['options']))
+            if method == 'put':
+                identity = dict(
+                    (field, item['data'][field])
+                    for field in ('name', 'partition', 'subPath')
+                    if field in item['data'])
+                item['data'] = identity
+            self._write(collection_path, item, body, nested)
+            return self._render(collection_uri, key, item, True)
+        raise StandInError(405, "Method not allowed: {}".format(method))
+
+    def _write(self, collection_path, item, body, nested):
+        """Write the fields of a request body to a resource."""
+        self._changes += 1
+        partition = body.get('partition', item['data'].get('partition'))
+        for field, value in body.items():
+            if field.endswith('Reference'):
+                # A reference to a subcollection, with its items.
+                field = field[:-len('Reference')]
+                value = value.get('items', list())
+            subcollection = item['subcollections'].get(field)
+            if subcollection is None or nested:
+                item['data'][field] = copy.deepcopy(value)
+                continue
+            subcollection.clear()
+            for subitem in value:
+                subitem = copy.deepcopy(subitem)
+                if partition and field not in INLINE_SUBCOLLECTIONS:
+                    subitem.setdefault('partition', partition)
+                subcollection[_item_key(subitem, partition)] = {
+                    'data': subitem, 'subcollections': dict()
+                }
+                self._create_implicit(field, subitem, partition)
+
+        if not nested and collection_path == 'ltm/virtual':
+            if 'destination' in item['data']:
+                self._create_implicit(
+                    'virtual', item['data'], item['data'].get('partition'))
+        elif nested and collection_path == 'ltm/pool':
+            self._create_implicit('members', item['data'], partition)
+
+    def _create_implicit(self, field, data, partition):
+        """Create the node of a pool member, or the address of a virtual."""
+        if field == 'members':
+            address = data.get('address', data['name'].rsplit(':', 1)[0])
+            implicit = {'name': address, 'partition': partition,
+                        'address': address, 'state': 'unchecked',
+                        'session': 'user-enabled'}
+            collection = self._collections['ltm/node']
+        elif field == 'virtual':
+            address = _destination_address(data['destination'])
+            implicit = {'name': address, 'partition': partition,
+                        'address': address}
+            collection = self._collections['ltm/virtual-address']
+        else:
+            return
+        key = _item_key(implicit)
+        if key not in collection:
+            collection[key] = {'data': implicit, 'subcollections': dict()}
+
+    def _render(self, collection_uri, key, item, expand, select=None):
+        """Get the iControl REST representation of a resource."""
+        data = copy.deepcopy(item['data'])
+        self_link = "https://localhost{}{}/{}".format(
+            API_PREFIX, collection_uri, key)
+        data['selfLink'] = self_link
+        if 'partition' in data:
+            data['fullPath'] = "/{}/{}".format(data['partition'], data['name'])
+        for name, subcollection in item['subcollections'].items():
+            items = [copy.deepcopy(subitem['data'])
+                     for subitem in subcollection.values()]
+            if name in INLINE_SUBCOLLECTIONS:
+                if items:
+                    data[name] = items
+                continue
+            reference = {'link': "{}/{}".format(self_link, name),
+                         'isSubcollection': True}
+            if expand and items:
+                reference['items'] = items
+            data['{}Reference'.format(name)] = reference
+        if select is not None:
+            data = dict(
+                (field, value) for (field, value) in data.items()
+                if field in select)
+        return data
+
+
+class _ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    """HTTP server that handles each connection in a thread."""
+    daemon_threads = True
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    """Translate HTTP requests to calls of the stand-in."""
+
+    protocol_version = "HTTP/1.1"
+    # Send the headers and body of a response without waiting for an ACK.
+    disable_nagle_algorithm = True
+    bigip = None
+
+    def _handle(self, method):
+        """Handle a request and send its response."""
+        url = urlparse(self.path)
+        body = None
+        length = int(self.headers.get('Content-Length') or 0)
+        if length:
+            body = json.loads(self.rfile.read(length).decode('utf-8'))
+
+        status = 200
+        try:
+            if not url.path.startswith(API_PREFIX):
+                raise StandInError(404, "Unknown endpoint: {}".format(
+                    url.path))
+            response = self.bigip.handle(
+                method, url.path[len(API_PREFIX):].rstrip('/'),
+                url.query, body or dict())
+        except StandInError as error:
+            status = error.code
+            response = {'code': error.code, 'message': error.message}
+
+        payload = b""
+        if response is not None:
+            payload = json.dumps(response).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        self._handle('get')
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        self._handle('post')
+
+    def do_PUT(self):  # pylint: disable=invalid-name
+        self._handle('put')
+
+    def do_PATCH(self):  # pylint: disable=invalid-name
+        self._handle('patch')
+
+    def do_DELETE(self):  # pylint: disable=invalid-name
+        self._handle('delete')
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        pass
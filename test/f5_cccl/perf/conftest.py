@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+
+# Copyright 2017 F5 Networks Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import os
+
+import pytest
+import requests
+
+from f5_cccl.utils.rest_client import RestClient
+
+from bigip_standin import BigIPStandIn
+
+requests.packages.urllib3.disable_warnings()
+
+# Latency of each request to the stand-in BIG-IP, in milliseconds.
+STANDIN_LATENCY_MS = float(os.environ.get('CCCL_PERF_LATENCY_MS', 0))
+
+req_symbols = ['bigip_mgmt_ip', 'bigip_username', 'bigip_password']
+
+
+def real_bigip_symbols():
+    symbols = getattr(pytest, 'symbols', None)
+    return symbols is not None and all(
+        hasattr(symbols, sym) for sym in req_symbols)
+
+
+@pytest.fixture(scope="module")
+def bigip(bigip):
+    """Benchmark against the real BIG-IP, or a local stand-in."""
+    if real_bigip_symbols():
+        yield bigip
+        return
+
+    standin = BigIPStandIn(latency=STANDIN_LATENCY_MS / 1000.0)
+    standin.start()
+    bigip_fix = RestClient('127.0.0.1', 'admin', 'admin',
+                           port=standin.port, scheme='http')
+    bigip_fix.test_rest_calls = standin.counters
+    yield bigip_fix
+    standin.stop()
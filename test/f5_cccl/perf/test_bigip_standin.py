@@ -0,0 +1,248 @@
+#!/usr/bin/env python
+
+# Copyright 2017 F5 Networks Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import gc
+from time import sleep
+from time import time
+import tracemalloc
+
+import pytest
+
+from icontrol.exceptions import iControlUnexpectedHTTPError
+
+from f5_cccl.bigip import BigIPProxy
+from f5_cccl.service.manager import ServiceManager
+from f5_cccl.service.statistics import ServiceStatistics
+from f5_cccl.utils.rest_client import RestClient
+from f5_cccl.utils.rest_metrics import RestMetrics
+
+from bigip_standin import BigIPStandIn
+
+
+@pytest.fixture
+def standin():
+    bigip = BigIPStandIn()
+    bigip.start()
+    yield bigip
+    bigip.stop()
+
+
+@pytest.fixture
+def client(standin):
+    return RestClient('127.0.0.1', 'admin', 'admin', port=standin.port,
+                      scheme='http')
+
+
+def test_standin_pool(standin, client):
+    """Test the emulated pool endpoints."""
+    pools = client.tm.ltm.pools
+    pools.pool.create(name='pool1', partition='Test',
+                      membersReference={'items': [
+                          {'name': '10.1.1.1:80', 'address': '10.1.1.1'}]})
+    with pytest.raises(iControlUnexpectedHTTPError) as error:
+        pools.pool.create(name='pool1', partition='Test')
+    assert error.value.response.status_code == 409
+
+    collection = pools.get_collection(requests_params={
+        'params': '$filter=partition+eq+Test&expandSubcollections=true'})
+    assert len(collection) == 1
+    members = collection[0].membersReference['items']
+    assert members[0]['name'] == '10.1.1.1:80'
+    assert members[0]['partition'] == 'Test'
+    assert standin.count('ltm/node') == 1
+    assert pools.get_collection(requests_params={
+        'params': '$filter=partition+eq+Common'}) == []
+
+    pool = pools.pool.load(name='pool1', partition='Test')
+    assert 'items' not in pool.membersReference
+    pool.members_s.members.create(name='10.1.1.2:80', address='10.1.1.2')
+    pool.modify(description='test')
+    pool = pools.pool.load(name='pool1', partition='Test')
+    assert pool.description == 'test'
+    assert len(pool.members_s.members.get_collection()) == 2
+    assert standin.count('ltm/node') == 2
+
+    pool.delete()
+    assert not pools.pool.exists(name='pool1', partition='Test')
+    assert standin.count('ltm/pool') == 0
+
+
+def test_standin_counters(standin, client):
+    """Test the request counters and the change token."""
+    token_uri = client._meta_data['uri'] + 'sys/db/configsync.localconfigtime'
+    token = client.get(token_uri)['value']
+
+    client.tm.ltm.virtuals.virtual.create(
+        name='virtual1', partition='Test', destination='/Test/10.0.0.1:80')
+    assert standin.count('ltm/virtual-address') == 1
+    assert client.get(token_uri)['value'] != token
+    with pytest.raises(iControlUnexpectedHTTPError) as error:
+        client.tm.ltm.virtuals.virtual.load(name='virtual2', partition='Test')
+    assert error.value.response.status_code == 404
+
+    assert standin.counters == {
+        'get': 3, 'post': 1, 'put': 0, 'patch': 0, 'delete': 0}
+    standin.reset_counters()
+    assert sum(standin.counters.values()) == 0
+
+
+def test_standin_latency(client, standin):
+    """Test the per-request latency."""
+    standin.latency = 0.05
+    virtuals = client.tm.ltm.virtuals
+    start_time = time()
+    virtuals.get_collection()
+    virtuals.get_collection()
+
+    assert time() - start_time >= 0.1
+    assert standin.counters['get'] == 2
+
+
+def test_standin_rest_metrics(client, standin):
+    """Test the REST metrics of a refresh."""
+    metrics = RestMetrics()
+    proxy = BigIPProxy(client, 'Test', rest_metrics=metrics)
+    client.tm.ltm.pools.pool.create(name='pool1', partition='Test')
+    proxy.refresh_ltm()
+
+    counts = metrics.get_request_counts()
+    assert counts[('POST', '/mgmt/tm/ltm/pool', 200)] == 1
+    assert counts[('GET', '/mgmt/tm/ltm/pool', 200)] == 1
+    assert sum(counts.values()) == sum(standin.counters.values())
+    assert ('f5_cccl_rest_response_size_bytes_count{'
+            'endpoint="/mgmt/tm/ltm/pool",method="GET"} 1'
+            in metrics.export())
+
+
+def test_standin_status(client, standin):
+    """Test the status of the resources, from their stats."""
+    proxy = BigIPProxy(client, 'Test')
+    client.tm.ltm.pools.pool.create(
+        name='pool1', partition='Test',
+        membersReference={'items': [
+            {'name': '10.1.1.1:80', 'state': 'up',
+             'session': 'monitor-enabled'}]})
+    client.tm.ltm.virtuals.virtual.create(
+        name='virtual1', partition='Test', destination='/Test/10.0.0.1:80')
+    client.tm.ltm.virtuals.virtual.create(
+        name='virtual2', partition='Common', destination='/Test/10.0.0.2:80')
+    standin.set_stats('ltm/pool', 'Test', 'pool1', **{
+        'status.availabilityState': 'available'})
+    standin.reset_counters()
+
+    status = proxy.get_status()
+    assert standin.counters['get'] == 3
+    assert list(status['virtuals']) == ['virtual1']
+    assert status['virtuals']['virtual1']['availabilityState'] == 'unknown'
+    assert status['pools']['pool1']['availabilityState'] == 'available'
+    assert status['pools']['pool1']['members'] == {
+        '10.1.1.1:80': {'state': 'up', 'session': 'monitor-enabled'}}
+
+
+def test_standin_statistics(client, standin):
+    """Test the rates computed from the stats of the resources."""
+    statistics = ServiceStatistics(BigIPProxy(client, 'Test'))
+    client.tm.ltm.virtuals.virtual.create(
+        name='virtual1', partition='Test', destination='/Test/10.0.0.1:80')
+    standin.reset_counters()
+
+    assert statistics.get()['virtuals']['virtual1']['connsPerSec'] is None
+    standin.set_stats('ltm/virtual', 'Test', 'virtual1', **{
+        'clientside.totConns': 100, 'clientside.curConns': 4})
+    sleep(0.1)
+    sample = statistics.get()
+    virtual = sample['virtuals']['virtual1']
+    assert virtual['curConns'] == 4
+    assert virtual['connsPerSec'] == pytest.approx(
+        100 / sample['interval'])
+    assert virtual['bitsInPerSec'] == 0
+    assert standin.counters['get'] == 4
+
+
+def test_standin_select_fields(client, standin):
+    """Test applying a configuration refreshed with selected fields."""
+    service_config = {
+        'virtualServers': [{
+            'name': 'virtual1', 'destination': '/Test/10.0.0.1:80',
+            'pool': '/Test/pool1', 'enabled': True, 'vlansEnabled': True,
+            'profiles': [{'name': 'tcp', 'partition': 'Common',
+                          'context': 'all'}]}],
+        'pools': [{'name': 'pool1', 'monitors': ['/Common/http'],
+                   'members': [{'address': '10.1.1.1', 'port': 80}]}]
+    }
+    schema = 'f5_cccl/schemas/cccl-ltm-api-schema.yml'
+    metrics = RestMetrics()
+    proxy = BigIPProxy(client, 'Test', select_fields=True,
+                       rest_metrics=metrics)
+    service_manager = ServiceManager(proxy, 'Test', schema)
+    assert service_manager.apply_ltm_config(service_config) == 0
+
+    # Fields that are not compared are not retrieved.
+    virtual = client.tm.ltm.virtuals.virtual.load(
+        name='virtual1', partition='Test')
+    virtual.modify(persist=[{'name': 'cookie'}], translateAddress='enabled')
+    standin.reset_counters()
+    metrics.clear()
+    proxy.refresh_ltm()
+    assert 'persist' not in proxy._all_virtuals['virtual1'].data
+
+    virtuals_key = ('GET', '/mgmt/tm/ltm/virtual')
+    select_size = metrics._sizes[virtuals_key].total
+    metrics.clear()
+    BigIPProxy(client, 'Test', rest_metrics=metrics).refresh_ltm()
+    assert select_size < metrics._sizes[virtuals_key].total
+
+    # The configuration is unchanged.
+    standin.reset_counters()
+    assert service_manager.apply_ltm_config(service_config) == 0
+    assert standin.counters['post'] == 0
+    assert standin.counters['put'] == 0
+    assert standin.counters['patch'] == 0
+    assert standin.counters['delete'] == 0
+
+
+def test_standin_paged_refresh(client, standin):
+    """Test that a paged refresh bounds the memory it uses."""
+    for i in range(100):
+        client.tm.ltm.pools.pool.create(
+            name='pool{}'.format(i), partition='Test',
+            membersReference={'items': [
+                {'name': '10.1.{}.1:{}'.format(i, port),
+                 'address': '10.1.{}.1'.format(i)}
+                for port in range(80, 90)]})
+
+    def refresh(proxy):
+        gc.collect()
+        tracemalloc.start()
+        try:
+            proxy.refresh_ltm()
+            (current, peak) = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        return peak - current
+
+    proxy = BigIPProxy(client, 'Test')
+    overhead = refresh(proxy)
+    standin.reset_counters()
+    paged_proxy = BigIPProxy(client, 'Test', page_size=20)
+    paged_overhead = refresh(paged_proxy)
+
+    assert paged_proxy.get_pools() == proxy.get_pools()
+    assert paged_proxy.get_nodes() == proxy.get_nodes()
+    assert paged_overhead < overhead / 2
+    # 6 pages of pools and of nodes, 1 page of the other collections.
+    assert standin.counters['get'] == 6 + 6 + 11
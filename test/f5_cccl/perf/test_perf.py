@@ -14,40 +14,34 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 #
+"""Apply benchmarks.
+
+The benchmarks run against the BIG-IP given by the pytest symbols, or
+else against a local iControl REST stand-in (see bigip_standin.py).  The
+REST calls of the last round are reported with the benchmark results.
+
+Environment:
+    CCCL_PERF_LATENCY_MS: Latency of each stand-in request (default: 0).
+    CCCL_PERF_LARGE_SCALE: Also run the scales up to 10k virtual servers
+        and 100k pool members.
+"""
 
 from copy import deepcopy
+import os
 import pytest
 import requests
-import pdb
-
-from mock import MagicMock
-
-from f5.bigip import ManagementRoot
-
-from f5.sdk_exception import F5SDKError
-from icontrol.exceptions import iControlUnexpectedHTTPError
-
-import f5_cccl.exceptions as exceptions
-from f5_cccl.resource.ltm.virtual import VirtualServer
 
 from pprint import pprint
 
 requests.packages.urllib3.disable_warnings()
 
-req_symbols = ['bigip_mgmt_ip', 'bigip_username', 'bigip_password']
-def missing_bigip_symbols():
-    for sym in req_symbols:
-        if not hasattr(pytest.symbols, sym):
-            return True
-    return False
+# The large scales take minutes per round, run them when this is set.
+LARGE_SCALE = os.environ.get('CCCL_PERF_LARGE_SCALE')
 
-pytestmark = pytest.mark.skipif(missing_bigip_symbols(),
-                                reason="Need symbols pointing at a real bigip.")
 
 def _make_svc_config(partition, num_virtuals=0, num_members=0):
     base_virtual = {
         'name': 'Virtual-1',
-        'destination': '/Test/1.2.3.4:80',
         'ipProtocol': 'tcp',
         'profiles': [
             {'name': "tcp",
@@ -63,7 +57,7 @@ def _make_svc_config(partition, num_virtuals=0, num_members=0):
     base_pool = {
         "name": "pool1",
         "monitors": ["/Common/http"]
-    },
+    }
     base_member ={
         "address": "172.16.0.100", "port": 8080, "routeDomain": {"id": 0}
     }
@@ -77,6 +71,8 @@ def _make_svc_config(partition, num_virtuals=0, num_members=0):
         v = {}
         v.update(base_virtual)
         v['name'] = "virtual-{}".format(i)
+        v['destination'] = "/{}/10.{}.{}.{}:80".format(
+            partition, i // 65536 % 256, i // 256 % 256, i % 256)
         v['pool'] = "/{}/pool-{}".format(partition,i)
         cfg['virtualServers'].append(v)
 
@@ -100,28 +96,51 @@ testdata = [
     (10, 10),
     (100, 10),
     (10, 100),
+    pytest.param(1000, 10, marks=pytest.mark.skipif(
+        not LARGE_SCALE, reason="Set CCCL_PERF_LARGE_SCALE to run.")),
+    pytest.param(10000, 10, marks=pytest.mark.skipif(
+        not LARGE_SCALE, reason="Set CCCL_PERF_LARGE_SCALE to run.")),
 ]
 
 
+def _report_rest_calls(benchmark, counters):
+    """Report the REST calls of the last benchmark round."""
+    benchmark.extra_info['rest_calls'] = dict(counters)
+    benchmark.extra_info['rest_calls_total'] = sum(counters.values())
+    pprint(counters)
+
+
+def _reset(counters):
+    for k in counters.keys():
+        counters[k] = 0
+
 
 @pytest.mark.parametrize("nv,nm", testdata)
 @pytest.mark.benchmark(group="apply-new")
 def test_apply_new(partition, cccl, bigip_rest_counters, benchmark, nv, nm):
     cfg = _make_svc_config(partition, num_virtuals=nv, num_members=nm)
     def setup():
-        cccl.apply_config({})
+        cccl.apply_ltm_config({})
+        _reset(bigip_rest_counters)
     def apply():
-        cccl.apply_config(cfg)
+        assert cccl.apply_ltm_config(deepcopy(cfg)) == 0
     benchmark.pedantic(apply, setup=setup, rounds=2, iterations=1)
 
-    pprint(bigip_rest_counters)
+    _report_rest_calls(benchmark, bigip_rest_counters)
+
 
 @pytest.mark.parametrize("nv,nm", testdata)
 @pytest.mark.benchmark(group="apply-no-change")
 def test_apply_no_change(partition, cccl, bigip_rest_counters, benchmark, nv, nm):
     cfg = _make_svc_config(partition, num_virtuals=nv, num_members=nm)
+    def setup():
+        _reset(bigip_rest_counters)
     def apply():
-        cccl.apply_config(cfg)
+        assert cccl.apply_ltm_config(deepcopy(cfg)) == 0
     apply()
-    benchmark.pedantic(apply, rounds=2, iterations=1)
-    pprint(bigip_rest_counters)
+    benchmark.pedantic(apply, setup=setup, rounds=2, iterations=1)
+
+    _report_rest_calls(benchmark, bigip_rest_counters)
+    assert bigip_rest_counters['post'] == 0
+    assert bigip_rest_counters['put'] == 0
+    assert bigip_rest_counters['delete'] == 0